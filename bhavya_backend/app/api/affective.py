@@ -1,77 +1,76 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, Request, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List
-import numpy as np
-import torch
-from services.affective_engine.temporal_model import EEVTemporalModel, AffectiveRiskScorer
-from services.affective_engine.npu_interface import NPUInterface
+import json
+from services.affective_engine.batcher import affective_batcher
+from services.affective_engine.batch_engine import affective_engine
+from services.affective_engine.video_stream import VideoStreamAnalyzer
+from services.inference.executor import inference_executor, InferenceBusyError
+from services.inference.registry import registry
 
 router = APIRouter()
 
-# Initialize Engines
-npu_engine = NPUInterface()
-temporal_model = EEVTemporalModel()
-temporal_model.eval()
-
 class QuestionInput(BaseModel):
     answers: List[int] # 0-3 scale for 10 questions
 
+def _question_sequence(answers):
+    # 1. Map to 15-dim vector
+    npu_engine = registry.get("npu_interface")
+    base_vector = npu_engine.process_question_answers(answers)
+
+    # 2. Simulate a "Time Series" from this state (Mental State Persistence)
+    # A sequence of 30 "frames" (seconds) where this mood persists but fluctuates slightly
+    return affective_engine.simulate_sequences(base_vector[None, :], seq_len=30)[0]
+
 @router.post("/analyze/questions")
 async def analyze_questions(data: QuestionInput):
     """
     Analyzes mental state based on questionnaire answers mapped to EEV Emotion Space.
     1. Answers -> NPU Interface (Vector Mapping)
     2. Sequence Generation (Simulated temporal aspect from static answers)
-    3. Temporal Model Inference
+    3. Temporal Model Inference (micro-batched with concurrent requests)
+    Steps 1-2 run on the inference executor and step 3 on the batcher thread,
+    so none of the numpy/torch work blocks the event loop.
     """
     try:
-        # 1. Map to 15-dim vector
-        base_vector = npu_engine.process_question_answers(data.answers)
-        
-        # 2. Simulate a "Time Series" from this state (Mental State Persistence)
-        # We create a sequence of 30 "frames" (seconds) where this mood persists but fluctuates slightly
-        seq_len = 30
-        sequence = []
-        for _ in range(seq_len):
-            noise = np.random.normal(0, 0.02, 15)
-            frame_vec = np.clip(base_vector + noise, 0, 1)
-            frame_vec /= frame_vec.sum()
-            sequence.append(frame_vec)
+        sequence_np = await inference_executor.run(_question_sequence, data.answers)
         
-        sequence_np = np.array(sequence)
-        
-        # 3. Model Inference
-        tensor_input = torch.tensor(sequence_np, dtype=torch.float32).unsqueeze(0) # (1, 30, 15)
-        with torch.no_grad():
-            probs = temporal_model(tensor_input) # (1, 4)
-            
-        pattern_idx = torch.argmax(probs).item()
-        patterns = ["Stable", "Volatile", "Depressive", "Anxious"]
-        
-        # 4. Risk Calculation
-        risk_score = AffectiveRiskScorer.calculate_risk(sequence_np)
+        # 3. Model Inference + 4. Risk Calculation (batched)
+        result = await affective_batcher.infer(sequence_np)
         
         return {
-            "pattern": patterns[pattern_idx],
-            "risk_score": float(risk_score),
-            "emotion_timeline": [
-                {"time": i, "positive": float(v[:6].sum()), "negative": float(v[11:].sum())} 
-                for i, v in enumerate(sequence_np)
-            ]
+            "pattern": result["pattern"],
+            "risk_score": result["risk_score"],
+            "emotion_timeline": affective_engine.timeline(result["positive"], result["negative"])
         }
+    except InferenceBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/analyze/video")
-async def analyze_video(file: UploadFile = File(...)):
+async def analyze_video(request: Request):
     """
-    Placeholder for Video Analysis.
-    In production:
-    1. Save video temp.
-    2. OpenCV read frames.
-    3. NPU extracts vector per frame.
-    4. Temporal model analyzes sequence.
+    Streaming Video Analysis (Server-Sent Events).
+    The request body is the raw frame stream (RGB24, VIDEO_FRAME_WIDTH x VIDEO_FRAME_HEIGHT).
+    1. Body is read chunk by chunk while it uploads.
+    2. Frames are decoded on a thread pool.
+    3. NPU extracts a vector per frame (batched).
+    4. Temporal model analyzes the sequence incrementally.
+    A "partial" event is pushed after every NPU batch, then a final "complete" event.
     """
-    return {"message": "Video analysis module ready. Connect NPU stream."}
+    analyzer = VideoStreamAnalyzer()
+
+    async def event_stream():
+        try:
+            async for event in analyzer.analyze(request.stream()):
+                yield f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            yield f"event: error\ndata: {json.dumps({'event': 'error', 'detail': str(e)})}\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
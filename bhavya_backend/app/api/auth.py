@@ -1,24 +1,52 @@
 from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from app.core import security
 from app.core.config import settings
+from app.core.principal_cache import principal_cache
 from app.db import models
 from app.db.base import get_db
 from app import schemas
 
 router = APIRouter()
 
+# Routes are async so they only hold an event-loop slot while hashing runs on the dedicated pool;
+# the short DB calls go through the threadpool.
+
+def _get_user_by_username(db: Session, username: str):
+    return db.query(models.User).filter(models.User.username == username).first()
+
+def _get_user_by_email(db: Session, email: str):
+    return db.query(models.User).filter(models.User.email == email).first()
+
+def _upgrade_password_hash(db: Session, user: models.User, new_hash: str):
+    user.hashed_password = new_hash
+    db.commit()
+
+def _add_user(db: Session, db_user: models.User):
+    db.add(db_user)
+    db.commit()
+    db.refresh(db_user)
+    return db_user
+
 @router.post("/token", response_model=schemas.Token)
-def login_for_access_token(db: Session = Depends(get_db), form_data: OAuth2PasswordRequestForm = Depends()):
-    user = db.query(models.User).filter(models.User.username == form_data.username).first()
-    if not user or not security.verify_password(form_data.password, user.hashed_password):
+async def login_for_access_token(db: Session = Depends(get_db), form_data: OAuth2PasswordRequestForm = Depends()):
+    user = await run_in_threadpool(_get_user_by_username, db, form_data.username)
+    verified, new_hash = False, None
+    if user:
+        verified, new_hash = await security.verify_password_async(form_data.password, user.hashed_password)
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if new_hash:
+        # PASSWORD_HASH_ROUNDS changed since this hash was made: upgrade it transparently
+        await run_in_threadpool(_upgrade_password_hash, db, user, new_hash)
+        principal_cache.invalidate(user.username)
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = security.create_access_token(
         subject=user.username, expires_delta=access_token_expires
@@ -26,14 +54,11 @@ def login_for_access_token(db: Session = Depends(get_db), form_data: OAuth2Passw
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.post("/signup", response_model=schemas.User)
-def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    db_user = db.query(models.User).filter(models.User.email == user.email).first()
+async def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
+    db_user = await run_in_threadpool(_get_user_by_email, db, user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    hashed_password = security.get_password_hash(user.password)
+    hashed_password = await security.get_password_hash_async(user.password)
     db_user = models.User(email=user.email, username=user.username, hashed_password=hashed_password)
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    return db_user
+    return await run_in_threadpool(_add_user, db, db_user)
@@ -1,14 +1,22 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
 from typing import List, Optional
-from datetime import datetime, date
+from datetime import datetime, date, timezone
 from app.api import deps
 from app.db import models
 from app import schemas
+from services.affective_engine.batcher import affective_batcher
+from services.affective_engine.batch_engine import affective_engine
+from services.inference.registry import registry
+from services.inference.predictor import predictor
 
 router = APIRouter()
 
+def _today() -> date:
+    # UTC, like the stored timestamps the checkin_date migration backfilled from
+    return datetime.now(timezone.utc).date()
+
 @router.post("/", response_model=schemas.DailyCheckIn)
 def create_checkin(
     checkin: schemas.DailyCheckInCreate,
@@ -16,10 +24,10 @@ def create_checkin(
     current_user: models.User = Depends(deps.get_current_user)
 ):
     # Check if already checked in today
-    today = date.today()
+    today = _today()
     existing = db.query(models.DailyCheckIn).filter(
         models.DailyCheckIn.user_id == current_user.id,
-        func.date(models.DailyCheckIn.timestamp) == today
+        models.DailyCheckIn.checkin_date == today
     ).first()
     
     if existing:
@@ -30,22 +38,24 @@ def create_checkin(
 
     db_checkin = models.DailyCheckIn(
         user_id=current_user.id,
+        checkin_date=today,
         **checkin.model_dump()
     )
     db.add(db_checkin)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # A concurrent request won the (user_id, checkin_date) unique index
+        db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail="You have already checked in today."
+        )
     db.refresh(db_checkin)
     
     # --- ADVANCED AFFECTIVE ALGO INTEGRATION ---
-    import numpy as np
-    import torch
-    from services.affective_engine.temporal_model import EEVTemporalModel, AffectiveRiskScorer
-    from services.affective_engine.npu_interface import NPUInterface
-
-    # Initialize Engines (lazy load or module level)
-    npu = NPUInterface()
-    model = EEVTemporalModel()
-    model.eval()
+    # Shared engines from the model registry (temporal model runs through the batcher)
+    npu = registry.get("npu_interface")
 
     # 1. Map to EEV Vector
     answers = [
@@ -57,27 +67,12 @@ def create_checkin(
     base_vector = npu.process_question_answers(answers)
 
     # 2. Simulate Temporal Persistence
-    seq_len = 30
-    sequence = []
-    for _ in range(seq_len):
-        noise = np.random.normal(0, 0.02, 15)
-        frame_vec = np.clip(base_vector + noise, 0, 1)
-        frame_vec /= frame_vec.sum()
-        sequence.append(frame_vec)
-    
-    sequence_np = np.array(sequence)
+    sequence_np = affective_engine.simulate_sequences(base_vector[None, :], seq_len=30)[0]
 
-    # 3. Model Inference
-    tensor_input = torch.tensor(sequence_np, dtype=torch.float32).unsqueeze(0)
-    with torch.no_grad():
-        probs = model(tensor_input)
-    
-    pattern_idx = torch.argmax(probs).item()
-    patterns = ["Stable", "Volatile", "Depressive", "Anxious"]
-    detected_pattern = patterns[pattern_idx]
-
-    # 4. Risk Scoring
-    risk_score = AffectiveRiskScorer.calculate_risk(sequence_np)
+    # 3. Model Inference + 4. Risk Scoring (batched with concurrent check-ins)
+    result = affective_batcher.submit(sequence_np).result()
+    detected_pattern = result["pattern"]
+    risk_score = result["risk_score"]
     
     print(f"User {current_user.id} Affective Analysis: {detected_pattern} (Risk: {risk_score:.2f})")
     
@@ -90,10 +85,13 @@ def create_checkin(
             "risk_score": float(risk_score),
             "source": "daily_checkin_advanced"
         },
-        timestamp=datetime.now()
+        generated_at=datetime.now()
     )
     db.add(new_insight)
     db.commit()
+
+    # A check-in changes what the dashboard should show for this user (no behavioral days change)
+    predictor.invalidate_user(current_user.id, days=())
     
     return db_checkin
 
@@ -102,10 +100,10 @@ def get_todays_checkin(
     db: Session = Depends(deps.get_db),
     current_user: models.User = Depends(deps.get_current_user)
 ):
-    today = date.today()
+    today = _today()
     checkin = db.query(models.DailyCheckIn).filter(
         models.DailyCheckIn.user_id == current_user.id,
-        func.date(models.DailyCheckIn.timestamp) == today
+        models.DailyCheckIn.checkin_date == today
     ).first()
     
     return checkin
@@ -1,20 +1,24 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.core.config import settings
+from app.core.principal_cache import principal_cache
 from app.db import models
-from app.db.base import get_db
+from app.db.base import get_db, get_async_db
 from app import schemas
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+credentials_exception = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Could not validate credentials",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+
+def _token_subject(token: str) -> str:
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         username: str = payload.get("sub")
@@ -23,7 +27,34 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         token_data = schemas.TokenData(username=username)
     except JWTError:
         raise credentials_exception
-    user = db.query(models.User).filter(models.User.username == token_data.username).first()
-    if user is None:
-        raise credentials_exception
+    return token_data.username
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    username = _token_subject(token)
+    cached = principal_cache.get(username)
+    if cached is not None:
+        user = principal_cache.attach(db, cached)
+    else:
+        user = db.query(models.User).filter(models.User.username == username).first()
+        if user is None:
+            raise credentials_exception
+        principal_cache.put(username, user)
+    if not user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return user
+
+async def get_current_user_async(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    # Same as get_current_user, bound to the request's AsyncSession
+    username = _token_subject(token)
+    cached = principal_cache.get(username)
+    if cached is not None:
+        user = await db.run_sync(principal_cache.attach, cached)
+    else:
+        result = await db.execute(select(models.User).where(models.User.username == username))
+        user = result.scalars().first()
+        if user is None:
+            raise credentials_exception
+        principal_cache.put(username, user)
+    if not user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
     return user
@@ -1,35 +1,293 @@
-from fastapi import APIRouter, Depends, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from app import schemas
+from app.core.config import settings
 from app.db import models
 from app.db.base import get_db
 from app.api import deps
+from app.api.pagination import keyset_page
+from collections import defaultdict
 from datetime import datetime
+from typing import List, Optional
+import codecs
+import json
+import re
+from services.data.write_behind import ingest_queue, QueueFullError
+from services.features.store import feature_store
+from services.inference.predictor import predictor
 
 router = APIRouter()
 
-def process_ingestion_data(data: schemas.DataIngestion, user_id: int, db: Session):
-    # This simulates sending data to the Data Ingestion & Preprocessing Service
-    # In a real microservices architecture, this might push to a queue (Kafka/RabbitMQ)
-    # For now, we save raw data directly
-    
-    db_raw = models.BehavioralRaw(
-        user_id=user_id,
-        data_type=data.data_type,
-        payload=data.payload,
-        timestamp=datetime.now()
-    )
-    db.add(db_raw)
-    db.commit()
-    print(f"Processed {data.data_type} for user {user_id}")
+def refresh_features_for_rows(db: Session, rows: list):
+    # Keep the daily feature store current for every (user, day) the flushed rows touched
+    days_by_user = defaultdict(set)
+    for row in rows:
+        days_by_user[row["user_id"]] |= feature_store.days_for([row])
+    for user_id, days in days_by_user.items():
+        feature_store.materialize_days(db, user_id, days, commit=False)
+
+def invalidate_risk_for_rows(rows: list):
+    days_by_user = defaultdict(set)
+    for row in rows:
+        days_by_user[row["user_id"]].update(
+            day for day in (row.get("first_sample_date"), row.get("last_sample_date")) if day is not None
+        )
+    for user_id, days in days_by_user.items():
+        predictor.invalidate_user(user_id, days)
+
+ingest_queue.add_flush_hook(refresh_features_for_rows)
+ingest_queue.add_commit_hook(invalidate_risk_for_rows)
 
 @router.post("/ingest")
 def ingest_data(
-    data: schemas.DataIngestion, 
-    background_tasks: BackgroundTasks,
+    data: schemas.DataIngestion,
+    current_user: models.User = Depends(deps.get_current_user)
+):
+    # Hand the row to the write-behind queue; its worker writes it with its own session
+    row = {
+        "user_id": current_user.id,
+        "data_type": data.data_type,
+        "payload": data.payload,
+        "timestamp": data.timestamp or datetime.now()
+    }
+    try:
+        # Validated here, like /ingest/bulk: a bad sample date must never reach the flush
+        feature_store.stamp_sample_range(row)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Invalid sample date/timestamp: {e}",
+        )
+    block = settings.INGEST_QUEUE_FULL_POLICY == "block"
+    try:
+        ingest_queue.put(row, block=block, timeout=settings.INGEST_QUEUE_BLOCK_TIMEOUT_S if block else None)
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e),
+            headers={"Retry-After": "1"},
+        )
+    return {"status": "received", "message": "Data queued for processing"}
+
+@router.get("/history", response_model=List[schemas.BehavioralRawRecord])
+def read_ingestion_history(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    data_type: Optional[str] = None,
     current_user: models.User = Depends(deps.get_current_user),
     db: Session = Depends(get_db)
 ):
-    # Offload processing to background task (or separate service)
-    background_tasks.add_task(process_ingestion_data, data, current_user.id, db)
-    return {"status": "received", "message": "Data queued for processing"}
+    # Newest raw samples first; page with the X-Next-Cursor token
+    query = db.query(models.BehavioralRaw).filter(models.BehavioralRaw.user_id == current_user.id)
+    if data_type:
+        query = query.filter(models.BehavioralRaw.data_type == data_type)
+    return keyset_page(query, models.BehavioralRaw.timestamp, models.BehavioralRaw.id, cursor, limit, response)
+
+# JSON whitespace; matched in place so looking past a value never copies the buffer
+_WHITESPACE = re.compile(r"[ \t\r\n]*")
+
+def _element_end(buffer, pos):
+    """
+    Offset of the top-level ',' or ']' that ends the array element starting at buffer[pos]
+    (string- and nesting-aware), or None if the buffer ends inside the element.
+    """
+    depth = 0
+    in_string = escaped = False
+    for i in range(pos, len(buffer)):
+        c = buffer[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif c == "\\":
+                escaped = True
+            elif c == '"':
+                in_string = False
+        elif c == '"':
+            in_string = True
+        elif c in "[{":
+            depth += 1
+        elif c in "]}":
+            if depth == 0:
+                return i # Closes the outer array
+            depth -= 1
+        elif c == "," and depth == 0:
+            return i
+    return None
+
+async def _iter_records(chunks, max_record_bytes=None):
+    """
+    Incrementally parses a streamed body that is either a JSON array of records
+    or NDJSON (one record per line), without buffering the whole body.
+    Yields (index, value, error) with error set when the record is not valid JSON.
+    An invalid array element is rejected and parsing resumes at the next element;
+    a record longer than `max_record_bytes` ends the stream with a final reject.
+    """
+    max_record_bytes = max_record_bytes or settings.INGEST_BULK_MAX_RECORD_BYTES
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    mode = None # "array" or "ndjson"
+    index = 0
+    done = False
+
+    async for chunk in chunks:
+        if done:
+            continue # Drain the rest of the body
+        buffer += utf8.decode(chunk)
+        if mode is None:
+            stripped = buffer.lstrip()
+            if not stripped:
+                continue
+            mode = "array" if stripped[0] == "[" else "ndjson"
+            buffer = stripped[1:] if mode == "array" else stripped
+
+        if mode == "ndjson":
+            *lines, buffer = buffer.split("\n")
+            for line in lines:
+                if line.strip():
+                    yield _decode_line(index, line)
+                    index += 1
+        else:
+            pos = 0
+            while True:
+                while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                    pos += 1
+                if pos < len(buffer) and buffer[pos] == "]":
+                    done = True
+                    break
+                if pos >= len(buffer):
+                    break
+                try:
+                    value, end = decoder.raw_decode(buffer, pos)
+                    # A whole element is followed by ',' or ']' ("5x" is not 5)
+                    next_pos = _WHITESPACE.match(buffer, end).end()
+                    if next_pos < len(buffer) and buffer[next_pos] not in ",]":
+                        raise ValueError("Trailing characters")
+                    if next_pos == len(buffer) and not isinstance(value, (dict, list)):
+                        break # A number may continue in the next chunk
+                    pos = end
+                except ValueError:
+                    # Incomplete (wait for more data) or invalid (reject it and skip to the next element)
+                    end = _element_end(buffer, pos)
+                    if end is None:
+                        break
+                    yield _decode_line(index, buffer[pos:end])
+                    index += 1
+                    pos = end
+                    continue
+                yield index, value, None
+                index += 1
+            buffer = buffer[pos:]
+
+        if len(buffer.encode()) > max_record_bytes:
+            yield index, None, f"Record exceeds {max_record_bytes} bytes; rest of the body skipped"
+            buffer = ""
+            done = True
+
+    if done:
+        return
+
+    buffer += utf8.decode(b"", final=True)
+    if mode == "ndjson" and buffer.strip():
+        yield _decode_line(index, buffer)
+    elif mode == "array" and buffer.strip():
+        yield index, None, "Malformed or truncated JSON array element"
+
+def _decode_line(index, line):
+    try:
+        return index, json.loads(line), None
+    except ValueError as e:
+        return index, None, f"Invalid JSON: {e}"
+
+def _insert_raw_rows(db: Session, rows: list, commit: bool):
+    if rows:
+        # One multi-row INSERT instead of one ORM flush per sample
+        db.execute(insert(models.BehavioralRaw), rows)
+    if commit:
+        db.commit()
+
+@router.post("/ingest/bulk", response_model=schemas.BulkIngestionResult)
+async def ingest_bulk(
+    request: Request,
+    current_user: models.User = Depends(deps.get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Bulk ingestion for offline mobile uploads.
+    Body: streamed NDJSON or a JSON array of DataIngestion records.
+    Records are validated as they arrive and written to BehavioralRaw in
+    multi-row INSERTs, committing every INGEST_BULK_COMMIT_ROWS rows.
+    `accepted` counts committed rows only. If a write fails, the open transaction's rows are
+    rejected and the upload stops there; later records are not reported and can be resent.
+    """
+    user_id = current_user.id
+    received_at = datetime.now()
+    rows = []
+    indexes = [] # Record index of each row in `rows`
+    staged = [] # Indexes inserted in the open transaction, not yet committed
+    rejects = []
+    accepted = 0
+    affected_days = set()
+
+    async def write(commit):
+        # Rows only count as accepted once their transaction has committed
+        nonlocal rows, indexes, staged, accepted
+        try:
+            await run_in_threadpool(_insert_raw_rows, db, rows, commit)
+        except Exception as e:
+            await run_in_threadpool(db.rollback)
+            rejects.extend({"index": i, "error": f"Database write failed: {e}"} for i in staged + indexes)
+            raise
+        finally:
+            batch, rows, indexes = indexes, [], []
+        staged += batch
+        if commit:
+            accepted += len(staged)
+            staged = []
+
+    async for index, value, error in _iter_records(request.stream()):
+        if error is None:
+            try:
+                record = schemas.DataIngestion.model_validate(value)
+                row = {
+                    "user_id": user_id,
+                    "data_type": record.data_type,
+                    "payload": record.payload,
+                    "timestamp": record.timestamp or received_at,
+                }
+                days = feature_store.stamp_sample_range(row)
+            except ValidationError as e:
+                error = str(e.errors()[0]["msg"]) if e.errors() else str(e)
+            except ValueError as e:
+                error = f"Invalid sample date/timestamp: {e}"
+        if error is not None:
+            rejects.append({"index": index, "error": error})
+            continue
+
+        affected_days |= days
+        rows.append(row)
+        indexes.append(index)
+
+        if len(rows) >= settings.INGEST_BULK_INSERT_ROWS:
+            try:
+                await write(commit=len(staged) + len(rows) >= settings.INGEST_BULK_COMMIT_ROWS)
+            except Exception:
+                break
+
+    else:
+        try:
+            await write(commit=True)
+        except Exception:
+            pass # Reported per record in `rejects`
+
+    # Refresh the daily feature store once for every day this upload touched
+    if affected_days:
+        await run_in_threadpool(feature_store.materialize_days, db, user_id, affected_days)
+    if accepted:
+        predictor.invalidate_user(user_id, affected_days)
+
+    return {"accepted": accepted, "rejected": len(rejects), "rejects": rejects}
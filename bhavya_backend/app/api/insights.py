@@ -1,31 +1,90 @@
-from typing import List
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+import asyncio
+import time
+from functools import partial
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app import schemas
 from app.db import models
-from app.db.base import get_db
+from app.db.base import SessionLocal, get_async_db
 from app.api import deps
+from app.api.pagination import keyset_page_async
+from app.core.config import settings
+from services.inference.executor import inference_executor, InferenceBusyError
+from services.inference.tiering import risk_tiers
 
 router = APIRouter()
 
+def _predict_risk(user_id: int, tier: str = "lstm") -> dict:
+    # Runs on the inference executor (or the threadpool for the baseline tier) with its own sync session
+    from services.inference.predictor import predictor
+    db = SessionLocal()
+    try:
+        return predictor.predict_risk(user_id, db, tier=tier)
+    finally:
+        db.close()
+
+def _observe_lstm(start: float, task: asyncio.Future):
+    # Also runs for LSTM calls that overran the budget, so the EWMA sees the real latency
+    if task.cancelled() or task.exception() is not None:
+        return
+    risk_tiers.observe_lstm((time.perf_counter() - start) * 1000.0)
+
+async def _risk_for(user_id: int, budget_ms: Optional[float] = None) -> dict:
+    """
+    Risk prediction with a latency budget for the LSTM tier (default settings.RISK_LATENCY_BUDGET_MS).
+    When the RandomForest baseline is available, it answers instead if risk_tiers routes the request
+    away from a saturated or slow LSTM, or if the LSTM call overruns the budget or is rejected.
+    An overrunning LSTM call keeps running and fills the risk cache for the next request.
+    """
+    from services.inference.predictor import predictor
+    budget_ms = budget_ms if budget_ms is not None else settings.RISK_LATENCY_BUDGET_MS
+    fallback = predictor.has_baseline
+    start = time.perf_counter()
+
+    tier, reason = risk_tiers.choose(budget_ms, inference_executor) if fallback else ("lstm", None)
+    if tier == "lstm":
+        task = asyncio.ensure_future(inference_executor.run(_predict_risk, user_id))
+        task.add_done_callback(partial(_observe_lstm, start))
+        timeout = budget_ms / 1000.0 if fallback and budget_ms is not None else None
+        try:
+            risk = await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError:
+            reason = "timeout"
+        except InferenceBusyError as e:
+            if not fallback:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail=str(e),
+                    headers={"Retry-After": "1"},
+                )
+            reason = "busy"
+    if reason is not None:
+        risk = await run_in_threadpool(_predict_risk, user_id, "baseline")
+
+    risk_tiers.record(risk["tier"], (time.perf_counter() - start) * 1000.0, reason)
+    return risk
+
 @router.get("/", response_model=List[schemas.Insight])
-def get_insights(
-    skip: int = 0, 
-    limit: int = 10, 
-    current_user: models.User = Depends(deps.get_current_user),
-    db: Session = Depends(get_db)
+async def get_insights(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=100),
+    current_user: models.User = Depends(deps.get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    insights = db.query(models.Insight).filter(models.Insight.user_id == current_user.id).offset(skip).limit(limit).all()
-    return insights
+    stmt = select(models.Insight).where(models.Insight.user_id == current_user.id)
+    return await keyset_page_async(db, stmt, models.Insight.generated_at, models.Insight.id, cursor, limit, response)
 
 @router.get("/dashboard", response_model=schemas.DashboardData)
-def get_dashboard_data(
-    current_user: models.User = Depends(deps.get_current_user),
-    db: Session = Depends(get_db)
+async def get_dashboard_data(
+    budget_ms: Optional[float] = Query(None, gt=0),
+    current_user: models.User = Depends(deps.get_current_user_async)
 ):
     # Fetch real risk assessment
-    from services.inference.predictor import predictor
-    risk_assessment = predictor.predict_risk(current_user.id, db)
+    risk_assessment = await _risk_for(current_user.id, budget_ms)
     
     # Mock data for charts (still mocked as we don't have full history visualization built yet)
     # But future_risk comes from ALGO
@@ -60,18 +119,18 @@ def get_dashboard_data(
         "future_risk": {
             "score": int(risk_assessment['risk_score'] * 100),
             "label": risk_assessment['risk_label'],
-            "prediction": f"Current analysis indicates {risk_assessment['risk_label'].lower()} risk based on: " + ", ".join(risk_assessment['contributing_factors'])
+            "prediction": f"Current analysis indicates {risk_assessment['risk_label'].lower()} risk based on: " + ", ".join(risk_assessment['contributing_factors']),
+            "tier": risk_assessment['tier']
         }
     }
 
 @router.get("/risk", response_model=schemas.RiskData)
-def get_risk_insights(
-    current_user: models.User = Depends(deps.get_current_user),
-    db: Session = Depends(get_db)
+async def get_risk_insights(
+    budget_ms: Optional[float] = Query(None, gt=0),
+    current_user: models.User = Depends(deps.get_current_user_async)
 ):
     # Connect to ML Model
-    from services.inference.predictor import predictor
-    risk = predictor.predict_risk(current_user.id, db)
+    risk = await _risk_for(current_user.id, budget_ms)
     
     factors = []
     # Map simple explanation strings to RiskFactors
@@ -89,5 +148,6 @@ def get_risk_insights(
     return {
         "score": int(risk['risk_score'] * 100),
         "label": risk['risk_label'],
-        "factors": factors
+        "factors": factors,
+        "tier": risk['tier']
     }
@@ -1,17 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from app.api import deps
+from app.api.pagination import keyset_page_async
 from app.db import models
+from app.db.base import get_async_db
 from app import schemas
 
 router = APIRouter()
 
 @router.post("/", response_model=schemas.JournalEntry)
-def create_journal_entry(
+async def create_journal_entry(
     entry: schemas.JournalEntryCreate,
-    db: Session = Depends(deps.get_db),
-    current_user: models.User = Depends(deps.get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(deps.get_current_user_async)
 ):
     db_entry = models.JournalEntry(
         user_id=current_user.id,
@@ -20,18 +23,19 @@ def create_journal_entry(
         content=entry.content
     )
     db.add(db_entry)
-    db.commit()
-    db.refresh(db_entry)
+    await db.commit()
+    await db.refresh(db_entry)
     return db_entry
 
 @router.get("/", response_model=List[schemas.JournalEntry])
-def read_journal_entries(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(deps.get_db),
-    current_user: models.User = Depends(deps.get_current_user)
+async def read_journal_entries(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(deps.get_current_user_async)
 ):
-    entries = db.query(models.JournalEntry).filter(
+    stmt = select(models.JournalEntry).where(
         models.JournalEntry.user_id == current_user.id
-    ).order_by(models.JournalEntry.timestamp.desc()).offset(skip).limit(limit).all()
-    return entries
+    )
+    return await keyset_page_async(db, stmt, models.JournalEntry.timestamp, models.JournalEntry.id, cursor, limit, response)
@@ -0,0 +1,67 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+from fastapi import HTTPException, Response
+from sqlalchemy import String, tuple_, type_coerce
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(timestamp, row_id: int) -> str:
+    # timestamp is the column value as the driver returned it: a datetime, or SQLite's stored text
+    if isinstance(timestamp, datetime):
+        key = ["dt", timestamp.isoformat(), row_id]
+    else:
+        key = ["raw", str(timestamp), row_id]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        kind, timestamp, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        if kind == "dt":
+            return datetime.fromisoformat(timestamp), int(row_id)
+        if kind == "raw" and isinstance(timestamp, str):
+            return timestamp, int(row_id)
+    except (ValueError, TypeError):
+        pass
+    raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def _raw(ts_col):
+    # The column exactly as stored, without the DateTime bind/result processing. SQLite keeps
+    # server defaults as 'YYYY-MM-DD HH:MM:SS' but binds datetimes as '... HH:MM:SS.ffffff', and
+    # compares the two as text, so the cursor must carry (and bind) the stored string itself.
+    return type_coerce(ts_col, String)
+
+def _keyset(query, ts_col, id_col, cursor: Optional[str], limit: int):
+    # Works on both ORM Query and 2.0 select() statements
+    if cursor:
+        ts, row_id = decode_cursor(cursor)
+        key = _raw(ts_col) if isinstance(ts, str) else ts_col
+        query = query.filter(tuple_(key, id_col) < tuple_(ts, row_id))
+    # Each row comes back as (entity, stored timestamp) so the next cursor uses the DB's own form
+    query = query.add_columns(_raw(ts_col).label("cursor_ts"))
+    return query.order_by(ts_col.desc(), id_col.desc()).limit(limit + 1)
+
+def keyset_page(query, ts_col, id_col, cursor: Optional[str], limit: int, response: Response):
+    """
+    Keyset pagination, newest first, on (timestamp, id).
+    Each page is an index range scan that starts right after the previous page's last row,
+    so deep pages cost the same as the first. The opaque token for the next page is
+    returned in the X-Next-Cursor header (absent on the last page).
+    """
+    rows = _keyset(query, ts_col, id_col, cursor, limit).all()
+    return _finish_page(rows, ts_col, id_col, limit, response)
+
+async def keyset_page_async(db, stmt, ts_col, id_col, cursor: Optional[str], limit: int, response: Response):
+    """keyset_page for a select() statement on an AsyncSession."""
+    result = await db.execute(_keyset(stmt, ts_col, id_col, cursor, limit))
+    return _finish_page(result.all(), ts_col, id_col, limit, response)
+
+def _finish_page(rows, ts_col, id_col, limit: int, response: Response):
+    rows = list(rows)
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last, last_ts = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last_ts, getattr(last, id_col.key))
+    return [row[0] for row in rows]
@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from app import schemas
 from app.db import models
 from app.api import deps
+from app.core.principal_cache import principal_cache
 
 router = APIRouter()
 
@@ -32,4 +33,18 @@ def update_user_me(
     db.add(current_user)
     db.commit()
     db.refresh(current_user)
+    principal_cache.invalidate(current_user.username)
+    return current_user
+
+@router.delete("/me", response_model=schemas.User)
+def deactivate_user_me(
+    current_user: models.User = Depends(deps.get_current_user),
+    db: Session = Depends(deps.get_db)
+):
+    current_user.is_active = False
+    db.add(current_user)
+    db.commit()
+    db.refresh(current_user)
+    # Drop the cached principal so the token stops working immediately
+    principal_cache.invalidate(current_user.username)
     return current_user
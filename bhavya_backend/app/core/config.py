@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from typing import Optional
+from urllib.parse import quote_plus
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "BHAVYA Backend"
@@ -9,20 +10,116 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "YOUR_SUPER_SECRET_KEY_HERE"  # In production, get from env
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    PASSWORD_HASH_ROUNDS: int = 29000 # pbkdf2_sha256 cost; stored hashes are upgraded on next login
+    PASSWORD_HASH_WORKERS: int = 2 # Dedicated hashing processes (0 = shared threadpool)
+
+    # Authenticated-principal cache (skips the User lookup in get_current_user)
+    PRINCIPAL_CACHE_ENABLED: bool = True
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 60.0
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+    PRINCIPAL_CACHE_SHARED_PATH: Optional[str] = None # e.g. "/tmp/bhavya_principals.db" to share across workers
     
     # Database
+    DB_PROFILE: Optional[str] = None # "sqlite" or "postgres"; inferred from SQLALCHEMY_DATABASE_URI when unset
     POSTGRES_SERVER: str = "localhost"
+    POSTGRES_PORT: int = 5432
     POSTGRES_USER: str = "postgres"
     POSTGRES_PASSWORD: str = "password"
     POSTGRES_DB: str = "bhavya"
     SQLALCHEMY_DATABASE_URI: Optional[str] = None
 
+    # SQLite profile (applied to every new connection)
+    SQLITE_PATH: str = "./sql_app.db"
+    SQLITE_WAL: bool = True # Readers no longer block the writer
+    SQLITE_SYNCHRONOUS: str = "NORMAL" # NORMAL is durable in WAL mode except on power loss
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE_KB: int = 64 * 1024
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+
+    # Postgres profile (connection pool)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_S: float = 30.0
+    DB_POOL_RECYCLE_S: int = 1800
+    DB_POOL_PRE_PING: bool = True
+
+    # Bulk ingestion
+    INGEST_BULK_INSERT_ROWS: int = 1000 # Rows per multi-row INSERT
+    INGEST_BULK_COMMIT_ROWS: int = 10000 # Rows per transaction
+    INGEST_BULK_MAX_RECORD_BYTES: int = 1_000_000 # Longest record (array element / NDJSON line) buffered while streaming
+
+    # Write-behind ingestion queue
+    INGEST_QUEUE_MAX_SIZE: int = 10000
+    INGEST_QUEUE_FLUSH_ROWS: int = 500
+    INGEST_QUEUE_FLUSH_INTERVAL_MS: float = 200.0
+    INGEST_QUEUE_FULL_POLICY: str = "reject" # "reject" (429) or "block"
+    INGEST_QUEUE_BLOCK_TIMEOUT_S: float = 2.0
+    # Failed flushes: transient DB errors are retried with backoff; rows rejected by the database
+    # (or still failing at shutdown) go to the dead-letter file and are replayed on the next start
+    INGEST_QUEUE_RETRY_BASE_MS: float = 100.0
+    INGEST_QUEUE_RETRY_MAX_MS: float = 5000.0
+    INGEST_QUEUE_STOP_RETRIES: int = 3
+    INGEST_DEAD_LETTER_PATH: Optional[str] = "ingest_dead_letters.jsonl"
+
+    # Model registry
+    RISK_MODEL_PATH: str = "services/inference/studentlife_model_v1.pt"
+    EEV_MODEL_PATH: Optional[str] = None
+    MODEL_INIT_SEED: int = 42
+    MODEL_WARMUP: bool = True
+    # Exported TorchScript artifacts (see services/optimization/export.py); eager weights are used when unset
+    MODEL_ARTIFACT_DIR: str = "services/inference/artifacts"
+    RISK_MODEL_ARTIFACT: Optional[str] = None
+    EEV_MODEL_ARTIFACT: Optional[str] = None
+
+    # Risk inference ("window" replays the last RISK_HISTORY_DAYS; "stateful" steps cached LSTM state one
+    # day at a time, so its state is cumulative from the last re-anchor rather than a fixed window)
+    RISK_INFERENCE_MODE: str = "window"
+    RISK_HISTORY_DAYS: int = 7
+    RISK_STATE_CACHE_MAX_ENTRIES: int = 10000
+    RISK_STATE_SPILL_DIR: Optional[str] = "risk_state_cache" # Created on the first spill (stateful mode only)
+    RISK_CACHE_ENABLED: bool = True
+    RISK_CACHE_MAX_ENTRIES: int = 10000
+    RISK_CACHE_TTL_SECONDS: float = 300.0
+    # Tiered risk inference: the RandomForest from services/optimization/baseline.py answers when the
+    # LSTM is saturated or slower than the request's budget (no budget: LSTM unless saturated)
+    RISK_BASELINE_PATH: str = "services/inference/risk_baseline_rf.joblib"
+    RISK_LATENCY_BUDGET_MS: Optional[float] = None
+    RISK_LATENCY_EWMA_ALPHA: float = 0.2
+    RISK_LSTM_PROBE_EVERY: int = 20
+
+    # Affective inference batching
+    AFFECTIVE_BATCH_MAX_SIZE: int = 32
+    AFFECTIVE_BATCH_MAX_WAIT_MS: float = 5.0
+    AFFECTIVE_SIM_SEED: Optional[int] = None
+
+    # Inference executor (CPU-bound model work from async routes)
+    INFERENCE_EXECUTOR_WORKERS: int = 2
+    INFERENCE_EXECUTOR_MAX_PENDING: int = 64
+    INFERENCE_EXECUTOR_TIMEOUT_S: float = 5.0
+
+    # Streaming video analysis
+    VIDEO_FRAME_WIDTH: int = 64
+    VIDEO_FRAME_HEIGHT: int = 64
+    VIDEO_NPU_BATCH_SIZE: int = 16
+    VIDEO_DECODE_WORKERS: int = 2
+    VIDEO_MAX_PENDING_FRAMES: int = 64
+    VIDEO_WINDOW_FRAMES: int = 30
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         if not self.SQLALCHEMY_DATABASE_URI:
-            # Fallback to SQLite if no Postgres URI is provided or configured
-            # self.SQLALCHEMY_DATABASE_URI = f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_SERVER}/{self.POSTGRES_DB}"
-            self.SQLALCHEMY_DATABASE_URI = "sqlite:///./sql_app.db"
+            if self.DB_PROFILE == "postgres":
+                self.SQLALCHEMY_DATABASE_URI = (
+                    f"postgresql://{quote_plus(self.POSTGRES_USER)}:{quote_plus(self.POSTGRES_PASSWORD)}"
+                    f"@{self.POSTGRES_SERVER}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
+                )
+            else:
+                # Fallback to SQLite if no Postgres URI is provided or configured
+                self.SQLALCHEMY_DATABASE_URI = f"sqlite:///{self.SQLITE_PATH}"
+        if not self.DB_PROFILE:
+            self.DB_PROFILE = "postgres" if self.SQLALCHEMY_DATABASE_URI.startswith("postgresql") else "sqlite"
+        if self.DB_PROFILE not in ("sqlite", "postgres"):
+            raise ValueError(f"Unknown DB_PROFILE '{self.DB_PROFILE}' (expected 'sqlite' or 'postgres')")
 
     class Config:
         case_sensitive = True
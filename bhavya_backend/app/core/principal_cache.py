@@ -0,0 +1,163 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.config import settings
+from app.db import models
+
+# Columns snapshotted for a cached principal (everything a route reads off current_user).
+# Never the password hash: login re-reads the user from the DB, and the shared store is a plain file.
+USER_COLUMNS = ("id", "username", "email", "full_name", "bio", "location", "is_active", "created_at")
+
+
+def _snapshot(user):
+    data = {col: getattr(user, col) for col in USER_COLUMNS}
+    if isinstance(data["created_at"], datetime):
+        data["created_at"] = data["created_at"].isoformat()
+    return data
+
+
+class SharedPrincipalStore:
+    def __init__(self, path):
+        """
+        Local stand-in for a cross-worker cache (Redis/memcached):
+        a small SQLite file that every worker process on the host opens.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=1.0)
+        os.chmod(path, 0o600) # Owner only, even in a shared temp directory
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # Snapshots written by older versions included the password hash
+        self._conn.execute("DROP TABLE IF EXISTS principals")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS principals_v2 (subject TEXT PRIMARY KEY, data TEXT, expires_at REAL)"
+        )
+
+    def get(self, subject):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, expires_at FROM principals_v2 WHERE subject = ?", (subject,)
+            ).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return json.loads(row[0])
+
+    def set(self, subject, data, ttl):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO principals_v2 (subject, data, expires_at) VALUES (?, ?, ?)",
+                (subject, json.dumps(data), time.time() + ttl),
+            )
+
+    def delete(self, subject):
+        with self._lock:
+            self._conn.execute("DELETE FROM principals_v2 WHERE subject = ?", (subject,))
+
+
+class PrincipalCache:
+    def __init__(self, max_entries=10000, ttl_seconds=60.0, shared_store=None, enabled=True):
+        """
+        Bounded, TTL-limited cache of authenticated users keyed by token subject,
+        so get_current_user can skip the User query on every protected call.
+        An optional shared store lets worker processes reuse each other's lookups;
+        invalidations delete from both tiers (other workers' local tier expires within the TTL).
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self.shared_store = shared_store
+        self.enabled = enabled
+        self._entries = OrderedDict() # subject -> (expires_at, snapshot)
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, subject):
+        """Returns the cached column snapshot for `subject`, or None."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(subject)
+            if entry is not None and entry[0] >= time.monotonic():
+                self._entries.move_to_end(subject)
+                self.hits += 1
+                return entry[1]
+
+        data = self.shared_store.get(subject) if self.shared_store else None
+        if data is not None:
+            self._put_local(subject, data)
+            self.shared_hits += 1
+            return data
+
+        self.misses += 1
+        return None
+
+    def put(self, subject, user):
+        if not self.enabled:
+            return
+        data = _snapshot(user)
+        self._put_local(subject, data)
+        if self.shared_store:
+            self.shared_store.set(subject, data, self.ttl)
+
+    def invalidate(self, subject):
+        with self._lock:
+            self._entries.pop(subject, None)
+        if self.shared_store:
+            self.shared_store.delete(subject)
+        self.invalidations += 1
+
+    def attach(self, db, data):
+        """
+        Rebuilds a session-bound User from a snapshot without querying,
+        so routes can still modify and commit current_user.
+        Columns outside the snapshot (hashed_password) stay unloaded: they are read from
+        the DB on access and never overwritten by a commit.
+        """
+        data = {col: data[col] for col in USER_COLUMNS if col in data}
+        if isinstance(data["created_at"], str):
+            data["created_at"] = datetime.fromisoformat(data["created_at"])
+        user = models.User(**data)
+        make_transient_to_detached(user)
+        return db.merge(user, load=False)
+
+    def stats(self):
+        lookups = self.hits + self.shared_hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "shared": self.shared_store is not None,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.shared_hits) / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+    def _put_local(self, subject, data):
+        with self._lock:
+            self._entries[subject] = (time.monotonic() + self.ttl, data)
+            self._entries.move_to_end(subject)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+# Singleton instance
+principal_cache = PrincipalCache(
+    max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    shared_store=SharedPrincipalStore(settings.PRINCIPAL_CACHE_SHARED_PATH) if settings.PRINCIPAL_CACHE_SHARED_PATH else None,
+    enabled=settings.PRINCIPAL_CACHE_ENABLED,
+)
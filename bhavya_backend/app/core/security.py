@@ -1,10 +1,29 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any, Union
+from typing import Any, Optional, Tuple, Union
+from fastapi.concurrency import run_in_threadpool
 from jose import jwt
 from passlib.context import CryptContext
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+_contexts = {}
+_hash_pool = None
+
+def _crypt_context(rounds: int) -> CryptContext:
+    # min == max == default rounds: any hash made with a different cost is flagged for upgrade
+    if rounds not in _contexts:
+        _contexts[rounds] = CryptContext(
+            schemes=["pbkdf2_sha256"],
+            deprecated="auto",
+            pbkdf2_sha256__default_rounds=rounds,
+            pbkdf2_sha256__min_rounds=rounds,
+            pbkdf2_sha256__max_rounds=rounds,
+        )
+    return _contexts[rounds]
+
+pwd_context = _crypt_context(settings.PASSWORD_HASH_ROUNDS)
 
 def create_access_token(subject: Union[str, Any], expires_delta: timedelta = None) -> str:
     if expires_delta:
@@ -21,3 +40,50 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
+
+def _verify_and_update(plain_password: str, hashed_password: str, rounds: int) -> Tuple[bool, Optional[str]]:
+    # Runs in the hashing pool. Returns (valid, new_hash); new_hash is set when the stored cost is outdated
+    return _crypt_context(rounds).verify_and_update(plain_password, hashed_password)
+
+def _hash(password: str, rounds: int) -> str:
+    return _crypt_context(rounds).hash(password)
+
+def _get_hash_pool() -> Optional[ProcessPoolExecutor]:
+    global _hash_pool
+    if settings.PASSWORD_HASH_WORKERS <= 0:
+        return None
+    if _hash_pool is None:
+        # spawn: the server is multi-threaded (event loop, threadpools, torch, batcher), and forking
+        # it can leave a worker holding a copy of a lock no thread will ever release
+        _hash_pool = ProcessPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _hash_pool
+
+def start_hash_pool():
+    # Called at startup, so the first login doesn't pay for the pool
+    _get_hash_pool()
+
+async def _run_hashing(fn, *args):
+    """
+    Password hashing is CPU-bound: run it on the dedicated, size-limited process pool
+    so a login burst can't occupy FastAPI's shared threadpool.
+    PASSWORD_HASH_WORKERS=0 falls back to the shared threadpool.
+    """
+    pool = _get_hash_pool()
+    if pool is None:
+        return await run_in_threadpool(fn, *args)
+    return await asyncio.wrap_future(pool.submit(fn, *args))
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return await _run_hashing(_verify_and_update, plain_password, hashed_password, settings.PASSWORD_HASH_ROUNDS)
+
+async def get_password_hash_async(password: str) -> str:
+    return await _run_hashing(_hash, password, settings.PASSWORD_HASH_ROUNDS)
+
+def shutdown_hash_pool():
+    global _hash_pool
+    if _hash_pool is not None:
+        _hash_pool.shutdown(wait=True)
+        _hash_pool = None
@@ -1,11 +1,73 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
 
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URI)
+# Async driver for each sync URL scheme (aiosqlite locally, asyncpg for Postgres)
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+def async_database_uri(uri: str) -> str:
+    url = make_url(uri)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{backend}'")
+    return url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+def engine_options(config=settings) -> dict:
+    """create_engine keyword arguments for the configured DB_PROFILE."""
+    if config.DB_PROFILE == "postgres":
+        return {
+            "pool_size": config.DB_POOL_SIZE,
+            "max_overflow": config.DB_MAX_OVERFLOW,
+            "pool_timeout": config.DB_POOL_TIMEOUT_S,
+            "pool_recycle": config.DB_POOL_RECYCLE_S,
+            "pool_pre_ping": config.DB_POOL_PRE_PING,
+        }
+    # The driver-level lock wait matches PRAGMA busy_timeout
+    return {"connect_args": {"timeout": config.SQLITE_BUSY_TIMEOUT_MS / 1000.0}}
+
+def install_sqlite_pragmas(sync_engine, config=settings):
+    """Applies the SQLite profile to every new DBAPI connection of `sync_engine`."""
+    database = sync_engine.url.database
+    on_disk = bool(database) and database != ":memory:"
+
+    @event.listens_for(sync_engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if on_disk:
+            # Persistent per database file; memory databases have no WAL or mmap
+            cursor.execute(f"PRAGMA journal_mode={'WAL' if config.SQLITE_WAL else 'DELETE'}")
+            cursor.execute(f"PRAGMA mmap_size={int(config.SQLITE_MMAP_SIZE)}")
+        cursor.execute(f"PRAGMA synchronous={config.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA cache_size={-int(config.SQLITE_CACHE_SIZE_KB)}") # negative = KiB
+        cursor.execute(f"PRAGMA busy_timeout={int(config.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.close()
+
+def create_db_engine(config=settings):
+    engine = create_engine(config.SQLALCHEMY_DATABASE_URI, **engine_options(config))
+    if config.DB_PROFILE == "sqlite":
+        install_sqlite_pragmas(engine, config)
+    return engine
+
+def create_async_db_engine(config=settings):
+    async_uri = async_database_uri(config.SQLALCHEMY_DATABASE_URI)
+    engine = create_async_engine(async_uri, **engine_options(config))
+    if config.DB_PROFILE == "sqlite":
+        install_sqlite_pragmas(engine.sync_engine, config)
+    return engine
+
+engine = create_db_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Same database through an async driver, for routers that await their queries
+async_engine = create_async_db_engine()
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 def get_db():
@@ -14,3 +76,7 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,71 @@
+import json
+from datetime import datetime
+from sqlalchemy import inspect, text
+from app.db.base import Base
+
+def _add_checkin_date(conn):
+    # Backfill the stored check-in day from the timestamp, as a UTC day like the write path (checkin._today).
+    # SQLite's date() converts any stored offset to UTC (server-default timestamps are already UTC).
+    if conn.dialect.name == "sqlite":
+        backfill = "UPDATE daily_checkins SET checkin_date = date(timestamp)"
+    else:
+        backfill = "UPDATE daily_checkins SET checkin_date = CAST(timestamp AT TIME ZONE 'UTC' AS DATE)"
+    conn.execute(text("ALTER TABLE daily_checkins ADD COLUMN checkin_date DATE"))
+    conn.execute(text(backfill))
+    # Older databases could hold several check-ins per day: keep the first one dated so the unique index can build
+    conn.execute(text(
+        "UPDATE daily_checkins SET checkin_date = NULL WHERE id NOT IN "
+        "(SELECT MIN(id) FROM daily_checkins GROUP BY user_id, checkin_date)"
+    ))
+    print("[Migrations] Added daily_checkins.checkin_date")
+
+def _add_sample_dates(conn):
+    # Backfill the sample day range from each payload (same rules as the feature store)
+    from services.features.store import feature_store
+    conn.execute(text("ALTER TABLE behavioral_raw ADD COLUMN first_sample_date DATE"))
+    conn.execute(text("ALTER TABLE behavioral_raw ADD COLUMN last_sample_date DATE"))
+    raws = conn.execute(text("SELECT id, data_type, payload, timestamp FROM behavioral_raw")).mappings().all()
+    updates = []
+    for raw in raws:
+        record = dict(raw)
+        if isinstance(record["payload"], str):
+            record["payload"] = json.loads(record["payload"])
+        if isinstance(record["timestamp"], str):
+            record["timestamp"] = datetime.fromisoformat(record["timestamp"])
+        try:
+            first, last = feature_store.sample_range(record)
+        except ValueError:
+            continue # Malformed sample dates: never feed the feature store
+        if first is not None:
+            updates.append({"id": raw["id"], "first": first, "last": last})
+    if updates:
+        conn.execute(
+            text("UPDATE behavioral_raw SET first_sample_date = :first, last_sample_date = :last WHERE id = :id"),
+            updates,
+        )
+    print(f"[Migrations] Added behavioral_raw.first/last_sample_date ({len(updates)} rows backfilled)")
+
+def upgrade(engine):
+    """
+    Brings an existing database (e.g. an old sql_app.db) up to the current schema.
+    create_all only creates missing tables, so new columns and indexes on existing
+    tables are added here. Safe to run on every startup.
+    """
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+
+    with engine.begin() as conn:
+        if "daily_checkins" in tables:
+            columns = {col["name"] for col in inspector.get_columns("daily_checkins")}
+            if "checkin_date" not in columns:
+                _add_checkin_date(conn)
+
+        if "behavioral_raw" in tables:
+            columns = {col["name"] for col in inspector.get_columns("behavioral_raw")}
+            if "last_sample_date" not in columns:
+                _add_sample_dates(conn)
+
+        # Every index declared on the models (composite (user_id, time) indexes etc.)
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=conn, checkfirst=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Float, DateTime, Text, JSON
+from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Float, Date, DateTime, Text, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.base import Base
@@ -46,6 +46,10 @@ class JournalEntry(Base):
 
     user = relationship("User", back_populates="journal_entries")
 
+    __table_args__ = (
+        Index("ix_journal_entries_user_timestamp", "user_id", "timestamp"),
+    )
+
 class BehavioralRaw(Base):
     __tablename__ = "behavioral_raw"
 
@@ -54,19 +58,32 @@ class BehavioralRaw(Base):
     data_type = Column(String) # e.g., 'sleep', 'activity', 'keystroke'
     payload = Column(JSON) # Raw data
     timestamp = Column(DateTime(timezone=True), server_default=func.now())
+    # Days of the earliest / latest sample in the payload (not the ingestion time; offline uploads arrive late)
+    first_sample_date = Column(Date)
+    last_sample_date = Column(Date)
 
     user = relationship("User", back_populates="behavioral_raw")
 
+    __table_args__ = (
+        Index("ix_behavioral_raw_user_timestamp", "user_id", "timestamp"),
+        Index("ix_behavioral_raw_user_last_sample_date", "user_id", "last_sample_date"),
+    )
+
 class BehavioralFeatures(Base):
     __tablename__ = "behavioral_features"
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
-    date = Column(DateTime(timezone=True))
+    date = Column(DateTime(timezone=True)) # Day start (one row per user per day)
     feature_vector = Column(JSON) # Computed features
     
     user = relationship("User", back_populates="behavioral_features")
 
+    __table_args__ = (
+        # "Last N days for user X" range reads
+        Index("ix_behavioral_features_user_date", "user_id", "date", unique=True),
+    )
+
 class ModelOutput(Base):
     __tablename__ = "model_outputs"
 
@@ -91,12 +108,17 @@ class Insight(Base):
 
     user = relationship("User", back_populates="insights")
 
+    __table_args__ = (
+        Index("ix_insights_user_generated_at", "user_id", "generated_at"),
+    )
+
 class DailyCheckIn(Base):
     __tablename__ = "daily_checkins"
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     timestamp = Column(DateTime(timezone=True), server_default=func.now())
+    checkin_date = Column(Date) # UTC day of the check-in; one per user per day
     
     # Clinical Questions (0-3 scale)
     q_sleep_issue = Column(Integer)
@@ -112,5 +134,10 @@ class DailyCheckIn(Base):
 
     user = relationship("User", back_populates="daily_checkins")
 
+    __table_args__ = (
+        # Enforces one check-in per day and serves the "today's check-in" lookup
+        Index("uq_daily_checkins_user_date", "user_id", "checkin_date", unique=True),
+    )
+
 # Update User relationship
 User.daily_checkins = relationship("DailyCheckIn", back_populates="user")
@@ -3,9 +3,11 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.api import users, auth, ingestion, chat, journal, checkin, insights, affective
 from app.core.config import settings
 from app.db.base import Base, engine
+from app.db.migrations import upgrade
 
-# Create tables
+# Create tables, then bring existing databases up to the current schema
 Base.metadata.create_all(bind=engine)
+upgrade(engine)
 
 app = FastAPI(title=settings.PROJECT_NAME, openapi_url=f"{settings.API_V1_STR}/openapi.json")
 
@@ -24,6 +26,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"], # Keyset pagination token
 )
 
 # Include Routers
@@ -39,3 +42,57 @@ app.include_router(affective.router, prefix="/api/affective", tags=["affective"]
 @app.get("/")
 def root():
     return {"message": "Welcome to BHAVYA Backend"}
+
+@app.on_event("startup")
+def load_models():
+    # Load and warm up every model once per process before serving traffic
+    from services.inference.registry import registry
+    registry.load_all()
+
+@app.on_event("startup")
+def start_hash_pool():
+    from app.core.security import start_hash_pool
+    start_hash_pool()
+
+@app.on_event("startup")
+def start_ingest_queue():
+    from services.data.write_behind import ingest_queue
+    ingest_queue.start()
+
+@app.on_event("shutdown")
+def drain_ingest_queue():
+    # Flush everything still queued before the process exits
+    from services.data.write_behind import ingest_queue
+    ingest_queue.stop()
+
+@app.on_event("shutdown")
+def stop_hash_pool():
+    from app.core.security import shutdown_hash_pool
+    shutdown_hash_pool()
+
+@app.on_event("shutdown")
+async def close_async_resources():
+    from services.inference.executor import inference_executor
+    from app.db.base import async_engine
+    inference_executor.shutdown()
+    await async_engine.dispose()
+
+@app.get("/metrics")
+def metrics():
+    from services.affective_engine.batcher import affective_batcher
+    from services.inference.registry import registry
+    from services.inference.predictor import predictor
+    from services.data.write_behind import ingest_queue
+    from app.core.principal_cache import principal_cache
+    from services.inference.executor import inference_executor
+    from services.inference.tiering import risk_tiers
+    return {
+        "principal_cache": principal_cache.stats(),
+        "ingest_queue": ingest_queue.stats(),
+        "models": registry.stats(),
+        "risk_cache": predictor.cache.stats(),
+        "risk_state_cache": predictor.state_cache.stats(),
+        "affective_batcher": affective_batcher.stats(),
+        "inference_executor": inference_executor.stats(),
+        "risk_tiers": risk_tiers.stats(),
+    }
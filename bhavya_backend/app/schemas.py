@@ -51,6 +51,25 @@ class MoodLog(MoodLogCreate):
 class DataIngestion(BaseModel):
     data_type: str
     payload: Any
+    timestamp: Optional[datetime] = None # Sample time; defaults to receipt time
+
+class BehavioralRawRecord(BaseModel):
+    id: int
+    data_type: str
+    payload: Any
+    timestamp: datetime
+
+    class Config:
+        from_attributes = True
+
+class BulkIngestionReject(BaseModel):
+    index: int
+    error: str
+
+class BulkIngestionResult(BaseModel):
+    accepted: int
+    rejected: int
+    rejects: List[BulkIngestionReject]
 
 # Insight
 class Insight(BaseModel):
@@ -95,6 +114,7 @@ class RiskData(BaseModel):
     score: int
     label: str
     factors: List[RiskFactor]
+    tier: str = "lstm" # Model that answered: "lstm" or "baseline"
 
 # Daily Check-In
 class DailyCheckInCreate(BaseModel):
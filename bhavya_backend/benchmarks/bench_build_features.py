@@ -0,0 +1,108 @@
+import multiprocessing as mp
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from services.data.raw_generator import generate_raw_data
+from services.features.build_features import FEATURE_COLUMNS, build_features
+
+SOURCES = ["sleep", "activity", "gps", "survey"]
+SCALES = [1, 10, 100]
+LEGACY_MAX_SCALE = 10 # The row-wise reference takes minutes beyond this
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError: # Windows
+        return float("nan")
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def tile_dataset(base_dir, out_dir, scale):
+    """Scales the generator's output by repeating every user `scale` times under new uids."""
+    os.makedirs(out_dir, exist_ok=True)
+    for source in SOURCES:
+        base = pd.read_csv(os.path.join(base_dir, f"{source}.csv"))
+        path = os.path.join(out_dir, f"{source}.csv")
+        for k in range(scale):
+            copy = base.assign(uid=base["uid"] + f"r{k:03d}")
+            copy.to_csv(path, mode="w" if k == 0 else "a", header=(k == 0), index=False)
+
+
+def legacy_build(data_dir):
+    """The previous implementation (full read_csv + row-wise apply), kept as the reference."""
+    sleep = pd.read_csv(os.path.join(data_dir, "sleep.csv"))
+    activity = pd.read_csv(os.path.join(data_dir, "activity.csv"))
+    gps = pd.read_csv(os.path.join(data_dir, "gps.csv"))
+    survey = pd.read_csv(os.path.join(data_dir, "survey.csv"))
+
+    def calculate_midpoint(row):
+        mid = pd.to_datetime(row['start_time']) + pd.Timedelta(hours=row['duration'] / 2)
+        return mid.hour + mid.minute / 60.0
+
+    sleep['sleep_midpoint'] = sleep.apply(calculate_midpoint, axis=1)
+    sleep_daily = sleep.groupby(['uid', 'date']).agg(
+        {'duration': 'sum', 'sleep_midpoint': 'first'}
+    ).reset_index().rename(columns={'duration': 'sleep_duration'})
+
+    activity['date'] = pd.to_datetime(activity['timestamp']).dt.date.astype(str)
+    activity_daily = activity.groupby(['uid', 'date']).agg({'activity_inference': ['sum', 'std']}).reset_index()
+    activity_daily.columns = ['uid', 'date', 'activity_level', 'activity_variance']
+    activity_daily['activity_variance'] = activity_daily['activity_variance'].fillna(0)
+
+    gps['date'] = pd.to_datetime(gps['timestamp']).dt.date.astype(str)
+    routine_daily = gps.groupby(['uid', 'date']).agg({'location_id': 'nunique'}).reset_index().rename(
+        columns={'location_id': 'routine_change'})
+
+    features = survey.rename(columns={'answer': 'stress_label'})[['uid', 'date', 'stress_label']]
+    for daily in (sleep_daily, activity_daily, routine_daily):
+        features = features.merge(daily, on=['uid', 'date'], how='left')
+    return features.fillna({col: 0 for col in FEATURE_COLUMNS})
+
+
+def _run(kind, data_dir, out_dir):
+    start = time.perf_counter()
+    if kind == "legacy":
+        features = legacy_build(data_dir)
+    else:
+        features = build_features(data_dir, output_path=os.path.join(out_dir, "features.csv"))
+    return time.perf_counter() - start, peak_rss_mb(), features
+
+
+def run_isolated(kind, data_dir, out_dir):
+    # Fresh process per run so peak RSS is not inherited from earlier cases
+    with mp.get_context("spawn").Pool(1) as pool:
+        return pool.apply(_run, (kind, data_dir, out_dir))
+
+
+def run_benchmark(scales=SCALES):
+    print("--- build_features: chunked/vectorized vs. legacy row-wise ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        base_dir = os.path.join(tmp, "base")
+        generate_raw_data(base_dir)
+
+        for scale in scales:
+            data_dir = os.path.join(tmp, f"x{scale}")
+            tile_dataset(base_dir, data_dir, scale)
+            raw_rows = sum(len(pd.read_csv(os.path.join(data_dir, f"{s}.csv"), usecols=[0])) for s in SOURCES)
+
+            elapsed, rss, features = run_isolated("chunked", data_dir, tmp)
+            line = f"{scale:>4}x ({raw_rows:>9,} raw rows) | chunked {elapsed:7.2f} s, peak RSS {rss:7.1f} MB"
+
+            if scale <= LEGACY_MAX_SCALE:
+                legacy_elapsed, legacy_rss, reference = run_isolated("legacy", data_dir, tmp)
+                parity = all(
+                    np.allclose(features[col].to_numpy(float), reference[col].to_numpy(float))
+                    for col in FEATURE_COLUMNS
+                )
+                line += (f" | legacy {legacy_elapsed:7.2f} s, peak RSS {legacy_rss:7.1f} MB"
+                         f" | speedup {legacy_elapsed / elapsed:5.1f}x | parity {'ok' if parity else 'MISMATCH'}")
+            print(line)
+
+
+if __name__ == "__main__":
+    run_benchmark()
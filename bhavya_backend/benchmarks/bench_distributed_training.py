@@ -0,0 +1,55 @@
+import os
+import time
+
+import torch
+import torch.distributed as dist
+import torch.multiprocessing as mp
+from torch.utils.data import TensorDataset
+
+from services.optimization.distributed import distributed_loader, launch
+from services.optimization.trainer import ModelTrainer
+
+NUM_SAMPLES = 100_000
+SEQ_LEN = 7
+BATCH_SIZE = 64
+EPOCHS = 2
+
+
+def synthetic_dataset(seed=0):
+    generator = torch.Generator().manual_seed(seed)
+    X = torch.randn(NUM_SAMPLES, SEQ_LEN, 5, generator=generator)
+    y = (torch.rand(NUM_SAMPLES, generator=generator) > 0.5).float()
+    return TensorDataset(X, y)
+
+
+def bench_worker(rank, world_size, results):
+    trainer = ModelTrainer(model_type="lstm", input_dim=5, hidden_dim=32)
+    trainer.distribute()
+    loader = distributed_loader(synthetic_dataset(), batch_size=BATCH_SIZE)
+
+    dist.barrier()
+    start = time.perf_counter()
+    trainer.train(loader, epochs=EPOCHS)
+    dist.barrier()
+    if rank == 0:
+        results.put(NUM_SAMPLES * EPOCHS / (time.perf_counter() - start))
+
+
+def run_benchmark(max_workers=None):
+    """Global training samples/sec (LSTM, synthetic windows) for 1, 2, 4, ... local processes."""
+    max_workers = max_workers or os.cpu_count() or 1
+    sizes = sorted({1, *[2 ** k for k in range(1, max_workers.bit_length()) if 2 ** k <= max_workers], max_workers})
+    results = mp.get_context("spawn").SimpleQueue()
+
+    print(f"--- Data-Parallel Training Scaling ({NUM_SAMPLES} samples x {EPOCHS} epochs, batch {BATCH_SIZE}/rank) ---")
+    baseline = None
+    for world_size in sizes:
+        launch(bench_worker, world_size, results)
+        rate = results.get()
+        baseline = baseline or rate
+        print(f"{world_size:>3} ranks | {rate:10.0f} samples/s | speedup {rate / baseline:5.2f}x "
+              f"| efficiency {rate / baseline / world_size:6.1%}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,55 @@
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from torch.utils.data import DataLoader
+
+from services.affective_engine.eev_loader import EEVDataset, EEVIterableDataset
+
+EMOTIONS = [
+    "amusement", "anger", "awe", "concentration", "confusion", "contempt", "contentment",
+    "disappointment", "doubt", "elation", "interest", "pain", "sadness", "surprise", "triumph",
+]
+
+
+def write_annotations(data_dir, num_files=200, videos_per_file=10, frames_per_video=600, seed=0):
+    """EEV-shaped CSVs: Video ID, Timestamp (milliseconds), 15 emotion scores."""
+    rng = np.random.default_rng(seed)
+    os.makedirs(data_dir, exist_ok=True)
+    for f in range(num_files):
+        n = videos_per_file * frames_per_video
+        frame = pd.DataFrame(rng.random((n, len(EMOTIONS)), dtype=np.float32), columns=EMOTIONS)
+        frame.insert(0, "Timestamp (milliseconds)", np.tile(np.arange(frames_per_video) * 166_667, videos_per_file))
+        frame.insert(0, "Video ID", np.repeat([f"v{f:04d}_{v:02d}" for v in range(videos_per_file)], frames_per_video))
+        frame.to_csv(os.path.join(data_dir, f"eev_{f:04d}.csv"), index=False)
+
+
+def epoch(loader):
+    start = time.perf_counter()
+    n = sum(len(y) for _, y in loader)
+    return n / (time.perf_counter() - start)
+
+
+def run_benchmark(workers=(0, 2, 4)):
+    print("--- EEV Loader: one-time conversion, then windows from the mmap store ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = os.path.join(tmp, "eev")
+        write_annotations(data_dir)
+
+        start = time.perf_counter()
+        dataset = EEVDataset(data_dir)
+        print(f"first open (CSV -> store) {time.perf_counter() - start:6.2f} s")
+        start = time.perf_counter()
+        dataset = EEVDataset(data_dir)
+        print(f"reopen (mmap only)        {time.perf_counter() - start:6.2f} s | {len(dataset)} windows")
+
+        for n in workers:
+            mapped = DataLoader(dataset, batch_size=256, shuffle=True, num_workers=n)
+            streamed = DataLoader(EEVIterableDataset(data_dir, shuffle=True), batch_size=256, num_workers=n)
+            print(f"workers {n} | map-style {epoch(mapped):10.0f} windows/s | iterable {epoch(streamed):10.0f} windows/s")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,110 @@
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+PORT = 8766
+BASE_URL = f"http://127.0.0.1:{PORT}"
+
+
+def start_server(env_overrides):
+    env = dict(os.environ, **env_overrides)
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(PORT), "--log-level", "warning"],
+        env=env,
+    )
+    for _ in range(100):
+        try:
+            requests.get(f"{BASE_URL}/", timeout=0.5)
+            return proc
+        except requests.ConnectionError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("Server did not start")
+
+
+def percentile(samples, q):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(q * len(samples)))] if samples else float("nan")
+
+
+def auth_headers():
+    requests.post(f"{BASE_URL}/api/v1/auth/signup",
+                  json={"username": "bench", "email": "bench@example.com", "password": "password123"})
+    r = requests.post(f"{BASE_URL}/api/v1/auth/token", data={"username": "bench", "password": "password123"})
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+def run_case(label, inference_clients, crud_clients, headers, duration=10.0):
+    """
+    Mixed load vs. event-loop responsiveness:
+    `inference_clients` post questionnaires, `crud_clients` write and page journal entries,
+    and one probe requests /docs (an async route served directly on the loop),
+    so its latency tracks event-loop lag.
+    """
+    stop = time.monotonic() + duration
+    counts = {"inference": 0, "crud": 0, "errors": 0}
+    probe_latencies = []
+    lock = threading.Lock()
+
+    def count(kind, ok):
+        with lock:
+            counts[kind if ok else "errors"] += 1
+
+    def inference_client():
+        session = requests.Session()
+        while time.monotonic() < stop:
+            answers = [random.randint(0, 3) for _ in range(10)]
+            r = session.post(f"{BASE_URL}/api/affective/analyze/questions", json={"answers": answers})
+            count("inference", r.status_code == 200)
+
+    def crud_client():
+        session = requests.Session()
+        session.headers.update(headers)
+        while time.monotonic() < stop:
+            r = session.post(f"{BASE_URL}/api/v1/journal/",
+                             json={"title": "bench", "mood": "calm", "content": "x" * 200})
+            count("crud", r.status_code == 200)
+            r = session.get(f"{BASE_URL}/api/v1/journal/", params={"limit": 20})
+            count("crud", r.status_code == 200)
+
+    def probe_client():
+        session = requests.Session()
+        while time.monotonic() < stop:
+            start = time.perf_counter()
+            session.get(f"{BASE_URL}/docs")
+            probe_latencies.append((time.perf_counter() - start) * 1000.0)
+            time.sleep(0.01)
+
+    threads = [threading.Thread(target=inference_client) for _ in range(inference_clients)]
+    threads += [threading.Thread(target=crud_client) for _ in range(crud_clients)]
+    threads.append(threading.Thread(target=probe_client))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    print(f"{label:>16} | inference/s {counts['inference'] / duration:7.1f} | "
+          f"crud/s {counts['crud'] / duration:7.1f} | errors {counts['errors']:5d} | "
+          f"loop probe p50 {percentile(probe_latencies, 0.5):6.1f} ms "
+          f"p99 {percentile(probe_latencies, 0.99):6.1f} ms")
+
+
+if __name__ == "__main__":
+    print("--- Event-Loop Responsiveness under Mixed Inference + CRUD Load ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        proc = start_server({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp}/bench.db"})
+        try:
+            headers = auth_headers()
+            run_case("idle", 0, 0, headers)
+            run_case("crud only", 0, 16, headers)
+            run_case("inference only", 16, 0, headers)
+            run_case("mixed", 16, 16, headers)
+        finally:
+            proc.terminate()
+            proc.wait()
@@ -0,0 +1,89 @@
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+PORT = 8765
+BASE_URL = f"http://127.0.0.1:{PORT}"
+
+
+def start_server(env_overrides):
+    env = dict(os.environ, **env_overrides)
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(PORT), "--log-level", "warning"],
+        env=env,
+    )
+    for _ in range(100):
+        try:
+            requests.get(f"{BASE_URL}/", timeout=0.5)
+            return proc
+        except requests.ConnectionError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("Server did not start")
+
+
+def percentile(samples, q):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(q * len(samples)))] if samples else float("nan")
+
+
+def run_case(hash_workers, login_threads=32, duration=10.0):
+    """
+    Login burst vs. an unrelated endpoint:
+    `login_threads` clients log in as fast as they can while one probe client hits GET /.
+    Reports login throughput and the probe's latency percentiles.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        proc = start_server({
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp}/bench.db",
+            "PASSWORD_HASH_WORKERS": str(hash_workers),
+        })
+        try:
+            requests.post(f"{BASE_URL}/api/v1/auth/signup",
+                          json={"username": "bench", "email": "bench@example.com", "password": "password123"})
+
+            stop = time.monotonic() + duration
+            logins = []
+            probe_latencies = []
+
+            def login_client():
+                session = requests.Session()
+                while time.monotonic() < stop:
+                    r = session.post(f"{BASE_URL}/api/v1/auth/token",
+                                     data={"username": "bench", "password": "password123"})
+                    if r.status_code == 200:
+                        logins.append(1)
+
+            def probe_client():
+                session = requests.Session()
+                while time.monotonic() < stop:
+                    start = time.perf_counter()
+                    session.get(f"{BASE_URL}/")
+                    probe_latencies.append((time.perf_counter() - start) * 1000.0)
+                    time.sleep(0.01)
+
+            threads = [threading.Thread(target=login_client) for _ in range(login_threads)]
+            threads.append(threading.Thread(target=probe_client))
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+            label = "shared threadpool" if hash_workers == 0 else f"{hash_workers} hash processes"
+            print(f"{label:>20} | logins/s {len(logins) / duration:8.1f} | "
+                  f"GET / p50 {percentile(probe_latencies, 0.5):7.1f} ms "
+                  f"p99 {percentile(probe_latencies, 0.99):7.1f} ms")
+        finally:
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == "__main__":
+    print("--- Login Throughput vs. Unrelated Endpoint Tail Latency ---")
+    for workers in [0, 1, 2, max(1, (os.cpu_count() or 2) // 2)]:
+        run_case(workers)
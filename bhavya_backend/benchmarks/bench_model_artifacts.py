@@ -0,0 +1,55 @@
+import time
+import statistics
+
+import torch
+
+from services.optimization.export import MODEL_SPECS, VARIANTS, build_eager, build_variant, check_parity
+
+BATCH_SIZES = [1, 2, 4, 8, 16, 32, 64, 128, 256]
+
+
+def time_forward(model, x, repeats=20, warmup=3):
+    with torch.no_grad():
+        for _ in range(warmup):
+            model(x)
+        samples = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            model(x)
+            samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def run_benchmark(names=None, batch_sizes=BATCH_SIZES, threads=1):
+    """
+    Latency / throughput of eager fp32 vs TorchScript vs int8 TorchScript at each batch size,
+    plus accuracy parity of each exported variant against eager.
+    """
+    torch.set_num_threads(threads)
+    names = names or list(MODEL_SPECS)
+    print(f"--- Inference Artifact Benchmark (torch threads={threads}) ---")
+
+    for name in names:
+        _, shape, _ = MODEL_SPECS[name]
+        models = {"eager": build_eager(name)}
+        for variant in VARIANTS:
+            models[variant] = build_variant(name, variant)
+
+        print(f"\n[{name}] input {shape[1:]}")
+        for variant in VARIANTS:
+            parity = check_parity(models["eager"], models[variant], shape)
+            print(f"  parity {variant:<17} max|diff|={parity['max_abs_diff']:.2e} "
+                  f"label agreement={parity['label_agreement']:.4f}")
+
+        print(f"  {'batch':>5} | " + " | ".join(f"{v:>28}" for v in models))
+        for batch_size in batch_sizes:
+            x = torch.rand(batch_size, *shape[1:])
+            cells = []
+            for model in models.values():
+                latency = time_forward(model, x)
+                cells.append(f"{latency * 1000:8.3f} ms {batch_size / latency:10.0f}/s")
+            print(f"  {batch_size:>5} | " + " | ".join(f"{c:>28}" for c in cells))
+
+
+if __name__ == "__main__":
+    run_benchmark()
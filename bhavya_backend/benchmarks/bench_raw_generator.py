@@ -0,0 +1,35 @@
+import os
+import tempfile
+import time
+
+from services.data.raw_generator import generate_raw_data
+
+CASES = [
+    # (users, days, workers)
+    (1000, 365, 1),
+    (10000, 365, 1),
+    (10000, 365, max(1, os.cpu_count() or 1)),
+    (100000, 365, max(1, os.cpu_count() or 1)),
+]
+
+
+def dir_size_mb(path):
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path)) / 2 ** 20
+
+
+def run_benchmark(cases=CASES, fmt="csv"):
+    """Wall time and output size of the sharded generator per (users, days, workers)."""
+    print(f"--- Raw Data Generator ({fmt}) ---")
+    for users, days, workers in cases:
+        with tempfile.TemporaryDirectory() as tmp:
+            start = time.perf_counter()
+            generate_raw_data(tmp, num_users=users, days=days, seed=0, workers=workers, fmt=fmt)
+            elapsed = time.perf_counter() - start
+            # sleep + survey: 1/day, activity: 24/day, gps: 7/day
+            rows = users * days * (1 + 24 + 7 + 1)
+            print(f"{users:>7} users x {days} days | workers {workers:2d} | {elapsed:7.1f} s | "
+                  f"{rows / elapsed / 1e6:6.2f} M rows/s | {dir_size_mb(tmp):8.1f} MB")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,53 @@
+import time
+import statistics
+
+import numpy as np
+import torch
+from sklearn.ensemble import RandomForestClassifier
+
+from services.inference.models import BehavioralLSTM
+
+NUM_DAYS = 5000
+SEQ_LEN = 7
+
+
+def time_call(fn, repeats=200, warmup=10):
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return statistics.median(samples), samples[int(0.99 * (len(samples) - 1))]
+
+
+def run_benchmark(threads=1):
+    """Single-request latency of each risk tier: LSTM over a 7-day window vs RandomForest on the last day."""
+    torch.set_num_threads(threads)
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(NUM_DAYS, 5)).astype(np.float32)
+    y = rng.integers(0, 2, size=NUM_DAYS)
+
+    lstm = BehavioralLSTM(input_dim=5, hidden_dim=32, output_dim=1).eval()
+    forest = RandomForestClassifier(n_estimators=100, random_state=42).fit(X, y)
+    window = torch.from_numpy(X[:SEQ_LEN]).unsqueeze(0)
+    last_day = X[SEQ_LEN - 1 : SEQ_LEN]
+
+    def lstm_call():
+        with torch.no_grad():
+            lstm(window).item()
+
+    tiers = {
+        "lstm": lstm_call,
+        "baseline": lambda: forest.predict_proba(last_day)[0, 1],
+    }
+    print(f"--- Risk Tier Latency (1 request, torch threads={threads}) ---")
+    for tier, fn in tiers.items():
+        p50, p99 = time_call(fn)
+        print(f"{tier:>9} | p50 {p50 * 1000:7.3f} ms | p99 {p99 * 1000:7.3f} ms")
+
+
+if __name__ == "__main__":
+    run_benchmark()
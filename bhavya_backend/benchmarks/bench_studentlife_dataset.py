@@ -0,0 +1,78 @@
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import torch
+from torch.utils.data import DataLoader
+
+from services.data.raw_generator import generate_raw_data
+from services.data.studentlife import FEATURE_COLS, StudentLifeDataset
+from services.features.build_features import build_features
+
+
+def legacy_windows(csv_file, seq_len=7):
+    """The previous layout: every window copied into a Python list."""
+    df = pd.read_csv(csv_file)
+    for col in FEATURE_COLS:
+        df[col] = (df[col] - df[col].mean()) / (df[col].std() + 1e-5)
+    samples, labels = [], []
+    for _, group in df.groupby('uid'):
+        group = group.sort_values('date')
+        data = group[FEATURE_COLS].values
+        targets = group['stress_label'].values
+        for i in range(len(data) - seq_len):
+            samples.append(data[i : i + seq_len])
+            labels.append(1.0 if targets[i + seq_len - 1] >= 3 else 0.0)
+    return samples, labels
+
+
+def measure(build):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 2 ** 20
+
+
+def epoch_throughput(dataset, batch_size=256):
+    loader = DataLoader(dataset, batch_size=batch_size, shuffle=True)
+    start = time.perf_counter()
+    n = sum(len(y) for _, y in loader)
+    return n / (time.perf_counter() - start)
+
+
+def run_benchmark(num_users=2000, days=180):
+    print(f"--- StudentLifeDataset: {num_users} users x {days} days ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        generate_raw_data(os.path.join(tmp, "raw"), num_users=num_users, days=days, seed=0)
+        csv_file = os.path.join(tmp, "features.csv")
+        build_features(os.path.join(tmp, "raw"), output_path=csv_file, parquet=False)
+        matrix_mb = num_users * days * len(FEATURE_COLS) * 4 / 2 ** 20
+        print(f"raw feature matrix (float32): {matrix_mb:.1f} MB")
+
+        (samples, _), elapsed, peak = measure(lambda: legacy_windows(csv_file))
+        print(f"{'legacy lists':>16} | build {elapsed:6.2f} s | peak {peak:8.1f} MB | {len(samples)} windows")
+        del samples
+
+        dataset, elapsed, peak = measure(lambda: StudentLifeDataset(csv_file))
+        print(f"{'contiguous':>16} | build {elapsed:6.2f} s | peak {peak:8.1f} MB | "
+              f"{epoch_throughput(dataset):10.0f} samples/s")
+
+        cache_dir = os.path.join(tmp, "cache")
+        StudentLifeDataset(csv_file, cache_dir=cache_dir) # Populate the cache
+        dataset, elapsed, peak = measure(lambda: StudentLifeDataset(csv_file, cache_dir=cache_dir))
+        print(f"{'mmap cache':>16} | build {elapsed:6.2f} s | peak {peak:8.1f} MB | "
+              f"{epoch_throughput(dataset):10.0f} samples/s")
+
+        x, _ = dataset[0]
+        assert np.shares_memory(x.numpy(), dataset.features), "window was copied"
+
+
+if __name__ == "__main__":
+    torch.set_num_threads(1)
+    run_benchmark()
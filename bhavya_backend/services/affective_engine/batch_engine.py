@@ -0,0 +1,66 @@
+import threading
+
+import numpy as np
+
+from services.affective_engine.temporal_model import AffectiveRiskScorer
+from app.core.config import settings
+
+
+class AffectiveBatchEngine:
+    def __init__(self, seq_len=30, noise_std=0.02, seed=None):
+        """
+        Vectorized affective engine.
+        Builds simulated "persistence" sequences for a whole batch of base emotion vectors
+        in one call and scores them (risk, volatility, positive/negative timelines) together.
+        """
+        self.seq_len = seq_len
+        self.noise_std = noise_std
+        self.rng = np.random.default_rng(seed)
+        self._rng_lock = threading.Lock()  # Generator is not thread-safe
+
+    def simulate_sequences(self, base_vectors, seq_len=None, rng=None):
+        """
+        Input: base vectors (B, 15)
+        Output: (B, seq_len, 15) float32 sequences; each frame is the base mood plus
+        small noise, clipped to [0, 1] and renormalised to sum to 1.
+        """
+        base_vectors = np.atleast_2d(np.asarray(base_vectors, dtype=np.float64))
+        seq_len = seq_len or self.seq_len
+        shape = (base_vectors.shape[0], seq_len, base_vectors.shape[1])
+
+        if rng is None:
+            with self._rng_lock:
+                noise = self.rng.normal(0, self.noise_std, shape)
+        else:
+            noise = rng.normal(0, self.noise_std, shape)
+
+        sequences = np.clip(base_vectors[:, None, :] + noise, 0, 1)
+        sequences /= sequences.sum(axis=2, keepdims=True)
+        return sequences.astype(np.float32)
+
+    @staticmethod
+    def score(sequences):
+        """
+        Input: (B, T, 15) sequences
+        Output: dict of batched arrays: risk (B,), volatility (B,), positive (B, T), negative (B, T)
+        """
+        volatility = sequences.std(axis=1).mean(axis=1)
+        neg_mean = sequences[:, :, 11:].mean(axis=(1, 2))
+        return {
+            "risk": AffectiveRiskScorer.risk_from_components(neg_mean, volatility),
+            "volatility": volatility,
+            "positive": sequences[:, :, :6].sum(axis=2),
+            "negative": sequences[:, :, 11:].sum(axis=2),
+        }
+
+    @staticmethod
+    def timeline(positive, negative):
+        """Per-frame timeline for one sequence, in the shape the frontend charts expect."""
+        return [
+            {"time": i, "positive": float(p), "negative": float(n)}
+            for i, (p, n) in enumerate(zip(positive, negative))
+        ]
+
+
+# Singleton instance
+affective_engine = AffectiveBatchEngine(seed=settings.AFFECTIVE_SIM_SEED)
@@ -0,0 +1,126 @@
+import asyncio
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+
+import numpy as np
+import torch
+
+from services.affective_engine.batch_engine import AffectiveBatchEngine
+from services.inference.registry import registry
+from app.core.config import settings
+
+PATTERNS = ["Stable", "Volatile", "Depressive", "Anxious"]
+
+
+class AffectiveBatcher:
+    def __init__(self, model_name="eev_temporal", max_batch_size=32, max_wait_ms=5.0):
+        """
+        Micro-batching layer in front of the EEV Temporal Model.
+        Concurrent callers submit single (seq_len, 15) sequences; a worker thread
+        gathers them for up to `max_wait_ms`, runs one (B, seq_len, 15) forward pass
+        plus a batched risk score, and resolves each caller's future with its own row.
+        """
+        self.model_name = model_name
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.batch_size_counts = Counter()
+        self.total_requests = 0
+        self.total_batches = 0
+
+    def submit(self, sequence):
+        """
+        Queue one emotion sequence (seq_len, 15) for inference.
+        Returns a concurrent.futures.Future resolving to
+        {"pattern", "probs", "risk_score", "volatility", "positive", "negative"}.
+        Sync callers can block on .result(); async callers should use `infer`.
+        """
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((np.asarray(sequence, dtype=np.float32), future))
+        return future
+
+    async def infer(self, sequence):
+        return await asyncio.wrap_future(self.submit(sequence))
+
+    def stats(self):
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "queue_depth": self._queue.qsize(),
+            "total_requests": self.total_requests,
+            "total_batches": self.total_batches,
+            "batch_size_distribution": {str(k): v for k, v in sorted(self.batch_size_counts.items())},
+        }
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="affective-batcher", daemon=True)
+                self._worker.start()
+
+    def _collect(self):
+        # Block for the first request, then gather more until the batch is full or the window closes
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            self._process(batch)
+
+    def _process(self, batch):
+        sequences = [item[0] for item in batch]
+        futures = [item[1] for item in batch]
+        try:
+            batch_np = np.stack(sequences)  # (B, seq_len, 15)
+            model = registry.get(self.model_name)
+            with torch.no_grad():
+                probs = model(torch.from_numpy(batch_np))  # (B, 4)
+            pattern_idx = torch.argmax(probs, dim=1).tolist()
+            scores = AffectiveBatchEngine.score(batch_np)
+        except Exception as e:
+            for future in futures:
+                future.set_exception(e)
+            return
+
+        self.total_requests += len(batch)
+        self.total_batches += 1
+        self.batch_size_counts[len(batch)] += 1
+
+        for i, future in enumerate(futures):
+            future.set_result({
+                "pattern": PATTERNS[pattern_idx[i]],
+                "probs": probs[i].tolist(),
+                "risk_score": float(scores["risk"][i]),
+                "volatility": float(scores["volatility"][i]),
+                "positive": scores["positive"][i],
+                "negative": scores["negative"][i],
+            })
+
+
+# Singleton instance shared by the affective and check-in routers
+affective_batcher = AffectiveBatcher(
+    "eev_temporal",
+    max_batch_size=settings.AFFECTIVE_BATCH_MAX_SIZE,
+    max_wait_ms=settings.AFFECTIVE_BATCH_MAX_WAIT_MS,
+)
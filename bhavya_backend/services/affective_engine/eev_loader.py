@@ -1,43 +1,201 @@
-from torch.utils.data import Dataset, DataLoader
+from torch.utils.data import Dataset, IterableDataset, DataLoader, get_worker_info
 import numpy as np
 import os
+import json
 import pandas as pd
 
+NUM_EMOTIONS = 15
+STORE_VERSION = 1
+
+def pattern_label(seq):
+    """
+    Label: 0=Stable, 1=Volatile, 2=Depressive, 3=Anxious
+    Derived from the window's own statistics (EEV has no pattern annotations).
+    """
+    variance = seq.std()
+    negativity = seq[:, 11:].mean()
+
+    if negativity > 0.4:
+        return 2 # Depressive
+    elif variance > 0.2:
+        return 1 # Volatile
+    return 0 # Stable
+
+
+class EEVStore:
+    def __init__(self, data_dir, store_dir=None, chunk_rows=1_000_000):
+        """
+        Compact, memory-mapped copy of the EEV annotation CSVs.
+        1. Each CSV is parsed once (chunked): first column = video id, last 15 columns = emotions.
+           Rows are normalized to sum 1 (as the simulated loader did) and appended to one
+           float32 (N, 15) file; NaNs become 0.
+        2. Consecutive rows of the same video form a segment: (file index, first row, row count).
+        3. Later opens only memory-map the store; new CSVs are appended, while a changed or
+           removed CSV triggers a full rebuild.
+        Rows are taken in file order, i.e. annotation files are assumed sorted by timestamp per video.
+        """
+        self.data_dir = data_dir
+        self.store_dir = store_dir or os.path.join(data_dir, ".eev_store")
+        self.chunk_rows = chunk_rows
+        self.data_path = os.path.join(self.store_dir, "emotions.f32")
+        self.meta_path = os.path.join(self.store_dir, "meta.json")
+        self._emotions = None
+
+        os.makedirs(self.store_dir, exist_ok=True)
+        self.meta = self._sync()
+        self.files = [entry["name"] for entry in self.meta["files"]]
+        self.segments = np.array(self.meta["segments"], dtype=np.int64).reshape(-1, 3)
+        print(f"[EEV Loader] {len(self.files)} annotation files, {len(self.segments)} videos, "
+              f"{self.meta['rows']} frames in {self.store_dir}")
+
+    @property
+    def emotions(self):
+        # Opened lazily per process, so DataLoader workers map the file instead of receiving a pickled copy
+        if self._emotions is None:
+            rows = self.meta["rows"]
+            if rows == 0:
+                self._emotions = np.zeros((0, NUM_EMOTIONS), dtype=np.float32)
+            else:
+                self._emotions = np.memmap(self.data_path, dtype=np.float32, mode="c", shape=(rows, NUM_EMOTIONS))
+        return self._emotions
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state["_emotions"] = None
+        return state
+
+    def window_starts(self, seq_len, stride=1, files=None):
+        """First rows of every (seq_len, 15) window, segment by segment; optionally only for some file indices."""
+        segments = self.segments
+        if files is not None:
+            segments = segments[np.isin(segments[:, 0], list(files))]
+        per_segment = (np.maximum(segments[:, 2] - seq_len + 1, 0) + stride - 1) // stride
+        first = np.cumsum(per_segment) - per_segment
+        within = np.arange(per_segment.sum(), dtype=np.int64) - np.repeat(first, per_segment)
+        return np.repeat(segments[:, 1], per_segment) + within * stride
+
+    def _sync(self):
+        current = [
+            {"name": name, "size": os.path.getsize(path), "mtime_ns": os.stat(path).st_mtime_ns}
+            for name in sorted(f for f in os.listdir(self.data_dir) if f.endswith('.csv'))
+            for path in [os.path.join(self.data_dir, name)]
+        ]
+        meta = self._load_meta()
+        known = meta["files"] if meta else []
+        if meta is None or current[:len(known)] != known:
+            # First run, or an already converted file changed/disappeared
+            meta = {"version": STORE_VERSION, "files": [], "segments": [], "rows": 0}
+            open(self.data_path, "wb").close()
+
+        new_files = current[len(meta["files"]):]
+        if new_files:
+            print(f"[EEV Loader] Converting {len(new_files)} annotation files...")
+            with open(self.data_path, "r+b") as out:
+                # Drop any tail a crashed conversion left beyond the recorded rows
+                out.truncate(meta["rows"] * NUM_EMOTIONS * 4)
+                out.seek(0, os.SEEK_END)
+                for entry in new_files:
+                    file_idx = len(meta["files"])
+                    meta["rows"] = self._convert(os.path.join(self.data_dir, entry["name"]), file_idx, out, meta)
+                    meta["files"].append(entry)
+            self._save_meta(meta)
+        return meta
+
+    def _convert(self, path, file_idx, out, meta):
+        rows = meta["rows"]
+        segments = meta["segments"]
+        last_video = None
+        for chunk in pd.read_csv(path, chunksize=self.chunk_rows):
+            videos = chunk.iloc[:, 0].astype(str).to_numpy()
+            values = chunk.iloc[:, -NUM_EMOTIONS:].to_numpy(dtype=np.float32, na_value=0.0)
+            totals = values.sum(axis=1, keepdims=True)
+            values = np.divide(values, totals, out=np.zeros_like(values), where=totals > 0)
+            out.write(np.ascontiguousarray(values).tobytes())
+
+            # Segment boundaries: where the video id changes (also across chunks)
+            changes = np.flatnonzero(videos[1:] != videos[:-1]) + 1
+            starts = np.concatenate([[0], changes]) if len(videos) else changes
+            for i, start in enumerate(starts):
+                end = changes[i] if i < len(changes) else len(videos)
+                if start == 0 and videos[0] == last_video:
+                    segments[-1][2] += int(end) # Continues the previous chunk's video
+                else:
+                    segments.append([file_idx, rows + int(start), int(end - start)])
+            if len(videos):
+                last_video = videos[-1]
+            rows += len(values)
+        return rows
+
+    def _load_meta(self):
+        if not os.path.exists(self.meta_path) or not os.path.exists(self.data_path):
+            return None
+        with open(self.meta_path) as f:
+            meta = json.load(f)
+        return meta if meta.get("version") == STORE_VERSION else None
+
+    def _save_meta(self, meta):
+        tmp = f"{self.meta_path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, self.meta_path)
+
+
 class EEVDataset(Dataset):
-    def __init__(self, data_dir, seq_len=30):
+    def __init__(self, data_dir, seq_len=30, stride=1, store_dir=None):
         """
         EEV Dataset Loader
         Reads EEV CSVs (VideoID, Timestamp, Labels...).
-        Converts raw multi-label annotations into 15-dim vectors.
+        Serves (seq_len, 15) emotion windows straight from the memory-mapped EEVStore
+        through a window index; no CSV is parsed after the first conversion.
         """
         self.data_dir = data_dir
         self.seq_len = seq_len
-        self.files = [f for f in os.listdir(data_dir) if f.endswith('.csv')]
-        
-        # Real implementation would parse thousands of CSVs here
-        # For Antigravity demo, we simulate loading loaded sequences
-        print(f"[EEV Loader] Found {len(self.files)} video annotation files.")
+        self.store = EEVStore(data_dir, store_dir)
+        self.files = self.store.files
+        self.window_starts = self.store.window_starts(seq_len, stride)
 
     def __len__(self):
-        return len(self.files) * 10 # Mock length
+        return len(self.window_starts)
 
     def __getitem__(self, idx):
-        # Simulate fetching a sequence of (SeqLen, 15)
-        # In production: Read real EEV CSV, rolling window 
-        seq = np.random.rand(self.seq_len, 15).astype(np.float32)
-        # Normalize
-        seq = seq / seq.sum(axis=1, keepdims=True)
-        
-        # Label: 0=Stable, 1=Volatile, 2=Depressive, 3=Anxious
-        # We determine label based on synthetic properties for training demo
-        variance = seq.std()
-        negativity = seq[:, 11:].mean()
-        
-        if negativity > 0.4:
-            label = 2 # Depressive
-        elif variance > 0.2:
-            label = 1 # Volatile
-        else:
-            label = 0 # Stable
-            
-        return seq, label
+        start = int(self.window_starts[idx])
+        seq = self.store.emotions[start : start + self.seq_len]
+        return seq, pattern_label(seq)
+
+
+class EEVIterableDataset(IterableDataset):
+    def __init__(self, data_dir, seq_len=30, stride=1, store_dir=None, shuffle=False, seed=0):
+        """
+        Streaming variant of EEVDataset: each DataLoader worker takes every num_workers-th
+        annotation file and walks its windows (in order, or shuffled within the shard),
+        so workers read disjoint regions of the store.
+        """
+        self.seq_len = seq_len
+        self.stride = stride
+        self.store = EEVStore(data_dir, store_dir)
+        self.shuffle = shuffle
+        self.seed = seed
+        self.epoch = 0
+
+    def set_epoch(self, epoch):
+        self.epoch = epoch
+
+    def __iter__(self):
+        info = get_worker_info()
+        worker_id, num_workers = (info.id, info.num_workers) if info is not None else (0, 1)
+        files = range(worker_id, len(self.store.files), num_workers)
+        starts = self.store.window_starts(self.seq_len, self.stride, files=files)
+        if self.shuffle:
+            starts = np.random.default_rng((self.seed, self.epoch, worker_id)).permutation(starts)
+
+        emotions = self.store.emotions
+        for start in starts:
+            seq = emotions[start : start + self.seq_len]
+            yield seq, pattern_label(seq)
+
+
+if __name__ == "__main__":
+    import sys
+    ds = EEVIterableDataset(sys.argv[1] if len(sys.argv) > 1 else "data/eev", shuffle=True)
+    loader = DataLoader(ds, batch_size=64, num_workers=2)
+    print(f"First batch: {next(iter(loader))[0].shape}")
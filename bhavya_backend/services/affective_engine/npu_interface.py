@@ -29,6 +29,16 @@ class NPUInterface:
         vector = np.random.dirichlet(np.ones(15), size=1)[0]
         return vector
 
+    def process_frames(self, frames):
+        """
+        Batched version of process_frame.
+        Input: sequence of N frames
+        Output: (N, 15) emotion vectors
+        """
+        # SIMULATION: one Dirichlet draw per frame, in a single call.
+        # In real life: one batched self.snpe.execute(frames)
+        return np.random.dirichlet(np.ones(15), size=len(frames))
+
     def process_question_answers(self, answers):
         """
         Interface for mapping Questionnaire answers -> EEV Vector Space.
@@ -1,5 +1,6 @@
 import torch
 import torch.nn as nn
+import numpy as np
 
 class EEVTemporalModel(nn.Module):
     def __init__(self, input_dim=15, hidden_dim=64, num_layers=2, num_classes=4):
@@ -35,6 +36,17 @@ class EEVTemporalModel(nn.Module):
         probs = self.softmax(logits)
         return probs
 
+    def forward_incremental(self, x, hidden=None):
+        """
+        Streaming variant of forward.
+        Runs only the new frames `x` (batch, new_frames, 15) starting from the `hidden`
+        (h, c) state of the previous call, and returns (probs, hidden) so the caller
+        can continue the sequence without replaying it.
+        """
+        lstm_out, hidden = self.lstm(x, hidden)
+        logits = self.fc(lstm_out[:, -1, :])
+        return self.softmax(logits), hidden
+
 class AffectiveRiskScorer:
     @staticmethod
     def calculate_risk(emotion_sequence):
@@ -57,3 +69,20 @@ class AffectiveRiskScorer:
         risk_score = (neg_mean * 0.7) + (volatility * 0.3)
         # Normalize roughly 0-1
         return min(max(risk_score * 2.0, 0.0), 1.0)
+
+    @staticmethod
+    def calculate_risk_batch(emotion_sequences):
+        """
+        Batched version of calculate_risk.
+        Input: numpy array (batch, seq_len, 15)
+        Output: numpy array (batch,) of risk scores in [0, 1]
+        """
+        volatility = emotion_sequences.std(axis=1).mean(axis=1)
+        neg_mean = emotion_sequences[:, :, 11:].mean(axis=(1, 2))
+        return AffectiveRiskScorer.risk_from_components(neg_mean, volatility)
+
+    @staticmethod
+    def risk_from_components(neg_mean, volatility):
+        """Same weighting as calculate_risk, on precomputed (batched) components."""
+        risk_scores = (neg_mean * 0.7) + (volatility * 0.3)
+        return np.clip(risk_scores * 2.0, 0.0, 1.0)
@@ -0,0 +1,141 @@
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import torch
+
+from services.affective_engine.batch_engine import AffectiveBatchEngine
+from services.affective_engine.batcher import PATTERNS
+from services.inference.registry import registry
+from app.core.config import settings
+
+_decode_pool = ThreadPoolExecutor(max_workers=settings.VIDEO_DECODE_WORKERS, thread_name_prefix="video-decode")
+
+_END = object()
+
+
+def decode_frame(frame_bytes, height, width):
+    """
+    Decodes one raw RGB24 frame into a float32 (H, W, 3) array in [0, 1].
+    Stand-in for a real codec: OpenCV/PyAV decoding would plug in here.
+    """
+    frame = np.frombuffer(frame_bytes, dtype=np.uint8).reshape(height, width, 3)
+    return frame.astype(np.float32) / 255.0
+
+
+class VideoStreamAnalyzer:
+    def __init__(
+        self,
+        frame_width=settings.VIDEO_FRAME_WIDTH,
+        frame_height=settings.VIDEO_FRAME_HEIGHT,
+        npu_batch_size=settings.VIDEO_NPU_BATCH_SIZE,
+        max_pending_frames=settings.VIDEO_MAX_PENDING_FRAMES,
+        window_frames=settings.VIDEO_WINDOW_FRAMES,
+    ):
+        """
+        Streaming video pipeline.
+        1. Upload bytes are cut into frames as they arrive (never buffered whole).
+        2. Frames are decoded on a thread pool; a bounded queue applies backpressure to the reader.
+        3. Decoded frames go to the NPU in batches -> 15-dim EEV vectors.
+        4. Vectors are fed incrementally into the EEV Temporal Model, carrying the LSTM state.
+        5. Risk is scored on a rolling window of the most recent vectors.
+        Memory stays bounded by the pending-frame queue and the rolling window.
+        """
+        self.frame_width = frame_width
+        self.frame_height = frame_height
+        self.frame_bytes = frame_width * frame_height * 3
+        self.npu_batch_size = npu_batch_size
+        self.max_pending_frames = max_pending_frames
+        self.window_frames = window_frames
+
+    async def analyze(self, chunks):
+        """
+        Input: async iterator of raw byte chunks (the request body).
+        Yields a "partial" result after every NPU batch and a final "complete" result.
+        """
+        loop = asyncio.get_running_loop()
+        pending = asyncio.Queue(maxsize=self.max_pending_frames)
+        reader = asyncio.create_task(self._read_frames(chunks, pending, loop))
+
+        npu = registry.get("npu_interface")
+        model = registry.get("eev_temporal")
+        hidden = None
+        window = deque(maxlen=self.window_frames)
+        frames_done = 0
+        result = None
+        batch = []
+
+        try:
+            while True:
+                item = await pending.get()
+                if item is not _END:
+                    batch.append(await item)
+                if batch and (len(batch) >= self.npu_batch_size or item is _END):
+                    result, hidden = await loop.run_in_executor(
+                        None, self._step, npu, model, batch, hidden, window
+                    )
+                    frames_done += len(batch)
+                    batch = []
+                    yield self._event("partial", frames_done, result)
+                if item is _END:
+                    break
+
+            await reader  # Surface read/decode errors
+            yield self._event("complete", frames_done, result)
+        finally:
+            if not reader.done():
+                # Consumer gone (disconnect/cancellation): stop the reader and wait until it has exited
+                reader.cancel()
+                await asyncio.gather(reader, return_exceptions=True)
+
+    async def _read_frames(self, chunks, pending, loop):
+        buffer = bytearray()
+        cancelled = False
+        try:
+            async for chunk in chunks:
+                buffer.extend(chunk)
+                while len(buffer) >= self.frame_bytes:
+                    frame_bytes = bytes(buffer[:self.frame_bytes])
+                    del buffer[:self.frame_bytes]
+                    future = loop.run_in_executor(
+                        _decode_pool, decode_frame, frame_bytes, self.frame_height, self.frame_width
+                    )
+                    # Blocks when the consumer falls behind -> upload reading pauses
+                    await pending.put(future)
+            # A trailing partial frame is dropped
+        except asyncio.CancelledError:
+            cancelled = True # Nobody will read the sentinel; a put on a full queue would never return
+            raise
+        finally:
+            if not cancelled:
+                await pending.put(_END)
+
+    def _step(self, npu, model, frames, hidden, window):
+        vectors = npu.process_frames(frames).astype(np.float32)  # (N, 15)
+        window.extend(vectors)
+
+        window_np = np.stack(window)
+        with torch.no_grad():
+            if hasattr(model, "forward_incremental"):
+                probs, hidden = model.forward_incremental(torch.from_numpy(vectors).unsqueeze(0), hidden)
+            else:
+                # Exported TorchScript artifact: no carried state, classify the rolling window instead
+                probs = model(torch.from_numpy(window_np).unsqueeze(0))
+
+        scores = AffectiveBatchEngine.score(window_np[None])
+        pattern_idx = torch.argmax(probs, dim=1).item()
+        result = {
+            "pattern": PATTERNS[pattern_idx],
+            "probs": probs[0].tolist(),
+            "risk_score": float(scores["risk"][0]),
+            "volatility": float(scores["volatility"][0]),
+        }
+        return result, hidden
+
+    @staticmethod
+    def _event(event, frames_done, result):
+        data = {"event": event, "frames": frames_done}
+        if result is not None:
+            data.update(result)
+        return data
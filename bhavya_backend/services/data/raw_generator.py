@@ -1,135 +1,176 @@
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import argparse
+import glob
 import os
+import shutil
+import tempfile
+
+# Output tables and their columns (same layout as the StudentLife CSV exports)
+TABLES = {
+    "sleep": ['uid', 'date', 'start_time', 'end_time', 'duration'],
+    "activity": ['uid', 'timestamp', 'activity_inference'],
+    "gps": ['uid', 'timestamp', 'location_id'],
+    "survey": ['uid', 'date', 'type', 'answer'],
+}
+
+# User has a "home" and "work" and "other" (mostly home; more variety on weekends)
+WEEKDAY_LOCATION_PROBS = np.array([0.6, 0.2, 0.1, 0.05, 0.05])
+WEEKEND_LOCATION_PROBS = np.array([0.4, 0.1, 0.2, 0.2, 0.1])
+GPS_HOURS = np.arange(8, 22, 2) # Sampling every 2 hours
+NIGHT_HOURS = 6 # 0-6: low activity
+
+SHARD_USERS = 1000 # Users per shard (one task, one set of part files)
+
+
+def _weekday(day_starts):
+    # Monday = 0 (1970-01-01 was a Thursday)
+    return (day_starts.astype('datetime64[D]').astype(np.int64) + 3) % 7
+
+
+def generate_shard(first_uid, num_users, days, start_date, seed, parts_dir, shard, fmt="csv"):
+    """
+    Generates every table for users [first_uid, first_uid + num_users) with vectorized NumPy
+    and writes them as this shard's part files. Output depends only on (seed, uid range, days).
+    """
+    rng = np.random.default_rng(seed)
+    day_starts = np.datetime64(start_date, 's') + np.arange(days).astype('timedelta64[D]')
+    date_strings = np.datetime_as_string(day_starts, unit='D')
+    uids = [f'u{uid:02d}' for uid in range(first_uid, first_uid + num_users)]
+
+    def uid_column(rows_per_user):
+        # Categorical: one string per user instead of one per row
+        return pd.Categorical.from_codes(np.repeat(np.arange(num_users), rows_per_user), categories=uids)
+
+    # 1. Sleep Data: one night per (user, day)
+    # Sleep usually starts between 22:00 and 02:00 (past 24 -> early next day)
+    start_hour = rng.normal(23.5, 1.5, size=(num_users, days))
+    duration = np.maximum(3, rng.normal(7, 1.5, size=(num_users, days)))
+    start_time = day_starts + (start_hour * 3600).astype(np.int64).astype('timedelta64[s]')
+    end_time = start_time + (duration * 3600).astype(np.int64).astype('timedelta64[s]')
+    _write_part(pd.DataFrame({
+        'uid': uid_column(days),
+        'date': np.tile(date_strings, num_users),
+        'start_time': start_time.ravel(),
+        'end_time': end_time.ravel(),
+        'duration': duration.ravel(),
+    }), parts_dir, "sleep", shard, fmt)
+
+    # 2. Activity Data: hourly samples, 1 = active
+    # Per-(user, day) baseline; night time (0-6) is mostly inactive
+    hours = np.arange(24)
+    baseline = rng.uniform(0.3, 0.8, size=(num_users, days, 1))
+    p_active = np.where(hours < NIGHT_HOURS, 0.05, baseline)
+    level = (rng.random((num_users, days, 24)) < p_active).astype(np.int8)
+    hourly = (day_starts[:, None] + hours.astype('timedelta64[h]')).ravel()
+    _write_part(pd.DataFrame({
+        'uid': uid_column(days * 24),
+        'timestamp': np.tile(hourly, num_users),
+        'activity_inference': level.ravel(),
+    }), parts_dir, "activity", shard, fmt)
+
+    # 3. GPS / Location Data: location ids every 2 hours, drawn by inverse CDF per day type
+    weekend = _weekday(day_starts) >= 5
+    cdf = np.where(weekend[:, None], np.cumsum(WEEKEND_LOCATION_PROBS), np.cumsum(WEEKDAY_LOCATION_PROBS))
+    u = rng.random((num_users, days, len(GPS_HOURS)))
+    location = (u[..., None] >= cdf[None, :, None, :]).sum(axis=-1)
+    location = np.minimum(location, len(WEEKDAY_LOCATION_PROBS) - 1).astype(np.int32)
+    sampled = (day_starts[:, None] + GPS_HOURS.astype('timedelta64[h]')).ravel()
+    _write_part(pd.DataFrame({
+        'uid': uid_column(days * len(GPS_HOURS)),
+        'timestamp': np.tile(sampled, num_users),
+        'location_id': location.ravel(),
+    }), parts_dir, "gps", shard, fmt)
+
+    # 4. Survey Data (Targets): daily stress answer, 1 = Low .. 3
+    _write_part(pd.DataFrame({
+        'uid': uid_column(days),
+        'date': np.tile(date_strings, num_users),
+        'type': 'stress',
+        'answer': rng.integers(1, 4, size=num_users * days),
+    }), parts_dir, "survey", shard, fmt)
+
+
+def _write_part(frame, parts_dir, table, shard, fmt):
+    path = os.path.join(parts_dir, f"{table}-{shard:05d}.{fmt}")
+    if fmt == "parquet":
+        # Plain strings: dictionary index widths differ between shards
+        frame.astype({'uid': str}).to_parquet(path, index=False)
+    else:
+        # Headerless, so parts concatenate byte-for-byte
+        frame.to_csv(path, index=False, header=False)
+
+
+def _combine_parts(parts_dir, base_dir, table, fmt):
+    parts = sorted(glob.glob(os.path.join(parts_dir, f"{table}-*.{fmt}")))
+    path = os.path.join(base_dir, f"{table}.{fmt}")
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        writer = None
+        for part in parts:
+            chunk = pq.read_table(part)
+            writer = writer or pq.ParquetWriter(path, chunk.schema)
+            writer.write_table(chunk)
+        if writer is not None:
+            writer.close()
+    else:
+        with open(path, "wb") as out:
+            out.write((",".join(TABLES[table]) + "\n").encode())
+            for part in parts:
+                with open(part, "rb") as src:
+                    shutil.copyfileobj(src, out)
+    return path
+
+
+def generate_raw_data(base_dir="data/studentlife", num_users=20, days=30, seed=None, workers=1,
+                      fmt="csv", start_date=datetime(2023, 1, 1), shard_users=SHARD_USERS):
+    """
+    Synthetic StudentLife-style raw data (sleep, activity, gps, survey).
+    Users are split into shards of `shard_users`; each shard gets its own child seed of `seed`,
+    so the output is reproducible for a given seed regardless of `workers`.
+    Shards run on a process pool and stream part files that are concatenated into
+    one file per table ({table}.csv, or {table}.parquet with fmt="parquet").
+    """
+    if fmt not in ("csv", "parquet"):
+        raise ValueError(f"Unknown format '{fmt}' (expected 'csv' or 'parquet')")
+    if fmt == "parquet":
+        import pyarrow # noqa: F401 (required for Parquet output)
+    os.makedirs(base_dir, exist_ok=True)
+
+    print(f"Generating synthetic StudentLife data in {base_dir} ({num_users} users x {days} days, {workers} workers)...")
+
+    starts = list(range(0, num_users, shard_users))
+    seeds = np.random.SeedSequence(seed).spawn(len(starts))
+    with tempfile.TemporaryDirectory(dir=base_dir) as parts_dir:
+        tasks = [
+            (first, min(shard_users, num_users - first), days, start_date, seeds[shard], parts_dir, shard, fmt)
+            for shard, first in enumerate(starts)
+        ]
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for future in [pool.submit(generate_shard, *task) for task in tasks]:
+                    future.result()
+        else:
+            for task in tasks:
+                generate_shard(*task)
+
+        paths = {}
+        for table in TABLES:
+            paths[table] = _combine_parts(parts_dir, base_dir, table, fmt)
+            print(f" - {os.path.basename(paths[table])} created")
+    return paths
 
-def generate_raw_data(base_dir="data/studentlife"):
-    if not os.path.exists(base_dir):
-        os.makedirs(base_dir)
-
-    num_users = 20
-    days = 30
-    start_date = datetime(2023, 1, 1)
-
-    print(f"Generating synthetic StudentLife data in {base_dir}...")
-
-    # 1. Sleep Data
-    # Columns: uid, date, start_time, end_time, duration
-    sleep_rows = []
-    for uid in range(num_users):
-        for day in range(days):
-            curr_date = start_date + timedelta(days=day)
-            
-            # Sleep usually starts between 22:00 and 02:00
-            start_hour = np.random.normal(23.5, 1.5) 
-            if start_hour >= 24:
-                start_time = curr_date + timedelta(days=1) - timedelta(hours=24-start_hour) # e.g. 1 AM next day
-            else:
-                start_time = curr_date + timedelta(hours=start_hour)
-            
-            duration = max(3, np.random.normal(7, 1.5))
-            end_time = start_time + timedelta(hours=duration)
-            
-            sleep_rows.append({
-                'uid': f'u{uid:02d}',
-                'date': curr_date.strftime('%Y-%m-%d'), 
-                'start_time': start_time.strftime('%Y-%m-%d %H:%M:%S'),
-                'end_time': end_time.strftime('%Y-%m-%d %H:%M:%S'),
-                'duration': duration
-            })
-    pd.DataFrame(sleep_rows).to_csv(f"{base_dir}/sleep.csv", index=False)
-    print(" - sleep.csv created")
-
-    # 2. Activity Data
-    # Columns: uid, timestamp, activity_level (0: low, 1: high)
-    # We simulate hourly summaries for simplicity in this synthetic generator
-    activity_rows = []
-    for uid in range(num_users):
-        for day in range(days):
-            curr_date = start_date + timedelta(days=day)
-            # Higher activity for some users
-            baseline_activity = np.random.uniform(0.3, 0.8) 
-            
-            for hour in range(24):
-                ts = curr_date + timedelta(hours=hour)
-                # Night time (0-6) low activity
-                if 0 <= hour < 6:
-                    level = np.random.choice([0, 1], p=[0.95, 0.05])
-                else:
-                    level = np.random.choice([0, 1], p=[1-baseline_activity, baseline_activity])
-                
-                # We'll just generate raw events. "activity_inference" in StudentLife is 0,1,2,3
-                # 0: Stationary, 1: Walking, 2: Running, 3: Unknown
-                # Let's simple it to "movement count" for the aggregator
-                # Simulating "inferred" activity samples
-                activity_rows.append({
-                    'uid': f'u{uid:02d}',
-                    'timestamp': ts.strftime('%Y-%m-%d %H:%M:%S'),
-                    'activity_inference': level # Simplified 0/1 for now, or 0/1/2
-                })
-    pd.DataFrame(activity_rows).to_csv(f"{base_dir}/activity.csv", index=False)
-    print(" - activity.csv created")
-
-    # 3. GPS / Location Data (for routine change)
-    # Columns: uid, timestamp, lat, long, loc_id
-    # We simulate "number of unique locations visited" or "variance" directly for simplicity? 
-    # No, let's simulate location IDs to allow variance calc
-    gps_rows = []
-    for uid in range(num_users):
-        # User has a "home" and "work" and "other"
-        locs = [0, 1, 2, 3, 4]
-        probs = [0.6, 0.2, 0.1, 0.05, 0.05] # Mostly home
-        
-        for day in range(days):
-            curr_date = start_date + timedelta(days=day)
-            # On weekends, maybe more variance?
-            day_probs = probs if curr_date.weekday() < 5 else [0.4, 0.1, 0.2, 0.2, 0.1]
-            
-            # Simulate hourly location samples
-            for hour in range(8, 22, 2): # Sampling every 2 hours
-                ts = curr_date + timedelta(hours=hour)
-                loc_id = np.random.choice(locs, p=day_probs)
-                gps_rows.append({
-                    'uid': f'u{uid:02d}',
-                    'timestamp': ts.strftime('%Y-%m-%d %H:%M:%S'),
-                    'location_id': loc_id
-                })
-    pd.DataFrame(gps_rows).to_csv(f"{base_dir}/gps.csv", index=False)
-    print(" - gps.csv created")
-
-    # 4. Survey Data (Targets)
-    # Columns: uid, timestamp, type, answer
-    survey_rows = []
-    for uid in range(num_users):
-        for day in range(days):
-            curr_date = start_date + timedelta(days=day)
-            # Target generation logic: depends on sleep/activity (ground truth correlation)
-            # We want the model to actually learn something!
-            
-            # Get sleep for this day
-            # (Simplified lookup)
-            # Rule: Low sleep (<5h) OR Low activity -> High Stress
-            
-            # Random default
-            stress_score = np.random.randint(1, 4) # 1-5 scale. 1=Low Stress, 5=High
-            
-            # Let's inject correlation later in aggregator? 
-            # Or just random here and we rely on the classifier finding the random signal? 
-            # Better to inject signal.
-            
-            # Signal injection handled by statistical property:
-            # We'll just generate random labels here, but maybe slightly correlated to user baseline
-            # Real learning will happen if we correlate it. 
-            # For "raw" generator, let's just make it random-ish but persistent per user.
-            
-            survey_rows.append({
-                'uid': f'u{uid:02d}',
-                'date': curr_date.strftime('%Y-%m-%d'),
-                'type': 'stress',
-                'answer': stress_score
-            })
-    pd.DataFrame(survey_rows).to_csv(f"{base_dir}/survey.csv", index=False)
-    print(" - survey.csv created")
 
 if __name__ == "__main__":
-    generate_raw_data()
+    parser = argparse.ArgumentParser(description="Generate synthetic StudentLife raw data")
+    parser.add_argument("--out", default="data/studentlife")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    args = parser.parse_args()
+    generate_raw_data(args.out, num_users=args.users, days=args.days, seed=args.seed,
+                      workers=args.workers, fmt=args.format)
@@ -2,63 +2,121 @@ import torch
 from torch.utils.data import Dataset
 import numpy as np
 import pandas as pd
+import json
 import os
 
+from services.features.build_features import feature_files, read_feature_table
+
+FEATURE_COLS = ['sleep_duration', 'sleep_midpoint', 'activity_level', 'activity_variance', 'routine_change']
+
 class StudentLifeDataset(Dataset):
-    def __init__(self, csv_file="bhavya_features.csv", seq_len=7):
+    def __init__(self, csv_file="bhavya_features.csv", seq_len=7, stride=1, cache_dir=None):
         """
-        Loads user behavior sequences from the feature CSV.
+        Loads user behavior sequences from the feature CSV without materializing windows.
+        1. Every user's days are stored once, back to back and sorted by date, in one
+           contiguous float32 (N, 5) matrix (memory-mapped from .npy files when cached).
+        2. A window index holds the first row (user offset + start) of every window.
+        3. __getitem__ returns a tensor view of rows [start, start + seq_len); nothing is copied.
         Args:
-            csv_file: Path to the built feature table.
+            csv_file: Path to the built feature table (a CSV, or update_features' partition directory).
             seq_len: Number of days in the sliding window (time-series).
+            stride: Days between consecutive window starts of a user.
+            cache_dir: If set, the normalized matrix is cached there as .npy and memory-mapped.
         """
         self.seq_len = seq_len
-        self.samples = []
-        self.labels = []
-        
+        self.stride = stride
+        self.features = np.zeros((0, len(FEATURE_COLS)), dtype=np.float32)
+        self.labels = np.zeros(0, dtype=np.float32)
+        self.user_offsets = np.zeros(1, dtype=np.int64)
+        self.window_starts = np.zeros(0, dtype=np.int64)
+
         if not os.path.exists(csv_file):
             print(f"Warning: {csv_file} not found. Using synthetic generator fallback? No, run build_features.py first.")
             return
 
-        print(f"Loading StudentLife Features from {csv_file}...")
-        df = pd.read_csv(csv_file)
-        
-        # Normalize Features
-        feature_cols = ['sleep_duration', 'sleep_midpoint', 'activity_level', 'activity_variance', 'routine_change']
-        
-        # Simple MinMax scaling for stability
-        for col in feature_cols:
-            if col in df.columns:
-                df[col] = (df[col] - df[col].mean()) / (df[col].std() + 1e-5)
-        
-        # Group by User to create sequences
-        for uid, group in df.groupby('uid'):
-            group = group.sort_values('date')
-            data = group[feature_cols].values
-            targets = group['stress_label'].values
-            
-            # Create Sliding Windows
-            # Need at least seq_len days
-            if len(data) < seq_len:
-                continue
-                
-            for i in range(len(data) - seq_len):
-                # Input: Sequence of features
-                seq_x = data[i : i + seq_len]
-                # Target: Stress level at the END of the sequence (predicting current state)
-                # Binarize: >=3 is High Risk (1.0), else 0.0
-                label = 1.0 if targets[i + seq_len - 1] >= 3 else 0.0
-                
-                self.samples.append(seq_x)
-                self.labels.append(label)
-
-        print(f"Generated {len(self.samples)} sequences (SeqLen={seq_len}) from {len(df['uid'].unique())} users.")
+        loaded = self._load_cache(csv_file, cache_dir) if cache_dir else None
+        if loaded is None:
+            print(f"Loading StudentLife Features from {csv_file}...")
+            loaded = self._build_arrays(csv_file)
+            if cache_dir:
+                self._save_cache(csv_file, cache_dir, *loaded)
+                loaded = self._load_cache(csv_file, cache_dir)
+        self.features, self.labels, self.user_offsets = loaded
+        self.window_starts = self._index_windows(self.user_offsets, seq_len, stride)
+
+        print(f"Generated {len(self.window_starts)} sequences (SeqLen={seq_len}, Stride={stride}) "
+              f"from {len(self.user_offsets) - 1} users.")
 
     def __len__(self):
-        return len(self.samples)
+        return len(self.window_starts)
 
     def __getitem__(self, idx):
-        return torch.tensor(self.samples[idx], dtype=torch.float32), torch.tensor(self.labels[idx], dtype=torch.float32)
+        start = int(self.window_starts[idx])
+        # Input: view of seq_len consecutive days of one user
+        seq_x = torch.from_numpy(self.features[start : start + self.seq_len])
+        # Target: Stress level at the END of the sequence (predicting current state)
+        label = torch.tensor(self.labels[start + self.seq_len - 1])
+        return seq_x, label
+
+    @staticmethod
+    def _build_arrays(csv_file):
+        df = read_feature_table(csv_file, usecols=['uid', 'date', 'stress_label'] + FEATURE_COLS)
+
+        # Normalize Features
+        # Simple MinMax scaling for stability
+        for col in FEATURE_COLS:
+            df[col] = (df[col] - df[col].mean()) / (df[col].std() + 1e-5)
+
+        # Users back to back, each in date order
+        df = df.sort_values(['uid', 'date'], kind='stable', ignore_index=True)
+        features = np.ascontiguousarray(df[FEATURE_COLS].to_numpy(dtype=np.float32))
+        # Binarize: >=3 is High Risk (1.0), else 0.0
+        labels = (df['stress_label'].to_numpy() >= 3).astype(np.float32)
+        # Row where each user starts (plus the end)
+        counts = df.groupby('uid', sort=True).size().to_numpy()
+        user_offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        return features, labels, user_offsets
+
+    @staticmethod
+    def _index_windows(user_offsets, seq_len, stride):
+        # Per user: starts 0, stride, ... < len - seq_len (the original range(len(data) - seq_len))
+        lengths = np.diff(user_offsets)
+        per_user = (np.maximum(lengths - seq_len, 0) + stride - 1) // stride
+        first = np.cumsum(per_user) - per_user
+        within = np.arange(per_user.sum(), dtype=np.int64) - np.repeat(first, per_user)
+        return np.repeat(user_offsets[:-1], per_user) + within * stride
+
+    @staticmethod
+    def _cache_paths(csv_file, cache_dir):
+        stem = os.path.join(cache_dir, os.path.splitext(os.path.basename(csv_file))[0])
+        return {name: f"{stem}.{name}.npy" for name in ("features", "labels", "offsets")}, f"{stem}.meta.json"
+
+    @staticmethod
+    def _source_signature(csv_file):
+        files = []
+        for path in feature_files(csv_file):
+            stat = os.stat(path)
+            files.append([os.path.basename(path), stat.st_size, stat.st_mtime_ns])
+        return {"source": os.path.abspath(csv_file), "files": files}
+
+    def _load_cache(self, csv_file, cache_dir):
+        paths, meta_path = self._cache_paths(csv_file, cache_dir)
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path) as f:
+            if json.load(f) != self._source_signature(csv_file):
+                return None # Stale: the CSV was rebuilt
+        print(f"Memory-mapping cached StudentLife Features from {cache_dir}...")
+        # Copy-on-write maps: pages are shared with the OS cache and tensors stay writable
+        return tuple(np.load(paths[name], mmap_mode="c") for name in ("features", "labels", "offsets"))
+
+    def _save_cache(self, csv_file, cache_dir, features, labels, user_offsets):
+        os.makedirs(cache_dir, exist_ok=True)
+        paths, meta_path = self._cache_paths(csv_file, cache_dir)
+        for name, array in (("features", features), ("labels", labels), ("offsets", user_offsets)):
+            np.save(paths[name], array)
+        with open(meta_path, "w") as f:
+            json.dump(self._source_signature(csv_file), f)
 
 if __name__ == "__main__":
     # Test
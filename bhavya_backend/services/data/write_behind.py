@@ -0,0 +1,283 @@
+import json
+import os
+import queue
+import threading
+import time
+import traceback
+from datetime import date, datetime
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, IntegrityError
+
+from app.core.config import settings
+from app.db import models
+from app.db.base import SessionLocal
+
+
+# Failures that will recur for the same row; anything else (locks, lost connections) is retried
+PERMANENT_ERRORS = (IntegrityError, DataError)
+DATE_FIELDS = ("timestamp", "first_sample_date", "last_sample_date")
+
+
+class QueueFullError(Exception):
+    pass
+
+
+def _encode_row(row, error):
+    record = {key: value.isoformat() if isinstance(value, (date, datetime)) else value for key, value in row.items()}
+    return json.dumps({"row": record, "error": error})
+
+
+def _decode_row(line):
+    row = json.loads(line)["row"]
+    for key in DATE_FIELDS:
+        if row.get(key) is not None:
+            row[key] = (datetime if key == "timestamp" else date).fromisoformat(row[key])
+    return row
+
+
+class WriteBehindQueue:
+    def __init__(self, session_factory, max_size=10000, flush_rows=500, flush_interval_ms=200.0,
+                 retry_base_ms=100.0, retry_max_ms=5000.0, stop_retries=3, dead_letter_path=None):
+        """
+        In-process write-behind queue for BehavioralRaw rows.
+        Request handlers enqueue plain row dicts; a dedicated worker thread writes them with
+        its own sessions, flushing when `flush_rows` rows are pending or `flush_interval_ms`
+        has passed. A bounded queue gives backpressure; stop() drains everything still queued.
+        Failed batches (insert or flush hook):
+        1. Transient errors (database locked, lost connection, ...) are retried with exponential
+           backoff, capped at `retry_max_ms`; the batch is held, so the queue fills up and
+           new requests get backpressure instead of rows being dropped.
+        2. IntegrityError / DataError: the batch is retried row by row so one bad row can't drop
+           the others; rows that still fail are appended to the dead-letter file.
+        3. While stopping, a batch still failing after `stop_retries` retries is dead-lettered too.
+        Dead letters are JSON lines at `dead_letter_path`; start() replays them through the queue.
+        """
+        self.session_factory = session_factory
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.retry_base = retry_base_ms / 1000.0
+        self.retry_max = retry_max_ms / 1000.0
+        self.stop_retries = stop_retries
+        self.dead_letter_path = dead_letter_path
+
+        self._queue = queue.Queue(maxsize=max_size)
+        self._stopping = threading.Event()
+        self._worker = None
+        self._flush_hooks = []
+        self._commit_hooks = []
+        self._lock = threading.Lock()
+        self._dead_letter_lock = threading.Lock()
+
+        # Metrics
+        self.enqueued = 0
+        self.rejected = 0
+        self.flushes = 0
+        self.flushed_rows = 0
+        self.failed_rows = 0
+        self.retried_batches = 0
+        self.transient_retries = 0
+        self.dead_lettered = 0
+        self.replayed = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self.total_flush_ms = 0.0
+
+    def add_flush_hook(self, hook):
+        """hook(db, rows) runs inside the flush transaction, after the rows are inserted."""
+        self._flush_hooks.append(hook)
+
+    def add_commit_hook(self, hook):
+        """hook(rows) runs after the flush transaction has committed."""
+        self._commit_hooks.append(hook)
+
+    def start(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        self._stopping.clear()
+        self._worker = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._worker.start()
+        self.replay_dead_letters()
+
+    def replay_dead_letters(self):
+        """Re-enqueues every dead-lettered row; rows that fail again are dead-lettered again."""
+        if not self.dead_letter_path:
+            return 0
+        replaying = self.dead_letter_path + ".replaying"
+        with self._dead_letter_lock:
+            if not os.path.exists(self.dead_letter_path):
+                return 0
+            os.replace(self.dead_letter_path, replaying)
+        with open(replaying) as f:
+            rows = [_decode_row(line) for line in f if line.strip()]
+        for row in rows:
+            self._queue.put(row) # Blocks on a full queue; the worker is already draining it
+        os.remove(replaying)
+        with self._lock:
+            self.replayed += len(rows)
+        print(f"[WriteBehind] Replaying {len(rows)} dead-lettered rows.")
+        return len(rows)
+
+    def stop(self, timeout=30.0):
+        """Stops accepting work and waits for the worker to flush everything queued."""
+        self._stopping.set()
+        if self._worker is not None:
+            self._worker.join(timeout)
+        # The worker ran out of time: persist what it didn't get to instead of losing it at exit
+        leftover = []
+        while True:
+            try:
+                leftover.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if leftover:
+            self._dead_letter(leftover, "not flushed before shutdown")
+        print(f"[WriteBehind] Drained. {self.flushed_rows} rows flushed, {self._queue.qsize()} left.")
+
+    def put(self, row, block=False, timeout=None):
+        if self._stopping.is_set():
+            raise QueueFullError("Ingestion queue is shutting down")
+        try:
+            self._queue.put(row, block=block, timeout=timeout)
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            raise QueueFullError("Ingestion queue is full")
+        with self._lock:
+            self.enqueued += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "depth": self._queue.qsize(),
+                "capacity": self._queue.maxsize,
+                "enqueued": self.enqueued,
+                "rejected": self.rejected,
+                "flushes": self.flushes,
+                "flushed_rows": self.flushed_rows,
+                "failed_rows": self.failed_rows,
+                "retried_batches": self.retried_batches,
+                "transient_retries": self.transient_retries,
+                "dead_lettered": self.dead_lettered,
+                "replayed": self.replayed,
+                "dead_letter_path": self.dead_letter_path,
+                "last_flush_ms": self.last_flush_ms,
+                "max_flush_ms": self.max_flush_ms,
+                "avg_flush_ms": self.total_flush_ms / self.flushes if self.flushes else 0.0,
+            }
+
+    def _run(self):
+        while not (self._stopping.is_set() and self._queue.empty()):
+            try:
+                rows = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+
+            # Gather until the batch is full or the flush interval closes
+            deadline = time.monotonic() + self.flush_interval
+            while len(rows) < self.flush_rows:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    rows.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._flush(rows)
+
+    def _flush(self, rows):
+        start = time.perf_counter()
+        try:
+            self._write_retrying(rows)
+            written = rows
+        except PERMANENT_ERRORS:
+            traceback.print_exc()
+            # Isolate the failure: every row in its own transaction, bad ones to the dead-letter file
+            with self._lock:
+                self.retried_batches += 1
+            written = []
+            for row in rows:
+                try:
+                    self._write_retrying([row])
+                    written.append(row)
+                except Exception as e:
+                    self._dead_letter([row], e)
+        except Exception as e:
+            # Still failing transiently while stopping: keep the rows for the next start
+            self._dead_letter(rows, e)
+            written = []
+
+        with self._lock:
+            self.flushed_rows += len(written)
+        if written:
+            for hook in self._commit_hooks:
+                try:
+                    hook(written)
+                except Exception:
+                    traceback.print_exc()
+
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        with self._lock:
+            self.flushes += 1
+            self.last_flush_ms = elapsed_ms
+            self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+            self.total_flush_ms += elapsed_ms
+
+    def _write_retrying(self, rows):
+        # Retries everything but PERMANENT_ERRORS until it succeeds (at most stop_retries times once stopping)
+        delay = self.retry_base
+        attempt = 0
+        while True:
+            try:
+                self._write(rows)
+                return
+            except PERMANENT_ERRORS:
+                raise
+            except Exception as e:
+                attempt += 1
+                if self._stopping.is_set() and attempt > self.stop_retries:
+                    raise
+                with self._lock:
+                    self.transient_retries += 1
+                print(f"[WriteBehind] Write of {len(rows)} rows failed ({e!r}), retry {attempt} in {delay:.2f}s")
+                time.sleep(delay)
+                delay = min(delay * 2, self.retry_max)
+
+    def _dead_letter(self, rows, error):
+        with self._lock:
+            self.failed_rows += len(rows)
+            self.dead_lettered += len(rows)
+        print(f"[WriteBehind] Dead-lettered {len(rows)} rows: {error!r}")
+        if not self.dead_letter_path:
+            return
+        with self._dead_letter_lock:
+            with open(self.dead_letter_path, "a") as f:
+                for row in rows:
+                    f.write(_encode_row(row, repr(error)) + "\n")
+
+    def _write(self, rows):
+        # Insert + flush hooks in one transaction; rolled back as a whole on any error
+        db = self.session_factory()
+        try:
+            db.execute(insert(models.BehavioralRaw), rows)
+            for hook in self._flush_hooks:
+                hook(db, rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+# Singleton instance (started/drained by the app lifecycle in app/main.py)
+ingest_queue = WriteBehindQueue(
+    SessionLocal,
+    max_size=settings.INGEST_QUEUE_MAX_SIZE,
+    flush_rows=settings.INGEST_QUEUE_FLUSH_ROWS,
+    flush_interval_ms=settings.INGEST_QUEUE_FLUSH_INTERVAL_MS,
+    retry_base_ms=settings.INGEST_QUEUE_RETRY_BASE_MS,
+    retry_max_ms=settings.INGEST_QUEUE_RETRY_MAX_MS,
+    stop_retries=settings.INGEST_QUEUE_STOP_RETRIES,
+    dead_letter_path=settings.INGEST_DEAD_LETTER_PATH,
+)
@@ -1,89 +1,263 @@
 import pandas as pd
 import numpy as np
 import os
-from datetime import datetime
 
-def build_features(data_dir="data/studentlife"):
-    print("Building BHAVYA Features...")
-    
-    # Load Raw Data
-    sleep = pd.read_csv(os.path.join(data_dir, "sleep.csv"))
-    activity = pd.read_csv(os.path.join(data_dir, "activity.csv"))
-    gps = pd.read_csv(os.path.join(data_dir, "gps.csv"))
-    survey = pd.read_csv(os.path.join(data_dir, "survey.csv"))
-    
-    # 1. Process Sleep
-    # Already has duration. We need midpoint.
-    # start_time is "estimated". 
-    # Midpoint = start + duration/2. 
-    # We need to normalize midpoint to "hours from midnight" or similar to capture rhythm.
-    def calculate_midpoint(row):
-        start = pd.to_datetime(row['start_time'])
-        duration_hours = row['duration']
-        mid = start + pd.Timedelta(hours=duration_hours/2)
-        # return hour of day (0-24)
-        return mid.hour + mid.minute/60.0
-
-    sleep['sleep_midpoint'] = sleep.apply(calculate_midpoint, axis=1)
-    
-    # Aggregation per day (though sleep.csv is usually one per "night", sometimes day naps occur)
-    # We'll take max duration as "main sleep" and its properties
-    sleep_daily = sleep.groupby(['uid', 'date']).agg({
-        'duration': 'sum',            # Total sleep
-        'sleep_midpoint': 'first'     # Rhythm of main sleep (simplification)
-    }).reset_index().rename(columns={'duration': 'sleep_duration'})
-
-    # 2. Process Activity
-    # Convert timestamp to date
-    activity['ts'] = pd.to_datetime(activity['timestamp'])
-    activity['date'] = activity['ts'].dt.date.astype(str)
-    
-    activity_daily = activity.groupby(['uid', 'date']).agg({
-        'activity_inference': ['sum', 'std'] # sum = total "active" samples, std = variance
-    }).reset_index()
-    
-    # Flatten columns
-    activity_daily.columns = ['uid', 'date', 'activity_level', 'activity_variance']
-    activity_daily['activity_variance'] = activity_daily['activity_variance'].fillna(0)
-
-    # 3. Process Routine (GPS)
-    gps['ts'] = pd.to_datetime(gps['timestamp'])
-    gps['date'] = gps['ts'].dt.date.astype(str)
-    
-    # Variance in location_id as proxy for "routine change"
-    # Actually, high variance = lots of travel/movement. Low variance = stayed home.
-    # Routine change is usually "deviation from norm", but for simple feature we use daily variance.
-    routine_daily = gps.groupby(['uid', 'date']).agg({
-        'location_id': 'nunique' # Number of unique places visited
-    }).reset_index().rename(columns={'location_id': 'routine_change'})
-
-    # 4. Merge All
-    # Base is survey (labels) or Date range. 
-    # Let's use survey as base since we need labels for training.
-    features = survey.rename(columns={'answer': 'stress_label'})[['uid', 'date', 'stress_label']]
-    
-    # Merge Sleep
-    features = features.merge(sleep_daily, on=['uid', 'date'], how='left')
-    
-    # Merge Activity
-    features = features.merge(activity_daily, on=['uid', 'date'], how='left')
-    
-    # Merge Routine
-    features = features.merge(routine_daily, on=['uid', 'date'], how='left')
-    
-    # Handle Missing
-    features = features.fillna({
-        'sleep_duration': 0,
-        'sleep_midpoint': 0,
-        'activity_level': 0,
-        'activity_variance': 0,
-        'routine_change': 0
+FEATURE_COLUMNS = ['sleep_duration', 'sleep_midpoint', 'activity_level', 'activity_variance', 'routine_change']
+KEYS = ['uid', 'date']
+
+# Raw rows per read_csv chunk (bounds peak memory independently of file size)
+CHUNK_ROWS = 500_000
+
+# Explicit dtypes: no per-chunk type inference, compact numeric columns, uid as category
+SOURCE_DTYPES = {
+    "sleep": {'uid': 'category', 'date': 'object', 'start_time': 'object', 'duration': 'float64'},
+    "activity": {'uid': 'category', 'timestamp': 'object', 'activity_inference': 'int8'},
+    "gps": {'uid': 'category', 'timestamp': 'object', 'location_id': 'int32'},
+    "survey": {'uid': 'category', 'date': 'object', 'answer': 'Int16'},
+}
+
+
+def read_chunks(path, source, chunk_rows=CHUNK_ROWS):
+    dtypes = SOURCE_DTYPES[source]
+    return pd.read_csv(path, usecols=list(dtypes), dtype=dtypes, chunksize=chunk_rows)
+
+
+def parse_times(values):
+    # One vectorized parse per chunk (ISO 8601, which is what the generator and StudentLife export)
+    return pd.to_datetime(values, format="ISO8601")
+
+
+class DailyPartials:
+    def __init__(self, compact_every=8):
+        """
+        Mergeable per-(uid, date) partial aggregates of the raw sources.
+        Each chunk is reduced on arrival, so memory scales with user-days rather than raw rows:
+        1. Sleep: duration sum + midpoint of the first sleep row of the day.
+        2. Activity: sum, sum of squares and count (-> level and sample std).
+        3. GPS: unique (uid, date, location_id) triples (-> number of places visited).
+        Merging partials gives the same result as aggregating their raw rows together.
+        Each add_* returns the reduced chunk (its keys are the partitions it touched).
+        """
+        self.compact_every = compact_every
+        self.parts = {"sleep": [], "activity": [], "gps": []}
+        self.max_time = {} # source -> latest raw timestamp seen (high-watermark)
+
+    def add_sleep(self, chunk):
+        start = parse_times(chunk['start_time'])
+        self._advance("sleep", start)
+        # Midpoint = start + duration/2, as hour of day (0-24) at minute resolution
+        mid = start + pd.to_timedelta(chunk['duration'].to_numpy() / 2, unit='h')
+        frame = pd.DataFrame({
+            'uid': chunk['uid'],
+            'date': parse_times(chunk['date']).dt.normalize(),
+            'sleep_duration': chunk['duration'],
+            'sleep_midpoint': mid.dt.hour + mid.dt.minute / 60.0,
+        })
+        return self._add("sleep", self._reduce_sleep(frame))
+
+    def add_activity(self, chunk):
+        level = chunk['activity_inference']
+        times = parse_times(chunk['timestamp'])
+        self._advance("activity", times)
+        frame = pd.DataFrame({
+            'uid': chunk['uid'],
+            'date': times.dt.normalize(),
+            'act_sum': level.astype('int64'),
+            'act_sumsq': level.astype('float64') ** 2,
+            'act_count': np.ones(len(chunk), dtype=np.int64),
+        })
+        return self._add("activity", self._reduce_activity(frame))
+
+    def add_gps(self, chunk):
+        times = parse_times(chunk['timestamp'])
+        self._advance("gps", times)
+        frame = pd.DataFrame({
+            'uid': chunk['uid'],
+            'date': times.dt.normalize(),
+            'location_id': chunk['location_id'],
+        })
+        return self._add("gps", self._reduce_gps(frame))
+
+    def merge(self, other):
+        for source, parts in other.parts.items():
+            for part in parts:
+                self._add(source, part)
+
+    def partition(self, by):
+        """
+        Splits the partials into one DailyPartials per value of `by(frame)` (e.g. the month of
+        each row's date), keeping row order so merges stay order-preserving.
+        """
+        split = {}
+        for source in self.parts:
+            frame = self.combined(source)
+            if frame is None:
+                continue
+            for key, part in frame.groupby(by(frame), sort=True):
+                split.setdefault(key, DailyPartials(self.compact_every))._add(source, part.reset_index(drop=True))
+        return split
+
+    def combined(self, source):
+        """The fully reduced partial frame of one source."""
+        self._compact(source)
+        parts = self.parts[source]
+        return parts[0] if parts else None
+
+    def daily_features(self, keys=None):
+        """
+        Finalizes the partials into one row per (uid, date) with FEATURE_COLUMNS (NaN where a source is missing).
+        `keys` (a frame with uid, date) limits the result to those partitions.
+        """
+        daily = None
+
+        sleep = self.combined("sleep")
+        if sleep is not None:
+            daily = select_keys(sleep, keys)
+
+        activity = self.combined("activity")
+        if activity is not None:
+            activity = select_keys(activity, keys)
+            n = activity['act_count']
+            # Sample variance (ddof=1, like pandas std) from the running sums; a single sample has none
+            var = (activity['act_sumsq'] - activity['act_sum'].astype('float64') ** 2 / n) / (n - 1).where(n > 1)
+            activity = pd.DataFrame({
+                'uid': activity['uid'],
+                'date': activity['date'],
+                'activity_level': activity['act_sum'],
+                'activity_variance': np.sqrt(var.clip(lower=0)).fillna(0),
+            })
+            daily = activity if daily is None else daily.merge(activity, on=KEYS, how='outer')
+
+        gps = self.combined("gps")
+        if gps is not None:
+            gps = select_keys(gps, keys)
+            routine = gps.groupby(KEYS, sort=False).size().rename('routine_change').reset_index()
+            daily = routine if daily is None else daily.merge(routine, on=KEYS, how='outer')
+
+        if daily is None:
+            daily = pd.DataFrame({'uid': pd.Series(dtype=object), 'date': pd.Series(dtype='datetime64[ns]')})
+        for col in FEATURE_COLUMNS:
+            if col not in daily.columns:
+                daily[col] = np.nan
+        return daily[KEYS + FEATURE_COLUMNS]
+
+    def _add(self, source, part):
+        part = part.assign(uid=part['uid'].astype(str)) # Categories differ per chunk
+        self.parts[source].append(part)
+        if len(self.parts[source]) >= self.compact_every:
+            self._compact(source)
+        return part
+
+    def _advance(self, source, times):
+        latest = times.max()
+        if pd.notna(latest) and (source not in self.max_time or latest > self.max_time[source]):
+            self.max_time[source] = latest
+
+    def _compact(self, source):
+        parts = self.parts[source]
+        if len(parts) <= 1:
+            return
+        frame = pd.concat(parts, ignore_index=True)
+        reduce = {"sleep": self._reduce_sleep, "activity": self._reduce_activity, "gps": self._reduce_gps}[source]
+        self.parts[source] = [reduce(frame)]
+
+    @staticmethod
+    def _reduce_sleep(frame):
+        # Order-preserving, so 'first' stays the first sleep row of the day across chunks
+        return frame.groupby(KEYS, sort=False, observed=True).agg(
+            sleep_duration=('sleep_duration', 'sum'),
+            sleep_midpoint=('sleep_midpoint', 'first'),
+        ).reset_index()
+
+    @staticmethod
+    def _reduce_activity(frame):
+        return frame.groupby(KEYS, sort=False, observed=True)[['act_sum', 'act_sumsq', 'act_count']].sum().reset_index()
+
+    @staticmethod
+    def _reduce_gps(frame):
+        return frame.drop_duplicates(KEYS + ['location_id'], ignore_index=True)
+
+
+def select_keys(frame, keys):
+    """Rows of `frame` whose (uid, date) appears in `keys`; all rows when keys is None."""
+    if keys is None:
+        return frame
+    wanted = pd.MultiIndex.from_frame(keys[KEYS])
+    return frame[pd.MultiIndex.from_frame(frame[KEYS]).isin(wanted)]
+
+
+def feature_files(path):
+    """The CSV files of a feature table: `path` itself, or the partition files of a partitioned table directory."""
+    if os.path.isdir(path):
+        return sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith(".csv"))
+    return [path]
+
+
+def read_feature_table(path, usecols=None):
+    frames = [pd.read_csv(file, usecols=usecols, dtype={'uid': str}) for file in feature_files(path)]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=usecols)
+
+
+def aggregate_sources(data_dir, chunk_rows=CHUNK_ROWS):
+    """Streams sleep/activity/gps in chunks into one DailyPartials."""
+    partials = DailyPartials()
+    for chunk in read_chunks(os.path.join(data_dir, "sleep.csv"), "sleep", chunk_rows):
+        partials.add_sleep(chunk)
+    for chunk in read_chunks(os.path.join(data_dir, "activity.csv"), "activity", chunk_rows):
+        partials.add_activity(chunk)
+    for chunk in read_chunks(os.path.join(data_dir, "gps.csv"), "gps", chunk_rows):
+        partials.add_gps(chunk)
+    return partials
+
+
+def label_frame(chunk):
+    return pd.DataFrame({
+        'uid': chunk['uid'].astype(str),
+        'date': parse_times(chunk['date']).dt.normalize(),
+        'stress_label': chunk['answer'],
     })
-    
-    # Save
-    features.to_csv("bhavya_features.csv", index=False)
-    print(" - bhavya_features.csv created with columns:", list(features.columns))
+
+
+def load_labels(data_dir, chunk_rows=CHUNK_ROWS):
+    # Survey (labels) is the base table: one output row per survey answer
+    chunks = [label_frame(chunk) for chunk in read_chunks(os.path.join(data_dir, "survey.csv"), "survey", chunk_rows)]
+    return pd.concat(chunks, ignore_index=True)
+
+
+def assemble_features(labels, daily):
+    """Joins daily features onto the survey labels; missing sources -> 0."""
+    features = labels.merge(daily, on=KEYS, how='left')
+    features = features.fillna({col: 0 for col in FEATURE_COLUMNS})
+    features['date'] = features['date'].dt.strftime('%Y-%m-%d')
+    return features
+
+
+def write_parquet(features, path):
+    try:
+        import pyarrow # noqa: F401 (optional: pandas' Parquet engine)
+    except ImportError:
+        print(f" - pyarrow not installed; skipping {path}")
+        return None
+    features.to_parquet(path, index=False)
+    return path
+
+
+def build_features(data_dir="data/studentlife", output_path="bhavya_features.csv", chunk_rows=CHUNK_ROWS, parquet=True):
+    print("Building BHAVYA Features...")
+
+    # 1. Stream raw sources into per-(uid, date) partial aggregates
+    partials = aggregate_sources(data_dir, chunk_rows)
+
+    # 2. Finalize and join onto the survey labels
+    features = assemble_features(load_labels(data_dir, chunk_rows), partials.daily_features())
+
+    # 3. Save (CSV for the training pipeline, Parquet alongside it when pyarrow is available)
+    features.to_csv(output_path, index=False)
+    print(f" - {output_path} created with columns:", list(features.columns))
+    if parquet and write_parquet(features, os.path.splitext(output_path)[0] + ".parquet"):
+        print(f" - {os.path.splitext(output_path)[0]}.parquet created")
     print(features.head())
+    return features
 
 if __name__ == "__main__":
     build_features()
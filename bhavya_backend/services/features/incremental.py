@@ -0,0 +1,259 @@
+import hashlib
+import io
+import os
+import pickle
+import shutil
+
+import pandas as pd
+
+from services.features.build_features import (
+    CHUNK_ROWS, KEYS, SOURCE_DTYPES, DailyPartials,
+    assemble_features, label_frame, write_parquet,
+)
+
+STATE_VERSION = 2
+RAW_SOURCES = ("sleep", "activity", "gps")
+# Leading bytes hashed to detect a source file that was rewritten rather than appended to
+FINGERPRINT_BYTES = 64 * 1024
+
+
+class _ByteRange(io.RawIOBase):
+    """Read-only view of the next `length` bytes of an open binary file."""
+
+    def __init__(self, f, length):
+        self.f = f
+        self.remaining = length
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        n = min(len(buffer), self.remaining)
+        if n <= 0:
+            return 0
+        data = self.f.read(n)
+        buffer[:len(data)] = data
+        self.remaining -= len(data)
+        return len(data)
+
+
+def _last_line_end(f, start, size):
+    # Offset just past the last complete line in [start, size); a line still being written waits for the next run
+    pos = size
+    while pos > start:
+        block_start = max(start, pos - 65536)
+        f.seek(block_start)
+        block = f.read(pos - block_start)
+        newline = block.rfind(b"\n")
+        if newline >= 0:
+            return block_start + newline + 1
+        pos = block_start
+    return start
+
+
+def _prefix_digest(path, length):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read(length)).hexdigest()
+
+
+class FeatureBuildState:
+    def __init__(self):
+        """
+        What an incremental rebuild needs from previous runs (kept small; the partials
+        themselves are stored per month, see update_features):
+        1. Per-source watermark: byte offset consumed, a digest of the file's leading bytes
+           and the latest raw timestamp seen.
+        2. `run`: number of the last run; `pending`: that run's new rows are saved but may not
+           have been merged into every month yet.
+        """
+        self.version = STATE_VERSION
+        self.watermarks = {}
+        self.run = 0
+        self.pending = False
+
+    @classmethod
+    def load(cls, path):
+        state = _load_pickle(path)
+        return state if getattr(state, "version", None) == STATE_VERSION else None
+
+    def save(self, path):
+        _save_pickle(self, path)
+
+    def is_append_of(self, source, path):
+        """False when the file shrank or its already-consumed prefix changed (regenerated data)."""
+        mark = self.watermarks.get(source)
+        if mark is None:
+            return True
+        if not os.path.exists(path) or os.path.getsize(path) < mark["offset"]:
+            return False
+        return _prefix_digest(path, mark["prefix_len"]) == mark["prefix_sha1"]
+
+    def advance_max_time(self, source, latest):
+        previous = self.watermarks[source]["max_time"]
+        if latest is not None and (previous is None or latest > previous):
+            self.watermarks[source]["max_time"] = latest
+
+    def read_new(self, source, path, chunk_rows=CHUNK_ROWS):
+        """Yields dtype'd chunks of the complete rows appended since the last run, then advances the offset."""
+        offset = self.watermarks.get(source, {}).get("offset", 0)
+        with open(path, "rb") as f:
+            header = f.readline()
+            start = max(offset, f.tell())
+            end = _last_line_end(f, start, os.path.getsize(path))
+            if end > start:
+                f.seek(start)
+                text = io.TextIOWrapper(io.BufferedReader(_ByteRange(f, end - start)), encoding="utf-8", newline="")
+                names = header.decode("utf-8-sig").strip().split(",")
+                dtypes = SOURCE_DTYPES[source]
+                yield from pd.read_csv(text, header=None, names=names, usecols=list(dtypes), dtype=dtypes, chunksize=chunk_rows)
+
+        prefix_len = min(end, FINGERPRINT_BYTES)
+        self.watermarks[source] = {
+            "offset": end,
+            "prefix_len": prefix_len,
+            "prefix_sha1": _prefix_digest(path, prefix_len),
+            "max_time": self.watermarks.get(source, {}).get("max_time"),
+        }
+
+
+def _load_pickle(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def _save_pickle(obj, path):
+    # Write-then-rename, so a crash never leaves a half-written file behind
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+def _month(frame):
+    return frame['date'].dt.strftime('%Y-%m')
+
+
+def _reset(output_dir, state_dir):
+    # Full rebuild: drop every partition file and all stored partials
+    shutil.rmtree(state_dir, ignore_errors=True)
+    if os.path.isdir(output_dir):
+        for name in os.listdir(output_dir):
+            if name.endswith((".csv", ".parquet")):
+                os.remove(os.path.join(output_dir, name))
+
+
+def _write_month(output_dir, month, store, parquet):
+    labels = store["labels"]
+    if labels is None:
+        labels = label_frame(pd.DataFrame(columns=['uid', 'date', 'answer']))
+    features = assemble_features(labels, store["partials"].daily_features())
+    features = features.sort_values(KEYS, kind='stable', ignore_index=True)
+    path = os.path.join(output_dir, f"{month}.csv")
+    tmp = f"{path}.tmp"
+    features.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+    if parquet:
+        write_parquet(features, os.path.join(output_dir, f"{month}.parquet"))
+    return path
+
+
+def _apply_pending(output_dir, state_dir, run, parquet):
+    """
+    Merges the pending run's new partials and labels into the stored partials of the months
+    they touch, then rewrites those months' output files. Safe to repeat: a month records the
+    last run merged into it, so rerunning after a crash never merges the same rows twice.
+    """
+    pending = _load_pickle(os.path.join(state_dir, "pending.pkl"))
+    partials = pending["partials"].partition(_month)
+    labels = {} if pending["labels"] is None else {
+        month: part.reset_index(drop=True) for month, part in pending["labels"].groupby(_month(pending["labels"]), sort=True)
+    }
+
+    written = []
+    for month in sorted(set(partials) | set(labels)):
+        path = os.path.join(state_dir, f"{month}.pkl")
+        store = _load_pickle(path) or {"run": 0, "partials": DailyPartials(), "labels": None}
+        if store["run"] < run:
+            if month in partials:
+                store["partials"].merge(partials[month])
+                for source in store["partials"].parts:
+                    store["partials"].combined(source) # Stored fully reduced
+            if month in labels:
+                store["labels"] = pd.concat([frame for frame in (store["labels"], labels[month]) if frame is not None],
+                                            ignore_index=True)
+            store["run"] = run
+            _save_pickle(store, path)
+        written.append(_write_month(output_dir, month, store, parquet))
+    return written
+
+
+def update_features(data_dir="data/studentlife", output_dir="bhavya_features", chunk_rows=CHUNK_ROWS, parquet=True):
+    """
+    Incremental build_features into a month-partitioned table: `output_dir`/YYYY-MM.csv
+    (read with read_feature_table / StudentLifeDataset). Work per run scales with the new
+    raw rows and the months they touch, not with the whole history.
+    1. Load the state; any source that was rewritten (not appended to) forces a full rebuild.
+    2. Read only the raw rows appended since the last run and reduce them into partials.
+    3. Save them as the pending run, merge them into the stored partials of the months they
+       touch (late rows for old days merge correctly) and rewrite only those months' files.
+    Re-running with no new data is a no-op, and an interrupted run is completed by the next one.
+    """
+    state_dir = os.path.join(output_dir, "_state")
+    state_path = os.path.join(state_dir, "state.pkl")
+    paths = {source: os.path.join(data_dir, f"{source}.csv") for source in RAW_SOURCES + ("survey",)}
+
+    state = FeatureBuildState.load(state_path)
+    if state is None or not all(state.is_append_of(source, path) for source, path in paths.items()):
+        print("Building BHAVYA Features (full rebuild)...")
+        _reset(output_dir, state_dir)
+        state = FeatureBuildState()
+    else:
+        print("Updating BHAVYA Features (incremental)...")
+    os.makedirs(state_dir, exist_ok=True)
+
+    written = []
+    if state.pending:
+        print(" - Completing the interrupted previous run")
+        written += _apply_pending(output_dir, state_dir, state.run, parquet)
+        state.pending = False
+        state.save(state_path)
+
+    # 1. New raw rows -> partials of the new rows only
+    new = DailyPartials()
+    new_rows = 0
+    for source in RAW_SOURCES:
+        add = getattr(new, f"add_{source}")
+        for chunk in state.read_new(source, paths[source], chunk_rows):
+            add(chunk)
+            new_rows += len(chunk)
+        state.advance_max_time(source, new.max_time.get(source))
+
+    # 2. New survey answers -> labels (each one is an output row)
+    new_labels = [label_frame(chunk) for chunk in state.read_new("survey", paths["survey"], chunk_rows)]
+    labels = pd.concat(new_labels, ignore_index=True) if new_labels else None
+    if labels is not None:
+        new_rows += len(labels)
+        state.advance_max_time("survey", labels['date'].max())
+
+    if new_rows == 0:
+        state.save(state_path) # Watermarks may still have moved (e.g. a header-only file)
+        print(" - Up to date (no new raw rows)")
+        return written
+
+    # 3. Pending run first, so a crash mid-merge is finished next time instead of losing these rows
+    _save_pickle({"partials": new, "labels": labels}, os.path.join(state_dir, "pending.pkl"))
+    state.run += 1
+    state.pending = True
+    state.save(state_path)
+
+    months = _apply_pending(output_dir, state_dir, state.run, parquet)
+    state.pending = False
+    state.save(state_path)
+    os.remove(os.path.join(state_dir, "pending.pkl"))
+    print(f" - {new_rows} new raw rows, {len(months)} months rewritten in {output_dir}")
+    return written + months
+
+if __name__ == "__main__":
+    update_features()
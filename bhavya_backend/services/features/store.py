@@ -0,0 +1,163 @@
+from collections import defaultdict
+from datetime import datetime, date, timedelta
+
+import numpy as np
+
+from app.db import models
+
+# Same daily vector as services/features/build_features.py
+FEATURE_COLUMNS = ['sleep_duration', 'sleep_midpoint', 'activity_level', 'activity_variance', 'routine_change']
+RAW_TYPES = ("sleep", "activity", "gps")
+
+
+def _samples(payload):
+    # A payload is one sample (dict) or a list of samples
+    if isinstance(payload, list):
+        return [p for p in payload if isinstance(p, dict)]
+    if isinstance(payload, dict):
+        return [payload]
+    return []
+
+
+def _sample_day(data_type, timestamp, sample):
+    # Sleep belongs to the night's "date" (as in sleep.csv); everything else to its timestamp's day
+    if data_type == "sleep" and sample.get("date"):
+        return date.fromisoformat(str(sample["date"])[:10])
+    if sample.get("timestamp"):
+        return datetime.fromisoformat(str(sample["timestamp"])).date()
+    return timestamp.date()
+
+
+def _sleep_midpoint(sample):
+    # Hour of day (0-24) of start + duration/2, as in build_features.calculate_midpoint
+    start = datetime.fromisoformat(str(sample["start_time"]))
+    mid = start + timedelta(hours=float(sample.get("duration", 0)) / 2)
+    return mid.hour + mid.minute / 60.0
+
+
+def aggregate_day(samples_by_type):
+    """
+    Input: {"sleep": [...], "activity": [...], "gps": [...]} samples for one (user, day)
+    Output: feature dict with FEATURE_COLUMNS (missing sources -> 0, like build_features)
+    """
+    sleep = samples_by_type.get("sleep", [])
+    activity = [float(s.get("activity_inference", 0)) for s in samples_by_type.get("activity", [])]
+    locations = {s.get("location_id") for s in samples_by_type.get("gps", []) if s.get("location_id") is not None}
+
+    return {
+        'sleep_duration': float(sum(float(s.get("duration", 0)) for s in sleep)),
+        'sleep_midpoint': _sleep_midpoint(sleep[0]) if sleep and sleep[0].get("start_time") else 0.0,
+        'activity_level': float(sum(activity)),
+        # pandas std (ddof=1); a single sample has no variance -> 0
+        'activity_variance': float(np.std(activity, ddof=1)) if len(activity) > 1 else 0.0,
+        'routine_change': float(len(locations)),
+    }
+
+
+class FeatureStore:
+    """
+    Materialized per-user daily feature store.
+    Turns ingested BehavioralRaw sleep/activity/GPS payloads into one BehavioralFeatures
+    row per (user, day) so risk inference is a single indexed range read.
+    """
+
+    def materialize_days(self, db, user_id, days, commit=True):
+        """
+        Recomputes and upserts the feature rows for the given days of one user.
+        Raws are selected by the days their samples fall on (first/last_sample_date), not by
+        ingestion time, so late offline uploads count. Days without any sample are left untouched.
+        """
+        days = sorted(set(days))
+        if not days:
+            return 0
+
+        raws = db.query(models.BehavioralRaw).filter(
+            models.BehavioralRaw.user_id == user_id,
+            models.BehavioralRaw.data_type.in_(RAW_TYPES),
+            models.BehavioralRaw.last_sample_date >= days[0],
+            models.BehavioralRaw.first_sample_date <= days[-1],
+        ).order_by(models.BehavioralRaw.timestamp, models.BehavioralRaw.id).all()
+
+        grouped = self._group(raws)
+        materialized = [day for day in days if day in grouped]
+        for day in materialized:
+            self._upsert(db, user_id, day, aggregate_day(grouped[day]))
+        if commit:
+            db.commit()
+        return len(materialized)
+
+    def rebuild_user(self, db, user_id):
+        """Backfill: recomputes every day that has raw data for the user."""
+        raws = db.query(models.BehavioralRaw).filter(
+            models.BehavioralRaw.user_id == user_id,
+            models.BehavioralRaw.data_type.in_(RAW_TYPES),
+        ).order_by(models.BehavioralRaw.timestamp, models.BehavioralRaw.id).all()
+
+        grouped = self._group(raws)
+        for day, samples_by_type in grouped.items():
+            self._upsert(db, user_id, day, aggregate_day(samples_by_type))
+        db.commit()
+        return len(grouped)
+
+    def days_for(self, records):
+        """
+        Days touched by newly ingested records (dicts with data_type, payload, timestamp),
+        i.e. what materialize_days needs to recompute.
+        """
+        return {
+            _sample_day(r["data_type"], r["timestamp"], sample)
+            for r in records if r["data_type"] in RAW_TYPES
+            for sample in _samples(r["payload"])
+        }
+
+    def sample_range(self, record):
+        """(first, last) sample day of one record, or (None, None) when it holds no feature samples."""
+        days = self.days_for([record])
+        return (min(days), max(days)) if days else (None, None)
+
+    def stamp_sample_range(self, row):
+        """Sets first/last_sample_date on a BehavioralRaw row dict before it is inserted; returns its sample days."""
+        days = self.days_for([row])
+        row["first_sample_date"], row["last_sample_date"] = (min(days), max(days)) if days else (None, None)
+        return days
+
+    def last_n_days(self, db, user_id, n, as_of=None):
+        """
+        Returns (days, features) for the user's most recent n materialized days,
+        oldest first; features is an (k, 5) array with k <= n.
+        Served by the (user_id, date) index.
+        """
+        query = db.query(models.BehavioralFeatures).filter(models.BehavioralFeatures.user_id == user_id)
+        if as_of is not None:
+            query = query.filter(models.BehavioralFeatures.date <= datetime.combine(as_of, datetime.min.time()))
+        rows = query.order_by(models.BehavioralFeatures.date.desc()).limit(n).all()
+        rows.reverse()
+
+        days = [row.date.date() for row in rows]
+        features = np.array(
+            [[row.feature_vector.get(col, 0.0) for col in FEATURE_COLUMNS] for row in rows],
+            dtype=np.float32,
+        ).reshape(len(rows), len(FEATURE_COLUMNS))
+        return days, features
+
+    def _group(self, raws):
+        grouped = defaultdict(lambda: defaultdict(list))
+        for raw in raws:
+            for sample in _samples(raw.payload):
+                grouped[_sample_day(raw.data_type, raw.timestamp, sample)][raw.data_type].append(sample)
+        return grouped
+
+    def _upsert(self, db, user_id, day, vector):
+        day_start = datetime.combine(day, datetime.min.time())
+        row = db.query(models.BehavioralFeatures).filter(
+            models.BehavioralFeatures.user_id == user_id,
+            models.BehavioralFeatures.date == day_start,
+        ).first()
+        if row is None:
+            row = models.BehavioralFeatures(user_id=user_id, date=day_start)
+            db.add(row)
+        row.feature_vector = vector
+
+
+# Singleton instance
+feature_store = FeatureStore()
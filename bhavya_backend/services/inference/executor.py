@@ -0,0 +1,90 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.config import settings
+
+
+class InferenceBusyError(Exception):
+    pass
+
+
+class InferenceExecutor:
+    def __init__(self, max_workers=2, max_pending=64, acquire_timeout_s=5.0):
+        """
+        Bounded executor for CPU-bound model work called from async routes.
+        Inference runs on `max_workers` dedicated threads (torch/numpy release the GIL),
+        so it never blocks the event loop and never starves the shared threadpool
+        used for sync routes and DB calls. At most `max_pending` calls may be queued or
+        running; further callers wait up to `acquire_timeout_s` and then get InferenceBusyError.
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.acquire_timeout = acquire_timeout_s
+
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="inference")
+        self._slots = asyncio.Semaphore(max_pending)
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait_ms = 0.0
+        self.total_run_ms = 0.0
+        self.max_run_ms = 0.0
+
+    async def run(self, fn, *args):
+        """Runs fn(*args) on the inference pool and awaits its result."""
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.acquire_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise InferenceBusyError("Inference capacity exhausted")
+
+        with self._lock:
+            self.in_flight += 1
+        queued_at = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool, self._timed, fn, args, queued_at)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+            self._slots.release()
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
+
+    def stats(self):
+        return {
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_ms": self.total_wait_ms / self.completed if self.completed else 0.0,
+            "avg_run_ms": self.total_run_ms / self.completed if self.completed else 0.0,
+            "max_run_ms": self.max_run_ms,
+        }
+
+    def _timed(self, fn, args, queued_at):
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            end = time.perf_counter()
+            run_ms = (end - start) * 1000.0
+            with self._lock:
+                self.completed += 1
+                self.total_wait_ms += (start - queued_at) * 1000.0
+                self.total_run_ms += run_ms
+                self.max_run_ms = max(self.max_run_ms, run_ms)
+
+
+# Singleton instance (shut down by the app lifecycle in app/main.py)
+inference_executor = InferenceExecutor(
+    max_workers=settings.INFERENCE_EXECUTOR_WORKERS,
+    max_pending=settings.INFERENCE_EXECUTOR_MAX_PENDING,
+    acquire_timeout_s=settings.INFERENCE_EXECUTOR_TIMEOUT_S,
+)
@@ -0,0 +1,32 @@
+from collections import OrderedDict
+
+
+class InvalidationLog:
+    def __init__(self, max_entries=10000):
+        """
+        Answers "was this user invalidated after `generation`?" in bounded memory.
+        1. One global epoch counts invalidations; generation() is read before a computation.
+        2. The epoch of each user's last invalidation is kept for the `max_entries` most
+           recently invalidated users.
+        3. Forgetting a user raises a floor: a generation below it counts as stale for every
+           user, so evictions can only drop a fresh put, never let a stale one through.
+        Not locked; the owning cache calls it under its own lock.
+        """
+        self.max_entries = max_entries
+        self._epoch = 0
+        self._floor = 0
+        self._last = OrderedDict() # user_id -> epoch of the user's last invalidation
+
+    def generation(self):
+        return self._epoch
+
+    def invalidate(self, user_id):
+        self._epoch += 1
+        self._last[user_id] = self._epoch
+        self._last.move_to_end(user_id)
+        while len(self._last) > self.max_entries:
+            _, epoch = self._last.popitem(last=False)
+            self._floor = max(self._floor, epoch)
+
+    def is_stale(self, user_id, generation):
+        return generation < self._floor or self._last.get(user_id, 0) > generation
@@ -18,18 +18,27 @@ class BehavioralLSTM(nn.Module):
 
     def forward(self, x):
         # x shape: (batch_size, seq_len, input_dim)
-        
-        # Initialize hidden state with zeros
-        h0 = torch.zeros(self.num_layers, x.size(0), self.hidden_dim).to(x.device)
-        c0 = torch.zeros(self.num_layers, x.size(0), self.hidden_dim).to(x.device)
+        out, _ = self.forward_with_state(x)
+        return out
+
+    def forward_with_state(self, x, hidden=None):
+        """
+        Same as forward, but also returns the final (h, c) so a caller can resume
+        from it later (stateful / incremental inference).
+        """
+        if hidden is None:
+            # Initialize hidden state with zeros
+            h0 = torch.zeros(self.num_layers, x.size(0), self.hidden_dim).to(x.device)
+            c0 = torch.zeros(self.num_layers, x.size(0), self.hidden_dim).to(x.device)
+            hidden = (h0, c0)
         
         # Forward propagate LSTM
-        out, _ = self.lstm(x, (h0, c0))
+        out, hidden = self.lstm(x, hidden)
         
         # Decode the hidden state of the last time step
         out = self.fc(out[:, -1, :])
         
-        return self.sigmoid(out)
+        return self.sigmoid(out), hidden
 
 class BehavioralTransformer(nn.Module):
     def __init__(self, input_dim, d_model=64, nhead=4, num_layers=2, output_dim=1):
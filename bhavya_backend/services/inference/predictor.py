@@ -1,51 +1,170 @@
 import torch
 import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime, date, timedelta
+from app.core.config import settings
 from app.db import models
-from services.inference.models import BehavioralLSTM
+from services.inference.registry import registry
+from services.inference.state_cache import HiddenStateCache
+from services.inference.risk_cache import RiskCache
+from services.features.store import feature_store
 
 class RiskPredictor:
-    def __init__(self, model_path="services/inference/studentlife_model_v1.pt"):
+    def __init__(self, model_name="risk_lstm", baseline_name="risk_baseline"):
         self.device = torch.device("cpu") # For inference, CPU is fine
-        self.model = BehavioralLSTM(input_dim=5, hidden_dim=32, output_dim=1).to(self.device)
-        
-        try:
-            self.model.load_state_dict(torch.load(model_path, map_location=self.device))
-            self.model.eval()
-            print(f"RiskPredictor loaded model from {model_path}")
-        except FileNotFoundError:
-            print(f"Warning: Model not found at {model_path}. Using random weights.")
-
-    def predict_risk(self, user_id: int, db) -> dict:
+        self.model_name = model_name
+        self.baseline_name = baseline_name
+        self.state_cache = HiddenStateCache(
+            max_entries=settings.RISK_STATE_CACHE_MAX_ENTRIES,
+            spill_dir=settings.RISK_STATE_SPILL_DIR,
+        )
+        self.cache = RiskCache(
+            max_entries=settings.RISK_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.RISK_CACHE_TTL_SECONDS,
+        )
+        registry.add_reload_listener(self._on_model_reload)
+
+    @property
+    def model(self):
+        # Shared eval-mode instance, loaded once per process by the registry
+        return registry.get(self.model_name)
+
+    @property
+    def has_baseline(self):
+        # The RandomForest tier exists once services/optimization/baseline.py has persisted it
+        return self.baseline_name in registry
+
+    def predict_risk(self, user_id: int, db, use_cache: bool = True, tier: str = "lstm") -> dict:
+        """
+        Predicts stress/risk level for a user based on recent behavior.
+        Served from the per-user cache until the user's data changes or the model is reloaded.
+        tier="baseline" answers a cache miss with the RandomForest instead of the LSTM;
+        those answers are not cached, so the next LSTM answer replaces them.
+        """
+        use_cache = use_cache and settings.RISK_CACHE_ENABLED
+        model_version = registry.version(self.model_name)
+        generation = self.cache.generation(user_id)
+        if use_cache:
+            cached = self.cache.get(user_id, model_version)
+            if cached is not None:
+                return cached
+
+        if tier == "baseline":
+            return self._predict_baseline(user_id, db)
+
+        prediction = self._predict_uncached(user_id, db)
+        if use_cache:
+            self.cache.put(user_id, model_version, prediction, generation)
+        return prediction
+
+    def invalidate_user(self, user_id: int, days=None):
+        """
+        New behavior or check-in for this user: drops the cached prediction.
+        `days` are the feature days the new data touched (None: unknown). The LSTM state is
+        only dropped when one of them was already consumed by it; appended days keep it.
+        """
+        self.cache.invalidate(user_id)
+        if days is None:
+            self.state_cache.invalidate(user_id)
+        elif days:
+            self.state_cache.invalidate_from(user_id, min(days))
+
+    def _on_model_reload(self, name):
+        if name == self.model_name:
+            self.cache.clear()
+            self.state_cache.clear()
+
+    def _recent_features(self, user_id: int, db):
+        # 1. Fetch recent behavior (last RISK_HISTORY_DAYS materialized days, one indexed range read)
+        seq_len = settings.RISK_HISTORY_DAYS
+        days, features = feature_store.last_n_days(db, user_id, seq_len)
+        if len(features) == 0:
+            # No ingested behavior yet: synthetic sequence so the ALGO still runs for demo users
+            days, features = [date.today()], self._generate_demo_features(user_id, seq_len)
+        return days, features
+
+    def _predict_uncached(self, user_id: int, db) -> dict:
         """
         Predicts stress/risk level for a user based on recent behavior.
         If behavior is missing, generates synthetic data for demonstration.
         """
-        # 1. Fetch recent behavior (Last 7 days)
-        # For now, we simulate fetching behavior data. 
-        # In production, query `db_raw` or similar tables.
+        # Read before the features, so a day rewritten meanwhile can't be cached into the LSTM state
+        state_generation = self.state_cache.generation(user_id)
+        days, features = self._recent_features(user_id, db)
         
-        # Simulate fetching data (or use real if implemented)
-        # We'll generate a sequence for the user to ensure the ALGO runs
-        seq_len = 7
-        features = self._fetch_or_generate_features(user_id, seq_len)
-        
-        # 2. Prepare Tensor
-        x = torch.tensor(features, dtype=torch.float32).unsqueeze(0).to(self.device) # (1, 7, 5)
-        
-        # 3. Inference
-        with torch.no_grad():
-            risk_prob = self.model(x).item()
+        # Exported TorchScript artifacts only expose forward(), so they always use the window path
+        if settings.RISK_INFERENCE_MODE == "stateful" and hasattr(self.model, "forward_with_state"):
+            risk_prob = self._predict_stateful(user_id, features, days[-1], state_generation)
+        else:
+            # 2. Prepare Tensor
+            x = torch.tensor(features, dtype=torch.float32).unsqueeze(0).to(self.device) # (1, seq_len, 5)
+            
+            # 3. Inference
+            with torch.no_grad():
+                risk_prob = self.model(x).item()
             
+        return self._result(risk_prob, features, "lstm")
+
+    def _predict_baseline(self, user_id: int, db) -> dict:
+        """Fast tier: the RandomForest scores the most recent day on its own (no sequence)."""
+        _, features = self._recent_features(user_id, db)
+        model = registry.get(self.baseline_name)
+        # A forest fit on one class has a single predict_proba column: find the high-risk one by label
+        positive = np.flatnonzero(model.classes_ == 1)
+        if len(positive) == 0:
+            risk_prob = 0.0 # Never saw a high-risk day
+        else:
+            risk_prob = model.predict_proba(np.asarray(features[-1:], dtype=np.float32))[0, positive[0]]
+        return self._result(risk_prob, features, "baseline")
+
+    def _result(self, risk_prob, features, tier):
         return {
             "risk_score": float(risk_prob),
             "risk_label": "High" if risk_prob > 0.6 else "Medium" if risk_prob > 0.3 else "Low",
-            "contributing_factors": self._explain_risk(features)
+            "contributing_factors": self._explain_risk(features),
+            "tier": tier,
         }
 
-    def _fetch_or_generate_features(self, user_id, seq_len):
-        # Placeholder: Generate 7 days of random behavioral data
+    def _predict_stateful(self, user_id, features, last_day, generation=None):
+        """
+        Incremental inference: resume from the user's cached (h, c) instead of replaying history.
+        - Same day already processed -> cached output.
+        - Cached state is from the previous day -> one LSTM step on the newest day.
+        - Otherwise (cold cache, gap in days, new model version, or a consumed day was rewritten,
+          which drops the state) -> re-anchor: replay `features`, the last RISK_HISTORY_DAYS days.
+        The state is cumulative: after re-anchoring it keeps every day stepped since, so unlike
+        "window" mode the score is not limited to the last RISK_HISTORY_DAYS days.
+        """
+        model_version = registry.version(self.model_name)
+        entry = self.state_cache.get(user_id, model_version)
+        last_day_str = last_day.isoformat()
+
+        if entry is not None and entry["last_day"] == last_day_str:
+            return entry["risk_prob"]
+
+        if entry is not None and entry["last_day"] == (last_day - timedelta(days=1)).isoformat():
+            x = features[-1:]
+            hidden = (entry["h"], entry["c"])
+        else:
+            x = features
+            hidden = None
+
+        x = torch.tensor(x, dtype=torch.float32).unsqueeze(0).to(self.device)
+        with torch.no_grad():
+            out, (h, c) = self.model.forward_with_state(x, hidden)
+        risk_prob = out.item()
+
+        self.state_cache.put(user_id, {
+            "h": h,
+            "c": c,
+            "last_day": last_day_str,
+            "model_version": model_version,
+            "risk_prob": risk_prob,
+        }, generation)
+        return risk_prob
+
+    def _generate_demo_features(self, user_id, seq_len):
+        # Demo fallback: generate seq_len days of random behavioral data
         # ['sleep_duration', 'sleep_midpoint', 'activity_level', 'activity_variance', 'routine_change']
         
         # Simulate a stressed user pattern for demonstration if user_id is odd, else healthy
@@ -0,0 +1,206 @@
+import hashlib
+import os
+import threading
+import time
+
+import numpy as np
+import torch
+
+from app.core.config import settings
+
+
+class ModelEntry:
+    def __init__(self, name, loader, warmup=None):
+        """
+        One registered model. `loader` builds the instance, `warmup` (optional)
+        runs a dummy forward on it so the first real request doesn't pay for lazy init.
+        """
+        self.name = name
+        self.loader = loader
+        self.warmup = warmup
+        self.instance = None
+        self.load_time_ms = None
+        self.memory_bytes = None
+        self.loaded_at = None
+        self.version = None
+
+    def load(self):
+        start = time.perf_counter()
+        instance = self.loader()
+        if isinstance(instance, torch.nn.Module):
+            instance.eval()
+        if self.warmup is not None and settings.MODEL_WARMUP:
+            with torch.no_grad():
+                self.warmup(instance)
+        self.load_time_ms = (time.perf_counter() - start) * 1000.0
+        self.memory_bytes = _memory_footprint(instance)
+        self.version = _weights_version(self.name, instance)
+        self.loaded_at = time.time()
+        self.instance = instance
+        print(f"[Registry] Loaded '{self.name}' in {self.load_time_ms:.1f} ms ({self.memory_bytes} bytes)")
+        return instance
+
+    def stats(self):
+        return {
+            "loaded": self.instance is not None,
+            "load_time_ms": self.load_time_ms,
+            "memory_bytes": self.memory_bytes,
+            "loaded_at": self.loaded_at,
+            "version": self.version,
+        }
+
+
+class ModelRegistry:
+    def __init__(self):
+        """
+        Process-wide model registry.
+        Each model is loaded once, warmed up, put in eval mode and shared by every router.
+        """
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._reload_listeners = []
+
+    def add_reload_listener(self, listener):
+        """listener(name) is called after a model has been reloaded."""
+        self._reload_listeners.append(listener)
+
+    def register(self, name, loader, warmup=None):
+        self._entries[name] = ModelEntry(name, loader, warmup)
+
+    def __contains__(self, name):
+        return name in self._entries
+
+    def get(self, name):
+        entry = self._entries[name]
+        if entry.instance is None:
+            with self._lock:
+                if entry.instance is None:
+                    entry.load()
+        return entry.instance
+
+    def version(self, name):
+        self.get(name)
+        return self._entries[name].version
+
+    def reload(self, name):
+        entry = self._entries[name]
+        with self._lock:
+            instance = entry.load()
+        for listener in self._reload_listeners:
+            listener(name)
+        return instance
+
+    def load_all(self):
+        for name in self._entries:
+            self.get(name)
+
+    def stats(self):
+        return {name: entry.stats() for name, entry in self._entries.items()}
+
+
+def _iter_tensors(value):
+    # state_dict values of quantized modules can be packed (weight, bias) tuples
+    if isinstance(value, torch.Tensor):
+        yield value.dequantize() if value.is_quantized else value
+    elif isinstance(value, (tuple, list)):
+        for item in value:
+            yield from _iter_tensors(item)
+
+
+def _memory_footprint(instance):
+    if isinstance(instance, torch.nn.Module):
+        total = 0
+        for value in instance.state_dict().values():
+            if isinstance(value, torch.Tensor):
+                total += value.numel() * value.element_size()
+            else:
+                total += sum(t.numel() * t.element_size() for t in _iter_tensors(value))
+        return total
+    return 0
+
+
+def _weights_version(name, instance):
+    # Content hash of the weights: stable across processes, changes when the model is retrained
+    if not isinstance(instance, torch.nn.Module):
+        return name
+    digest = hashlib.sha1()
+    for key, value in instance.state_dict().items():
+        digest.update(key.encode())
+        for tensor in _iter_tensors(value):
+            digest.update(tensor.detach().cpu().numpy().tobytes())
+    return f"{name}-{digest.hexdigest()[:12]}"
+
+
+def _seeded_init(factory):
+    # Deterministic random init so every worker/process agrees when no trained weights exist
+    with torch.random.fork_rng():
+        torch.manual_seed(settings.MODEL_INIT_SEED)
+        return factory()
+
+
+# --- Loaders ---
+
+def _load_npu_interface():
+    from services.affective_engine.npu_interface import NPUInterface
+    return NPUInterface()
+
+
+def _load_artifact(path):
+    # TorchScript artifact produced by services/optimization/export.py
+    model = torch.jit.load(path, map_location="cpu")
+    print(f"[Registry] TorchScript artifact loaded from {path}")
+    return model
+
+
+def _load_eev_temporal():
+    from services.affective_engine.temporal_model import EEVTemporalModel
+    if settings.EEV_MODEL_ARTIFACT:
+        return _load_artifact(settings.EEV_MODEL_ARTIFACT)
+    model = _seeded_init(EEVTemporalModel)
+    if settings.EEV_MODEL_PATH and os.path.exists(settings.EEV_MODEL_PATH):
+        model.load_state_dict(torch.load(settings.EEV_MODEL_PATH, map_location="cpu"))
+        print(f"[Registry] EEVTemporalModel weights loaded from {settings.EEV_MODEL_PATH}")
+    return model
+
+
+def _load_risk_lstm():
+    from services.inference.models import BehavioralLSTM
+    if settings.RISK_MODEL_ARTIFACT:
+        return _load_artifact(settings.RISK_MODEL_ARTIFACT)
+    model = _seeded_init(lambda: BehavioralLSTM(input_dim=5, hidden_dim=32, output_dim=1))
+    try:
+        model.load_state_dict(torch.load(settings.RISK_MODEL_PATH, map_location="cpu"))
+        print(f"[Registry] BehavioralLSTM weights loaded from {settings.RISK_MODEL_PATH}")
+    except FileNotFoundError:
+        print(f"Warning: Model not found at {settings.RISK_MODEL_PATH}. Using random weights.")
+    return model
+
+
+def _load_risk_baseline():
+    # RandomForest persisted by services/optimization/baseline.py
+    import joblib
+    model = joblib.load(settings.RISK_BASELINE_PATH)
+    print(f"[Registry] RandomForest baseline loaded from {settings.RISK_BASELINE_PATH}")
+    return model
+
+
+# Singleton instance
+registry = ModelRegistry()
+registry.register(
+    "npu_interface", _load_npu_interface,
+    warmup=lambda npu: npu.process_question_answers([0] * 10),
+)
+registry.register(
+    "eev_temporal", _load_eev_temporal,
+    warmup=lambda model: model(torch.zeros(1, 30, 15)),
+)
+registry.register(
+    "risk_lstm", _load_risk_lstm,
+    warmup=lambda model: model(torch.zeros(1, 7, 5)),
+)
+# Fast tier for risk inference; only available once the baseline has been trained
+if os.path.exists(settings.RISK_BASELINE_PATH):
+    registry.register(
+        "risk_baseline", _load_risk_baseline,
+        warmup=lambda model: model.predict_proba(np.zeros((1, 5), dtype=np.float32)),
+    )
@@ -0,0 +1,78 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from services.inference.invalidation import InvalidationLog
+
+
+class RiskCache:
+    def __init__(self, max_entries=10000, ttl_seconds=300.0):
+        """
+        Bounded LRU + TTL cache of risk predictions, keyed by (user, model version).
+        Entries are invalidated when the user ingests data or checks in, and the whole
+        cache is cleared when the model is reloaded.
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self._entries = OrderedDict() # user_id -> (model_version, expires_at, prediction)
+        self._invalidations = InvalidationLog(max_entries) # A put computed before an invalidation is dropped
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.stale_puts = 0
+
+    def get(self, user_id, model_version):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] != model_version or entry[1] < time.monotonic():
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return copy.deepcopy(entry[2]) # Callers may mutate their result
+
+    def generation(self, user_id):
+        """Read before computing a prediction and pass to put(): invalidations in between win."""
+        with self._lock:
+            return self._invalidations.generation()
+
+    def put(self, user_id, model_version, prediction, generation=None):
+        with self._lock:
+            if generation is not None and self._invalidations.is_stale(user_id, generation):
+                self.stale_puts += 1 # Computed from data the user has since replaced
+                return
+            self._entries[user_id] = (model_version, time.monotonic() + self.ttl, copy.deepcopy(prediction))
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._invalidations.invalidate(user_id)
+            if self._entries.pop(user_id, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "stale_puts": self.stale_puts,
+        }
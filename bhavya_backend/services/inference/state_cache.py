@@ -0,0 +1,130 @@
+import os
+import threading
+from collections import OrderedDict
+
+import torch
+
+from services.inference.invalidation import InvalidationLog
+
+
+class HiddenStateCache:
+    def __init__(self, max_entries=10000, spill_dir=None):
+        """
+        Per-user LSTM hidden-state cache for stateful risk inference.
+        Keeps the (h, c) reached after each user's last processed day in a bounded LRU.
+        Evicted entries are spilled to `spill_dir` (one file per user, created on the first spill)
+        and reloaded on a miss.
+        Entries carry the model version they were computed with; a mismatch is a miss.
+        """
+        self.max_entries = max_entries
+        self.spill_dir = spill_dir
+        self._entries = OrderedDict()
+        self._invalidations = InvalidationLog(max_entries) # A put computed before an invalidation is dropped
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.spills = 0
+        self.disk_loads = 0
+
+    def get(self, user_id, model_version):
+        """
+        Returns {"h", "c", "last_day", "model_version", "risk_prob"} or None.
+        """
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                self._entries.move_to_end(user_id)
+            else:
+                entry = self._load_spilled(user_id)
+                if entry is not None:
+                    self._insert(user_id, entry)
+
+            if entry is None or entry["model_version"] != model_version:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry
+
+    def generation(self, user_id):
+        with self._lock:
+            return self._invalidations.generation()
+
+    def put(self, user_id, entry, generation=None):
+        with self._lock:
+            if generation is not None and self._invalidations.is_stale(user_id, generation):
+                return # A day this state consumed was rewritten meanwhile
+            self._insert(user_id, entry)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._drop(user_id)
+
+    def invalidate_from(self, user_id, day):
+        """
+        Drops the user's state only if it already consumed `day`, i.e. that day was rewritten.
+        New days after the last consumed one keep it, so the next prediction steps forward from it.
+        """
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                entry = self._load_spilled(user_id)
+                if entry is not None:
+                    self._insert(user_id, entry)
+            if entry is None or entry["last_day"] >= day.isoformat():
+                self._drop(user_id)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self.spill_dir and os.path.isdir(self.spill_dir):
+                for name in os.listdir(self.spill_dir):
+                    if name.endswith(".pt"):
+                        os.remove(os.path.join(self.spill_dir, name))
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "spills": self.spills,
+            "disk_loads": self.disk_loads,
+        }
+
+    def _drop(self, user_id):
+        self._invalidations.invalidate(user_id)
+        self._entries.pop(user_id, None)
+        path = self._spill_path(user_id)
+        if path and os.path.exists(path):
+            os.remove(path)
+
+    def _insert(self, user_id, entry):
+        self._entries[user_id] = entry
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_entries:
+            evicted_id, evicted = self._entries.popitem(last=False)
+            self._spill(evicted_id, evicted)
+
+    def _spill_path(self, user_id):
+        if not self.spill_dir:
+            return None
+        return os.path.join(self.spill_dir, f"{user_id}.pt")
+
+    def _spill(self, user_id, entry):
+        path = self._spill_path(user_id)
+        if path is None:
+            return
+        os.makedirs(self.spill_dir, exist_ok=True)
+        torch.save(entry, path)
+        self.spills += 1
+
+    def _load_spilled(self, user_id):
+        path = self._spill_path(user_id)
+        if path is None or not os.path.exists(path):
+            return None
+        entry = torch.load(path, map_location="cpu")
+        os.remove(path)  # Back in memory; the file is rewritten if evicted again
+        self.disk_loads += 1
+        return entry
@@ -0,0 +1,81 @@
+import threading
+
+from app.core.config import settings
+
+TIERS = ("lstm", "baseline")
+FALLBACK_REASONS = ("saturated", "slow", "timeout", "busy")
+
+
+class TierRouter:
+    def __init__(self, ewma_alpha=0.2, probe_every=20):
+        """
+        Picks the model tier that answers a risk request.
+        1. An EWMA of LSTM latency (queue wait + run, as seen by the caller) is kept from
+           every finished LSTM call.
+        2. The LSTM is skipped when its executor has no free slot ("saturated") or when the
+           EWMA exceeds the request's budget ("slow"); every `probe_every`-th slow skip still
+           tries the LSTM so the EWMA can recover.
+        3. Callers fall back as well when an LSTM call overruns its budget ("timeout") or
+           is rejected by the executor ("busy").
+        """
+        self.alpha = ewma_alpha
+        self.probe_every = probe_every
+        self._lock = threading.Lock()
+        self._slow_skips = 0
+
+        # Metrics
+        self.ewma_ms = None
+        self.answered = {tier: 0 for tier in TIERS}
+        self.total_ms = {tier: 0.0 for tier in TIERS}
+        self.fallbacks = {reason: 0 for reason in FALLBACK_REASONS}
+        self.probes = 0
+
+    def choose(self, budget_ms, executor):
+        """Returns (tier, fallback reason or None) for a request with `budget_ms` (None: no budget)."""
+        if executor.in_flight >= executor.max_pending:
+            return "baseline", "saturated"
+        ewma = self.ewma_ms
+        if budget_ms is not None and ewma is not None and ewma > budget_ms:
+            with self._lock:
+                self._slow_skips += 1
+                if self._slow_skips < self.probe_every:
+                    return "baseline", "slow"
+                self._slow_skips = 0
+                self.probes += 1
+        return "lstm", None
+
+    def observe_lstm(self, elapsed_ms):
+        # Every finished LSTM call, including ones that overran and were answered by the baseline
+        with self._lock:
+            if self.ewma_ms is None:
+                self.ewma_ms = elapsed_ms
+            else:
+                self.ewma_ms += self.alpha * (elapsed_ms - self.ewma_ms)
+
+    def record(self, tier, elapsed_ms, reason=None):
+        # The answer actually returned to the client
+        with self._lock:
+            self.answered[tier] += 1
+            self.total_ms[tier] += elapsed_ms
+            if reason is not None:
+                self.fallbacks[reason] += 1
+
+    def stats(self):
+        return {
+            "lstm_ewma_ms": self.ewma_ms,
+            "default_budget_ms": settings.RISK_LATENCY_BUDGET_MS,
+            "answered": dict(self.answered),
+            "avg_ms": {
+                tier: self.total_ms[tier] / self.answered[tier] if self.answered[tier] else 0.0
+                for tier in TIERS
+            },
+            "fallbacks": dict(self.fallbacks),
+            "probes": self.probes,
+        }
+
+
+# Singleton instance
+risk_tiers = TierRouter(
+    ewma_alpha=settings.RISK_LATENCY_EWMA_ALPHA,
+    probe_every=settings.RISK_LSTM_PROBE_EVERY,
+)
@@ -1,14 +1,20 @@
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report, accuracy_score
-import pandas as pd
 import numpy as np
+import joblib
+from app.core.config import settings
+from services.features.build_features import FEATURE_COLUMNS, read_feature_table
 
-def train_baseline():
+def train_baseline(output_path=None):
+    """
+    RandomForest on single-day features. Persisted to `output_path` (default
+    settings.RISK_BASELINE_PATH), where RiskPredictor loads it as its fast tier.
+    """
     print("Training Baseline BHAVYA Model...")
     
     # Load Features
-    df = pd.read_csv("bhavya_features.csv")
+    df = read_feature_table("bhavya_features.csv")
     
     # Binarize Target for Classification (High Stress vs Low Stress)
     # Stress 1-5. Let's say >=3 is High (1), else Low (0)
@@ -18,9 +24,9 @@ def train_baseline():
     print("Class Balance:", df['target'].value_counts().to_dict())
 
     # X and y
-    # Drop non-features
-    X = df.drop(columns=['uid', 'date', 'stress_label', 'target'])
-    y = df['target']
+    # Same columns, in the same order, as the feature store serves at inference time
+    X = df[FEATURE_COLUMNS].to_numpy(dtype=np.float32)
+    y = df['target'].to_numpy()
     
     # Split
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
@@ -40,9 +46,8 @@ def train_baseline():
     
     # Feature Importance
     importances = model.feature_importances_
-    features = X.columns
     print("Feature Importance:")
-    for name, imp in sorted(zip(features, importances), key=lambda x: x[1], reverse=True):
+    for name, imp in sorted(zip(FEATURE_COLUMNS, importances), key=lambda x: x[1], reverse=True):
         print(f"  {name}: {imp:.4f}")
 
     # Interpretation
@@ -52,5 +57,10 @@ def train_baseline():
     else:
         print("⚠️ Accuracy is low. Synthetic data might need stronger signal injection.")
 
+    output_path = output_path or settings.RISK_BASELINE_PATH
+    joblib.dump(model, output_path)
+    print(f"Baseline saved to {output_path}")
+    return model
+
 if __name__ == "__main__":
     train_baseline()
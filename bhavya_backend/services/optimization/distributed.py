@@ -0,0 +1,77 @@
+import os
+import socket
+
+import torch
+import torch.distributed as dist
+import torch.multiprocessing as mp
+from torch.utils.data import DataLoader, DistributedSampler
+
+
+def default_threads_per_rank(world_size):
+    # Split the cores evenly so ranks don't oversubscribe each other
+    return max(1, (os.cpu_count() or 1) // world_size)
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _entry(rank, fn, world_size, threads, port, args):
+    os.environ["MASTER_ADDR"] = "127.0.0.1"
+    os.environ["MASTER_PORT"] = str(port)
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass # Already fixed for this process
+    dist.init_process_group("gloo", rank=rank, world_size=world_size)
+    try:
+        fn(rank, world_size, *args)
+    finally:
+        dist.destroy_process_group()
+
+
+def launch(fn, world_size, *args, threads_per_rank=None):
+    """
+    Runs fn(rank, world_size, *args) in `world_size` local processes joined in a gloo
+    process group, each limited to `threads_per_rank` intra-op threads (default: cores / world_size).
+    fn must be a module-level function (processes are spawned).
+    """
+    threads = threads_per_rank or default_threads_per_rank(world_size)
+    print(f"[Distributed] Launching {world_size} ranks (gloo, {threads} threads each)")
+    mp.spawn(_entry, args=(fn, world_size, threads, _free_port(), args), nprocs=world_size, join=True)
+
+
+def is_distributed():
+    return dist.is_available() and dist.is_initialized()
+
+
+def is_main_process():
+    return not is_distributed() or dist.get_rank() == 0
+
+
+def distributed_loader(dataset, batch_size, shuffle=True, num_workers=0, seed=0):
+    """DataLoader over this rank's shard of `dataset` (reshuffled per epoch via ModelTrainer.train)."""
+    sampler = DistributedSampler(dataset, shuffle=shuffle, seed=seed)
+    return DataLoader(dataset, batch_size=batch_size, sampler=sampler, num_workers=num_workers,
+                      persistent_workers=num_workers > 0)
+
+
+def all_reduce_mean(value):
+    """Mean of a Python number across ranks (the value itself when not distributed)."""
+    if not is_distributed():
+        return value
+    tensor = torch.tensor([float(value)], dtype=torch.float64)
+    dist.all_reduce(tensor)
+    return tensor.item() / dist.get_world_size()
+
+
+def all_reduce_sum(value):
+    """Sum of a Python number across ranks (the value itself when not distributed)."""
+    if not is_distributed():
+        return value
+    tensor = torch.tensor([float(value)], dtype=torch.float64)
+    dist.all_reduce(tensor)
+    return tensor.item()
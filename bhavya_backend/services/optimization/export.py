@@ -0,0 +1,121 @@
+import os
+import json
+
+import torch
+import torch.nn as nn
+
+from app.core.config import settings
+from services.inference.models import BehavioralLSTM, BehavioralTransformer
+from services.affective_engine.temporal_model import EEVTemporalModel
+
+# name -> (factory, example input shape, trained weights path)
+MODEL_SPECS = {
+    "risk_lstm": (lambda: BehavioralLSTM(input_dim=5, hidden_dim=32, output_dim=1), (1, 7, 5), settings.RISK_MODEL_PATH),
+    "risk_transformer": (lambda: BehavioralTransformer(input_dim=5), (1, 7, 5), None),
+    "eev_temporal": (lambda: EEVTemporalModel(), (1, 30, 15), settings.EEV_MODEL_PATH),
+}
+
+VARIANTS = ("torchscript", "torchscript_int8")
+
+
+def build_eager(name):
+    factory, _, weights_path = MODEL_SPECS[name]
+    with torch.random.fork_rng():
+        torch.manual_seed(settings.MODEL_INIT_SEED)
+        model = factory()
+    if weights_path and os.path.exists(weights_path):
+        model.load_state_dict(torch.load(weights_path, map_location="cpu"))
+    else:
+        print(f"[Export] No trained weights for '{name}', exporting seeded random init.")
+    return model.eval()
+
+
+def quantize_dynamic(model):
+    """Dynamic int8 quantization of the LSTM and Linear layers (weights int8, activations fp32)."""
+    return torch.ao.quantization.quantize_dynamic(model, {nn.LSTM, nn.Linear}, dtype=torch.qint8)
+
+
+def to_torchscript(model, example):
+    with torch.no_grad():
+        traced = torch.jit.trace(model, example, check_trace=False)
+    return traced
+
+
+def build_variant(name, variant):
+    model = build_eager(name)
+    _, shape, _ = MODEL_SPECS[name]
+    example = torch.rand(*shape)
+    if variant == "torchscript_int8":
+        model = quantize_dynamic(model)
+    return to_torchscript(model, example)
+
+
+def artifact_path(out_dir, name, variant):
+    suffix = ".int8.ts.pt" if variant == "torchscript_int8" else ".ts.pt"
+    return os.path.join(out_dir, f"{name}{suffix}")
+
+
+def check_parity(reference, candidate, input_shape, batch_sizes=(1, 32, 256), seed=0):
+    """
+    Accuracy parity between an eager model and an exported variant on random inputs.
+    Reports the max absolute output difference and how often the predicted label agrees.
+    """
+    generator = torch.Generator().manual_seed(seed)
+    max_abs_diff = 0.0
+    agree = 0
+    total = 0
+    with torch.no_grad():
+        for batch_size in batch_sizes:
+            x = torch.rand(batch_size, *input_shape[1:], generator=generator)
+            ref = reference(x)
+            out = candidate(x)
+            max_abs_diff = max(max_abs_diff, (ref - out).abs().max().item())
+            if ref.shape[1] == 1:
+                ref_labels, out_labels = ref.squeeze(1) > 0.5, out.squeeze(1) > 0.5
+            else:
+                ref_labels, out_labels = ref.argmax(dim=1), out.argmax(dim=1)
+            agree += (ref_labels == out_labels).sum().item()
+            total += batch_size
+    return {"max_abs_diff": max_abs_diff, "label_agreement": agree / total}
+
+
+def export_models(out_dir=settings.MODEL_ARTIFACT_DIR, names=None, variants=VARIANTS, onnx=False):
+    """
+    Exports TorchScript (and dynamically quantized int8 TorchScript) artifacts for each model,
+    optionally ONNX too, and writes a parity report next to them.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    names = names or list(MODEL_SPECS)
+    report = {}
+
+    for name in names:
+        _, shape, _ = MODEL_SPECS[name]
+        eager = build_eager(name)
+        report[name] = {}
+
+        for variant in variants:
+            scripted = build_variant(name, variant)
+            path = artifact_path(out_dir, name, variant)
+            scripted.save(path)
+            parity = check_parity(eager, scripted, shape)
+            report[name][variant] = {"path": path, **parity}
+            print(f"[Export] {name} -> {path} | max|diff|={parity['max_abs_diff']:.2e} "
+                  f"label agreement={parity['label_agreement']:.4f}")
+
+        if onnx:
+            path = os.path.join(out_dir, f"{name}.onnx")
+            torch.onnx.export(
+                eager, torch.rand(*shape), path,
+                input_names=["x"], output_names=["probs"],
+                dynamic_axes={"x": {0: "batch"}, "probs": {0: "batch"}},
+            )
+            report[name]["onnx"] = {"path": path}
+            print(f"[Export] {name} -> {path}")
+
+    with open(os.path.join(out_dir, "parity_report.json"), "w") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    export_models()
@@ -0,0 +1,95 @@
+import json
+import sys
+import time
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+
+import torch
+from torch.profiler import ProfilerActivity, profile, record_function, schedule
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None where unsupported)."""
+    try:
+        import resource
+    except ImportError: # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10, 1)
+
+
+class PhaseTimer:
+    def __init__(self, phases, device=None, annotate=False):
+        """
+        Accumulates wall time per named phase (e.g. data / forward / backward / optimizer).
+        On CUDA the device is synchronized at phase edges so kernels are charged to their phase.
+        With `annotate`, each phase is also a torch.profiler record_function range.
+        """
+        self.phases = list(phases)
+        self.cuda = device is not None and torch.device(device).type == "cuda"
+        self.annotate = annotate
+        self.reset()
+
+    def reset(self):
+        self.totals = OrderedDict((name, 0.0) for name in self.phases)
+
+    @contextmanager
+    def phase(self, name):
+        if self.cuda:
+            torch.cuda.synchronize()
+        start = time.perf_counter()
+        with record_function(name) if self.annotate else nullcontext():
+            yield
+        if self.cuda:
+            torch.cuda.synchronize()
+        self.totals[name] += time.perf_counter() - start
+
+    def summary(self):
+        total = sum(self.totals.values())
+        return {
+            "phase_seconds": {name: round(t, 6) for name, t in self.totals.items()},
+            "phase_pct": {name: round(100.0 * t / total, 2) if total else 0.0 for name, t in self.totals.items()},
+        }
+
+
+def step_profiler(steps, skip=5, trace_path="training_trace.json"):
+    """
+    Opt-in torch.profiler capture: skips `skip` steps, warms up one, records `steps`,
+    then writes a Chrome trace (chrome://tracing, Perfetto) to `trace_path`.
+    Returns a null context when steps == 0; call .step() after every training step either way.
+    """
+    if not steps:
+        return _NullProfiler()
+
+    def export(prof):
+        prof.export_chrome_trace(trace_path)
+        print(f"[Profiler] Chrome trace of {steps} steps written to {trace_path}")
+
+    activities = [ProfilerActivity.CPU] + ([ProfilerActivity.CUDA] if torch.cuda.is_available() else [])
+    return profile(
+        activities=activities,
+        schedule=schedule(skip_first=skip, wait=0, warmup=1, active=steps, repeat=1),
+        on_trace_ready=export,
+        record_shapes=True,
+    )
+
+
+class _NullProfiler:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def step(self):
+        pass
+
+
+def log_json(record, path=None):
+    """One structured JSON line on stdout, appended to `path` when given."""
+    line = json.dumps(record)
+    print(line)
+    if path:
+        with open(path, "a") as f:
+            f.write(line + "\n")
@@ -0,0 +1,211 @@
+import argparse
+import csv
+import itertools
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import torch
+import torch.multiprocessing as mp
+from torch.utils.data import DataLoader, Dataset, random_split
+
+from services.data.studentlife import FEATURE_COLS, StudentLifeDataset
+from services.optimization.distributed import default_threads_per_rank
+from services.optimization.trainer import ModelTrainer
+
+SPLIT_SEED = 42 # Same train/test split as train_pipeline
+RESULT_FIELDS = [
+    "trial", "model", "hidden_dim", "num_layers", "seq_len", "epochs_run", "pruned",
+    "loss", "best_loss", "accuracy", "train_samples_per_sec", "inference_samples_per_sec",
+    "peak_rss_mb", "threads", "wall_seconds",
+]
+
+# Set once per pool process by _init_worker
+_shared = {}
+
+
+class SharedWindows(Dataset):
+    def __init__(self, features, labels, user_offsets, seq_len):
+        """
+        seq_len-day windows over the (shared-memory) feature tensors, indexed exactly like
+        StudentLifeDataset; only the window index is built per trial.
+        """
+        self.features = features
+        self.labels = labels
+        self.seq_len = seq_len
+        self.window_starts = StudentLifeDataset._index_windows(user_offsets.numpy(), seq_len, 1)
+
+    def __len__(self):
+        return len(self.window_starts)
+
+    def __getitem__(self, idx):
+        start = int(self.window_starts[idx])
+        return self.features[start : start + self.seq_len], self.labels[start + self.seq_len - 1]
+
+
+def load_shared(csv_file="bhavya_features.csv", cache_dir=None):
+    """Reads and normalizes the feature table once; returns (features, labels, user_offsets) in shared memory."""
+    dataset = StudentLifeDataset(csv_file=csv_file, cache_dir=cache_dir)
+    return tuple(
+        torch.from_numpy(np.array(array)).share_memory_()
+        for array in (dataset.features, dataset.labels, dataset.user_offsets)
+    )
+
+
+class MedianStopping:
+    def __init__(self, history, trial, grace_epochs=2, min_trials=3):
+        """
+        Median stopping rule, used as ModelTrainer.train's on_epoch callback.
+        1. Every epoch the trial appends its loss to `history` (trial -> losses, shared by all trials).
+        2. After `grace_epochs`, the trial stops when its best loss so far is worse than the median
+           loss the other trials reported at the same epoch (once at least `min_trials` got there).
+        """
+        self.history = history
+        self.trial = trial
+        self.grace_epochs = grace_epochs
+        self.min_trials = min_trials
+        self.pruned = False
+
+    def __call__(self, record):
+        losses = list(self.history.get(self.trial, [])) + [record["loss"]]
+        self.history[self.trial] = losses
+        epoch = len(losses)
+        if epoch <= self.grace_epochs:
+            return False
+        others = [
+            other[epoch - 1] for trial, other in self.history.items()
+            if trial != self.trial and len(other) >= epoch
+        ]
+        if len(others) < self.min_trials:
+            return False
+        self.pruned = min(losses) > statistics.median(others)
+        return self.pruned
+
+
+def build_grid(models=("lstm", "transformer"), hidden_dims=(16, 32, 64), num_layers=(1, 2), seq_lens=(7, 14)):
+    """All trial configurations; hidden_dim only sizes the LSTM (the transformer's width is fixed)."""
+    grid = []
+    for model, layers, seq_len in itertools.product(models, num_layers, seq_lens):
+        for hidden_dim in (hidden_dims if model == "lstm" else [None]):
+            grid.append({"model": model, "hidden_dim": hidden_dim, "num_layers": layers, "seq_len": seq_len})
+    return grid
+
+
+def _init_worker(tensors, threads):
+    # Per-trial thread budget, so concurrent trials don't oversubscribe the cores
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass # Already fixed for this process
+    _shared["tensors"] = tensors
+    _shared["threads"] = threads
+
+
+def run_trial(trial, params, epochs, batch_size, history, grace_epochs, min_trials):
+    dataset = SharedWindows(*_shared["tensors"], params["seq_len"])
+    train_size = int(0.8 * len(dataset))
+    train_dataset, test_dataset = random_split(
+        dataset, [train_size, len(dataset) - train_size], generator=torch.Generator().manual_seed(SPLIT_SEED)
+    )
+
+    torch.manual_seed(SPLIT_SEED)
+    sizes = {} if params["hidden_dim"] is None else {"hidden_dim": params["hidden_dim"]}
+    trainer = ModelTrainer(model_type=params["model"], input_dim=len(FEATURE_COLS),
+                           num_layers=params["num_layers"], **sizes)
+    stopper = MedianStopping(history, trial, grace_epochs, min_trials)
+
+    start = time.perf_counter()
+    records = trainer.train(DataLoader(train_dataset, batch_size=batch_size, shuffle=True), epochs=epochs, on_epoch=stopper)
+    accuracy = trainer.evaluate(DataLoader(test_dataset, batch_size=batch_size))
+    return {
+        "trial": trial,
+        **params,
+        "epochs_run": len(records),
+        "pruned": stopper.pruned,
+        "loss": records[-1]["loss"],
+        "best_loss": min(record["loss"] for record in records),
+        "accuracy": accuracy,
+        "train_samples_per_sec": statistics.mean(record["samples_per_sec"] for record in records),
+        "inference_samples_per_sec": trainer.eval_metrics["inference_samples_per_sec"],
+        "peak_rss_mb": trainer.eval_metrics["peak_rss_mb"],
+        "threads": _shared["threads"],
+        "wall_seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+def run_sweep(grid, csv_file="bhavya_features.csv", results_path="sweep_results.csv", epochs=10, batch_size=32,
+              workers=1, threads_per_trial=None, grace_epochs=2, min_trials=3, cache_dir=None):
+    """
+    Trains every configuration in `grid` and writes one row per trial to `results_path`.
+    1. The feature table is loaded once into shared memory; trials only build their window index.
+    2. Trials run on a pool of `workers` processes, each limited to `threads_per_trial` threads
+       (default: cores / workers).
+    3. Clearly losing trials are pruned early by the median stopping rule.
+    Rows are written as trials finish, so an interrupted sweep keeps its completed trials.
+    """
+    threads = threads_per_trial or default_threads_per_rank(workers)
+    tensors = load_shared(csv_file, cache_dir)
+    if len(tensors[1]) == 0:
+        print("No data found. Run build_features.py first.")
+        return []
+
+    print(f"[Sweep] {len(grid)} trials, {workers} workers x {threads} threads, up to {epochs} epochs each")
+    results = []
+    with open(results_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+        writer.writeheader()
+
+        def record(result):
+            results.append(result)
+            writer.writerow(result)
+            f.flush()
+            status = "pruned" if result["pruned"] else "done"
+            print(f"[Sweep] Trial {result['trial']} {status} after {result['epochs_run']} epochs "
+                  f"| Acc: {result['accuracy']:.4f} | {result['wall_seconds']:.1f}s")
+
+        tasks = [(trial, params, epochs, batch_size) for trial, params in enumerate(grid)]
+        if workers > 1:
+            # spawn: torch's reducers pass the shared tensors to workers as handles, not copies
+            context = mp.get_context("spawn")
+            with context.Manager() as manager:
+                history = manager.dict()
+                with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                         initializer=_init_worker, initargs=(tensors, threads)) as pool:
+                    futures = [pool.submit(run_trial, *task, history, grace_epochs, min_trials) for task in tasks]
+                    for future in as_completed(futures):
+                        record(future.result())
+        else:
+            _init_worker(tensors, threads)
+            history = {}
+            for task in tasks:
+                record(run_trial(*task, history, grace_epochs, min_trials))
+
+    best = max(results, key=lambda result: result["accuracy"])
+    print(f"[Sweep] Best: {best['model']} hidden_dim={best['hidden_dim']} num_layers={best['num_layers']} "
+          f"seq_len={best['seq_len']} | Acc: {best['accuracy']:.4f} | Results in {results_path}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hyperparameter sweep for the BHAVYA risk model")
+    parser.add_argument("--data", default="bhavya_features.csv")
+    parser.add_argument("--out", default="sweep_results.csv")
+    parser.add_argument("--models", nargs="+", choices=["lstm", "transformer"], default=["lstm", "transformer"])
+    parser.add_argument("--hidden-dims", nargs="+", type=int, default=[16, 32, 64])
+    parser.add_argument("--num-layers", nargs="+", type=int, default=[1, 2])
+    parser.add_argument("--seq-lens", nargs="+", type=int, default=[7, 14])
+    parser.add_argument("--epochs", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=1, help="Trials trained concurrently")
+    parser.add_argument("--threads-per-trial", type=int, default=None)
+    parser.add_argument("--grace-epochs", type=int, default=2, help="Epochs before a trial can be pruned")
+    parser.add_argument("--min-trials", type=int, default=3, help="Trials needed at an epoch before pruning by their median")
+    args = parser.parse_args()
+    run_sweep(
+        build_grid(args.models, args.hidden_dims, args.num_layers, args.seq_lens),
+        csv_file=args.data, results_path=args.out, epochs=args.epochs, batch_size=args.batch_size,
+        workers=args.workers, threads_per_trial=args.threads_per_trial,
+        grace_epochs=args.grace_epochs, min_trials=args.min_trials,
+    )
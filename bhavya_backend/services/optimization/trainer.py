@@ -1,59 +1,144 @@
 import torch
 import torch.optim as optim
 import torch.nn as nn
+from torch.nn.parallel import DistributedDataParallel
 from services.inference.models import BehavioralLSTM, BehavioralTransformer
+from services.optimization.distributed import all_reduce_mean, all_reduce_sum, is_main_process
+from services.optimization.profiling import PhaseTimer, log_json, peak_rss_mb, step_profiler
 import os
+import time
 import numpy as np
 
 class ModelTrainer:
-    def __init__(self, model_type="lstm", input_dim=4, hidden_dim=16, output_dim=1):
+    def __init__(self, model_type="lstm", input_dim=4, hidden_dim=16, output_dim=1, num_layers=2):
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         self.model_type = model_type
         
         if model_type == "lstm":
-            self.model = BehavioralLSTM(input_dim, hidden_dim, output_dim).to(self.device)
+            self.model = BehavioralLSTM(input_dim, hidden_dim, output_dim, num_layers=num_layers).to(self.device)
         else:
-            self.model = BehavioralTransformer(input_dim).to(self.device)
+            self.model = BehavioralTransformer(input_dim, num_layers=num_layers).to(self.device)
             
         self.criterion = nn.BCELoss() # Binary Classification (Risk vs No Risk)
         self.optimizer = optim.Adam(self.model.parameters(), lr=0.001)
 
-    def train(self, train_loader, epochs=10):
+    def distribute(self):
+        """
+        Wraps the model in DistributedDataParallel (gradients are all-reduced in backward).
+        Call inside an initialized process group, e.g. from optimization.distributed.launch.
+        """
+        self.model = DistributedDataParallel(self.model)
+
+    @property
+    def module(self):
+        # The underlying model (unwrapped from DDP)
+        return getattr(self.model, "module", self.model)
+
+    def train(self, train_loader, epochs=10, metrics_path=None, profile_steps=0, profile_skip=5,
+              trace_path="training_trace.json", on_epoch=None):
+        """
+        Trains for `epochs` and logs one JSON record per epoch (stdout, plus `metrics_path` if set):
+        loss, samples/sec, time per phase (data / forward / backward / optimizer) and peak RSS.
+        profile_steps > 0 captures that many steps (after `profile_skip`) with torch.profiler
+        and exports them as a Chrome trace to `trace_path`.
+        on_epoch(record) is called after every epoch; a truthy return stops training early.
+        Returns the epoch records.
+        """
         self.model.train()
-        print(f"Starting training on {self.device} for {epochs} epochs...")
-        
-        for epoch in range(epochs):
-            total_loss = 0
-            for X, y in train_loader:
-                X, y = X.to(self.device), y.to(self.device)
-                
-                self.optimizer.zero_grad()
-                predictions = self.model(X)
-                
-                loss = self.criterion(predictions.squeeze(), y)
-                loss.backward()
-                self.optimizer.step()
-                
-                total_loss += loss.item()
-            
-            print(f"Epoch {epoch+1}/{epochs} | Loss: {total_loss/len(train_loader):.4f}")
+        main = is_main_process()
+        if main:
+            print(f"Starting training on {self.device} for {epochs} epochs...")
+
+        timer = PhaseTimer(["data", "forward", "backward", "optimizer"], self.device, annotate=bool(profile_steps))
+        history = []
+        with step_profiler(profile_steps if main else 0, profile_skip, trace_path) as profiler:
+            for epoch in range(epochs):
+                # DistributedSampler: a different shuffle (and shard) every epoch
+                if hasattr(train_loader.sampler, "set_epoch"):
+                    train_loader.sampler.set_epoch(epoch)
+                timer.reset()
+                total_loss = 0
+                samples = 0
+                epoch_start = time.perf_counter()
+                batches = iter(train_loader)
+                while True:
+                    with timer.phase("data"):
+                        batch = next(batches, None)
+                        if batch is not None:
+                            X, y = batch[0].to(self.device), batch[1].to(self.device)
+                    if batch is None:
+                        break
+
+                    with timer.phase("forward"):
+                        self.optimizer.zero_grad()
+                        predictions = self.model(X)
+                        loss = self.criterion(predictions.squeeze(), y)
+                    with timer.phase("backward"):
+                        loss.backward()
+                    with timer.phase("optimizer"):
+                        self.optimizer.step()
+
+                    total_loss += loss.item()
+                    samples += y.size(0)
+                    profiler.step()
+
+                elapsed = time.perf_counter() - epoch_start
+                epoch_loss = all_reduce_mean(total_loss / len(train_loader))
+                # Global throughput: every rank's samples over the (shared) epoch time
+                samples = int(all_reduce_sum(samples))
+                record = {
+                    "event": "train_epoch",
+                    "epoch": epoch + 1,
+                    "epochs": epochs,
+                    "loss": epoch_loss,
+                    "samples": samples,
+                    "seconds": round(elapsed, 6),
+                    "samples_per_sec": samples / elapsed if elapsed else 0.0,
+                    **timer.summary(),
+                    "peak_rss_mb": peak_rss_mb(),
+                }
+                history.append(record)
+                if main:
+                    print(f"Epoch {epoch+1}/{epochs} | Loss: {epoch_loss:.4f} | {record['samples_per_sec']:.0f} samples/s")
+                    log_json(record, metrics_path)
+                if on_epoch is not None and on_epoch(record):
+                    break
+        return history
 
     def save_model(self, path="model_v1.pt"):
-        torch.save(self.model.state_dict(), path)
+        torch.save(self.module.state_dict(), path)
         print(f"Model saved to {path}")
 
-    def evaluate(self, test_loader):
-        self.model.eval()
+    def evaluate(self, test_loader, metrics_path=None):
+        """Accuracy plus inference throughput (model forward only, and end to end including data loading)."""
+        model = self.module
+        model.eval()
         correct = 0
         total = 0
+        timer = PhaseTimer(["forward"], self.device)
+        start = time.perf_counter()
         with torch.no_grad():
             for X, y in test_loader:
                 X, y = X.to(self.device), y.to(self.device)
-                outputs = self.model(X)
+                with timer.phase("forward"):
+                    outputs = model(X)
                 predicted = (outputs.squeeze() > 0.5).float()
                 total += y.size(0)
                 correct += (predicted == y).sum().item()
+        elapsed = time.perf_counter() - start
+        forward = timer.totals["forward"]
         
         accuracy = correct / total
-        print(f"Validation Accuracy: {accuracy:.4f}")
+        self.eval_metrics = {
+            "event": "evaluate",
+            "accuracy": accuracy,
+            "samples": total,
+            "seconds": round(elapsed, 6),
+            "samples_per_sec": total / elapsed if elapsed else 0.0,
+            "inference_samples_per_sec": total / forward if forward else 0.0,
+            "forward_ms_per_batch": 1000.0 * forward / max(1, len(test_loader)),
+            "peak_rss_mb": peak_rss_mb(),
+        }
+        print(f"Validation Accuracy: {accuracy:.4f} | Inference: {self.eval_metrics['inference_samples_per_sec']:.0f} samples/s")
+        log_json(self.eval_metrics, metrics_path)
         return accuracy
@@ -0,0 +1,47 @@
+import requests
+import uuid
+
+BASE_URL = "http://localhost:8000/api/v1"
+NUM_ENTRIES = 5
+PAGE_SIZE = 2
+
+def test_journal_pagination():
+    # Fresh user, so the journal holds exactly the entries created here
+    username = f"pager_{uuid.uuid4().hex[:8]}"
+    signup = requests.post(f"{BASE_URL}/auth/signup", json={
+        "username": username,
+        "email": f"{username}@example.com",
+        "password": "password123"
+    })
+    assert signup.status_code == 200, signup.text
+    token = requests.post(f"{BASE_URL}/auth/token", data={"username": username, "password": "password123"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    # Created within the same second: server-default timestamps tie and only the id orders them
+    created = [
+        requests.post(f"{BASE_URL}/journal/", json={"content": f"entry {i}"}, headers=headers).json()["id"]
+        for i in range(NUM_ENTRIES)
+    ]
+
+    # Walk the cursor to exhaustion (5 entries / 2 per page = 3 pages)
+    pages = []
+    cursor = None
+    while len(pages) <= NUM_ENTRIES: # Bound, so a cursor that never advances fails instead of looping
+        params = {"limit": PAGE_SIZE}
+        if cursor:
+            params["cursor"] = cursor
+        response = requests.get(f"{BASE_URL}/journal/", params=params, headers=headers)
+        assert response.status_code == 200, response.text
+        pages.append([entry["id"] for entry in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    print(f"Pages: {pages}")
+    assert cursor is None, "cursor never reached the last page"
+    assert len(pages) == 3
+    assert [i for page in pages for i in page] == sorted(created, reverse=True)
+
+if __name__ == "__main__":
+    test_journal_pagination()
+    print("Pagination OK")
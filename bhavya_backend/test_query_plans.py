@@ -0,0 +1,72 @@
+from datetime import date, datetime
+from sqlalchemy import create_engine, select
+from app.api.pagination import _keyset, encode_cursor
+from app.db.base import Base
+from app.db import models
+from app.db.migrations import upgrade
+
+USER_ID = 1
+PAGE_SIZE = 100
+# Cursor values as keyset_page decodes them: SQLite's stored text, or a datetime
+RAW_CURSOR = ("2024-01-01 00:00:00", 5000)
+DT_CURSOR = (datetime(2024, 1, 1), 5000)
+
+def _engine():
+    # Fresh in-memory schema, brought to the current indexes the same way the app does at startup
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    upgrade(engine)
+    return engine
+
+def _plan(engine, stmt):
+    compiled = stmt.compile(engine)
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + str(compiled), params).all()
+    return " | ".join(row[-1] for row in rows)
+
+def _assert_uses(plan, index):
+    assert index in plan, f"expected {index}: {plan}"
+    assert "USE TEMP B-TREE" not in plan, f"sorts instead of walking {index}: {plan}"
+
+def _keyset_page(stmt, ts_col, id_col, cursor=None):
+    # The statement keyset_page / keyset_page_async run for one page
+    token = encode_cursor(*cursor) if cursor else None
+    return _keyset(stmt, ts_col, id_col, token, PAGE_SIZE)
+
+def test_journal_pages_use_index():
+    engine = _engine()
+    stmt = select(models.JournalEntry).where(models.JournalEntry.user_id == USER_ID)
+    for cursor in (None, RAW_CURSOR, DT_CURSOR):
+        plan = _plan(engine, _keyset_page(stmt, models.JournalEntry.timestamp, models.JournalEntry.id, cursor))
+        _assert_uses(plan, "ix_journal_entries_user_timestamp")
+
+def test_insights_pages_use_index():
+    engine = _engine()
+    stmt = select(models.Insight).where(models.Insight.user_id == USER_ID)
+    for cursor in (None, RAW_CURSOR, DT_CURSOR):
+        plan = _plan(engine, _keyset_page(stmt, models.Insight.generated_at, models.Insight.id, cursor))
+        _assert_uses(plan, "ix_insights_user_generated_at")
+
+def test_checkin_lookup_uses_index():
+    engine = _engine()
+    stmt = select(models.DailyCheckIn).where(
+        models.DailyCheckIn.user_id == USER_ID,
+        models.DailyCheckIn.checkin_date == date(2024, 1, 1),
+    ).limit(1)
+    _assert_uses(_plan(engine, stmt), "uq_daily_checkins_user_date")
+
+def test_ingestion_history_pages_use_index():
+    engine = _engine()
+    base = select(models.BehavioralRaw).where(models.BehavioralRaw.user_id == USER_ID)
+    for stmt in (base, base.where(models.BehavioralRaw.data_type == "sleep")):
+        for cursor in (None, RAW_CURSOR, DT_CURSOR):
+            plan = _plan(engine, _keyset_page(stmt, models.BehavioralRaw.timestamp, models.BehavioralRaw.id, cursor))
+            _assert_uses(plan, "ix_behavioral_raw_user_timestamp")
+
+if __name__ == "__main__":
+    test_journal_pages_use_index()
+    test_insights_pages_use_index()
+    test_checkin_lookup_uses_index()
+    test_ingestion_history_pages_use_index()
+    print("Query plans OK")
@@ -1,39 +1,76 @@
 import torch
 from torch.utils.data import DataLoader, random_split
 from services.optimization.trainer import ModelTrainer
+from services.optimization.distributed import distributed_loader, launch
 from services.data.studentlife import StudentLifeDataset
+import argparse
 import numpy as np
 
-def run_pipeline():
-    print("--- BHAVYA ML Training Pipeline (Deep Learning on CSV) ---")
-    
+SPLIT_SEED = 42 # Same train/test split in every rank
+
+def load_splits():
     # 1. Load Data (From Feature Table)
     dataset = StudentLifeDataset(csv_file="bhavya_features.csv", seq_len=7)
-    
+
     # Split
     if len(dataset) == 0:
         print("No data found. Run build_features.py first.")
-        return
+        return None
 
     train_size = int(0.8 * len(dataset))
     test_size = len(dataset) - train_size
-    train_dataset, test_dataset = random_split(dataset, [train_size, test_size])
-    
+    return random_split(dataset, [train_size, test_size], generator=torch.Generator().manual_seed(SPLIT_SEED))
+
+def train_worker(rank, world_size, epochs, metrics_path=None, profile_steps=0):
+    """One rank of the data-parallel run: trains on its shard; rank 0 evaluates and saves."""
+    splits = load_splits()
+    if splits is None:
+        return
+    train_dataset, test_dataset = splits
+
+    trainer = ModelTrainer(model_type="lstm", input_dim=5, hidden_dim=32)
+    trainer.distribute()
+    trainer.train(distributed_loader(train_dataset, batch_size=32), epochs=epochs,
+                  metrics_path=metrics_path, profile_steps=profile_steps)
+
+    if rank == 0:
+        trainer.evaluate(DataLoader(test_dataset, batch_size=32), metrics_path=metrics_path)
+        trainer.save_model("services/inference/studentlife_model_v1.pt")
+
+def run_pipeline(workers=1, epochs=10, metrics_path=None, profile_steps=0):
+    print("--- BHAVYA ML Training Pipeline (Deep Learning on CSV) ---")
+
+    if workers > 1:
+        # Data-parallel: one process per worker, gradients all-reduced over gloo
+        launch(train_worker, workers, epochs, metrics_path, profile_steps)
+        return
+
+    splits = load_splits()
+    if splits is None:
+        return
+    train_dataset, test_dataset = splits
+
     train_loader = DataLoader(train_dataset, batch_size=32, shuffle=True)
     test_loader = DataLoader(test_dataset, batch_size=32)
-    
+
     # 2. Initialize Trainer (LSTM)
     # Features: sleep_duration, sleep_midpoint, activity_level, activity_variance, routine_change (5 total)
     trainer = ModelTrainer(model_type="lstm", input_dim=5, hidden_dim=32)
-    
+
     # 3. Train
-    trainer.train(train_loader, epochs=10)
-    
+    trainer.train(train_loader, epochs=epochs, metrics_path=metrics_path, profile_steps=profile_steps)
+
     # 4. Evaluate
-    trainer.evaluate(test_loader)
-    
+    trainer.evaluate(test_loader, metrics_path=metrics_path)
+
     # 5. Save
     trainer.save_model("services/inference/studentlife_model_v1.pt")
 
 if __name__ == "__main__":
-    run_pipeline()
+    parser = argparse.ArgumentParser(description="Train the BHAVYA risk model")
+    parser.add_argument("--workers", type=int, default=1, help="Training processes (data-parallel when > 1)")
+    parser.add_argument("--epochs", type=int, default=10)
+    parser.add_argument("--metrics", default=None, help="Append per-epoch JSON metrics to this file")
+    parser.add_argument("--profile-steps", type=int, default=0, help="Capture N steps as a Chrome trace (training_trace.json)")
+    args = parser.parse_args()
+    run_pipeline(workers=args.workers, epochs=args.epochs, metrics_path=args.metrics, profile_steps=args.profile_steps)